@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+DICOM 변환 마이크로벤치마크
+이전 방식(float64 최소/최대 정규화)과 dicom_render.render_dicom(정수 LUT / float32 제자리 연산)의
+변환 시간과 최대 추가 메모리 사용량(tracemalloc)을 비교
+
+사용법:
+    python bench_render_dicom.py [크기(기본 3000)] [반복 횟수(기본 5)]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+import dicom_render
+
+
+def legacy_render(ds):
+    """이전 변환 방식 (get_image / 폴더 업로드에서 사용하던 코드)"""
+    arr = ds.pixel_array
+    arr = arr.astype(float)
+    arr = (arr - arr.min()) / (arr.max() - arr.min()) * 255.0
+    arr = arr.astype(np.uint8)
+    return arr if arr.ndim == 2 else arr[0]
+
+
+def make_dataset(size, signed=False, window=False):
+    """size x size 크기의 12비트 흉부 X선 형태 가상 DICOM (메모리에서만 생성)"""
+    meta = FileMetaDataset()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.SOPInstanceUID = generate_uid()
+    ds.Rows = ds.Columns = size
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = 'MONOCHROME2'
+    ds.BitsAllocated = 16
+    ds.BitsStored = 12
+    ds.HighBit = 11
+    ds.PixelRepresentation = 1 if signed else 0
+
+    rng = np.random.default_rng(0)
+    if signed:
+        arr = rng.integers(-1024, 3071, size=(size, size), dtype=np.int16)
+        ds.RescaleSlope, ds.RescaleIntercept = 1, 0
+    else:
+        arr = rng.integers(0, 4096, size=(size, size), dtype=np.uint16)
+    if window:
+        ds.WindowCenter, ds.WindowWidth = 2048, 1600
+    ds.PixelData = arr.tobytes()
+    return ds
+
+
+def measure(func, ds, repeat):
+    """(평균 시간(ms), 최대 추가 메모리(MB))"""
+    func(ds)  # 준비 실행 (import, pixel_array 디코딩 캐시)
+
+    tracemalloc.start()
+    func(ds)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(ds)
+    elapsed = (time.perf_counter() - started) / repeat
+    return elapsed * 1000, peak / 1024 / 1024
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    cases = [
+        ('uint16 최소/최대', make_dataset(size)),
+        ('int16 + rescale', make_dataset(size, signed=True)),
+        ('uint16 + 윈도우 태그', make_dataset(size, window=True)),
+    ]
+
+    print(f"📏 영상 크기: {size}x{size} ({size * size * 2 / 1024 / 1024:.1f}MB 16비트), 반복 {repeat}회")
+    print(f"{'영상':<22}{'방식':<16}{'시간(ms)':>10}{'최대 메모리(MB)':>18}")
+    print("-" * 66)
+    for name, ds in cases:
+        legacy_ms, legacy_mb = measure(legacy_render, ds, repeat)
+        new_ms, new_mb = measure(dicom_render.render_dicom, ds, repeat)
+        print(f"{name:<22}{'이전(float64)':<16}{legacy_ms:>10.1f}{legacy_mb:>18.1f}")
+        print(f"{'':<22}{'render_dicom':<16}{new_ms:>10.1f}{new_mb:>18.1f}")
+        print(f"{'':<22}{'개선':<16}{legacy_ms / new_ms:>9.1f}x{legacy_mb / max(new_mb, 1e-6):>17.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+SQLite 읽기/쓰기 동시 실행 벤치마크
+긴 읽기(내보내기처럼 label 테이블 전체를 조금씩 읽음)가 진행되는 동안 라벨 저장(upsert)을 반복하여
+기본 설정(rollback journal)과 db_config의 PRAGMA(WAL, busy_timeout 등) 적용 시의
+쓰기 지연 시간과 "database is locked" 오류 수를 비교 (임시 DB 사용, 운영 DB는 건드리지 않음)
+
+사용법:
+    python bench_sqlite_concurrency.py [라벨 수(기본 200000)] [쓰기 스레드 수(기본 4)] [읽기 시간(초, 기본 3)]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import threading
+
+import db_config
+
+READ_CHUNK = 1000  # 내보내기처럼 한 번에 가져올 행 수
+
+
+def create_database(path, labels):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE label (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            file_id INTEGER NOT NULL,
+            disease TEXT NOT NULL,
+            view_type VARCHAR(20) NOT NULL,
+            code VARCHAR(20) NOT NULL,
+            description VARCHAR(255) NOT NULL,
+            created_at DATETIME
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX uq_label_user_file ON label (user_id, file_id)")
+    conn.executemany(
+        "INSERT INTO label (user_id, file_id, disease, view_type, code, description, created_at) "
+        "VALUES (?, ?, '[\"정상\"]', 'AP', '', '소견 없음', '2025-01-01 00:00:00')",
+        ((i % 10, i) for i in range(labels))
+    )
+    conn.commit()
+    conn.close()
+
+
+def connect(path, tuned):
+    # 기본 설정: Flask-SQLAlchemy(pysqlite) 기본값과 같은 5초 대기
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+    if tuned:
+        db_config.apply_sqlite_pragmas(conn)
+    return conn
+
+
+def reader(path, tuned, duration, result):
+    """label 전체를 READ_CHUNK씩 읽으며 duration초 동안 읽기 트랜잭션을 유지"""
+    conn = connect(path, tuned)
+    started = time.perf_counter()
+    rows = 0
+    cursor = conn.execute("SELECT * FROM label ORDER BY id")
+    while True:
+        chunk = cursor.fetchmany(READ_CHUNK)
+        if not chunk:
+            break
+        rows += len(chunk)
+        # 행을 엑셀/CSV로 쓰는 시간만큼 쉬어 읽기가 duration초 정도 걸리도록 함
+        time.sleep(duration / max(result['labels'] / READ_CHUNK, 1))
+    result['read_rows'] = rows
+    result['read_seconds'] = time.perf_counter() - started
+    conn.close()
+
+
+def writer(path, tuned, stop, latencies, errors, labels):
+    conn = connect(path, tuned)
+    rng = random.Random(threading.get_ident())
+    while not stop.is_set():
+        file_id = rng.randrange(labels)
+        started = time.perf_counter()
+        try:
+            conn.execute(
+                "INSERT INTO label (user_id, file_id, disease, view_type, code, description, created_at) "
+                "VALUES (?, ?, '[\"Pneumothorax\"]', 'AP', 'PTX_1', '기흉', datetime('now')) "
+                "ON CONFLICT (user_id, file_id) DO UPDATE SET disease = excluded.disease, "
+                "code = excluded.code, description = excluded.description, created_at = excluded.created_at",
+                (file_id % 10, file_id)
+            )
+            conn.commit()
+            latencies.append(time.perf_counter() - started)
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            errors.append(str(e))
+        time.sleep(0.005)  # 라벨러가 저장하는 간격
+    conn.close()
+
+
+def run(labels, writers, duration, tuned):
+    tmp_dir = tempfile.mkdtemp(prefix='bench_sqlite_')
+    path = os.path.join(tmp_dir, 'bench.db')
+    create_database(path, labels)
+
+    result = {'labels': labels}
+    latencies, errors = [], []
+    stop = threading.Event()
+    read_thread = threading.Thread(target=reader, args=(path, tuned, duration, result))
+    write_threads = [
+        threading.Thread(target=writer, args=(path, tuned, stop, latencies, errors, labels))
+        for _ in range(writers)
+    ]
+
+    started = time.perf_counter()
+    read_thread.start()
+    for t in write_threads:
+        t.start()
+    read_thread.join()
+    stop.set()
+    for t in write_threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    for name in os.listdir(tmp_dir):
+        os.remove(os.path.join(tmp_dir, name))
+    os.rmdir(tmp_dir)
+
+    latencies.sort()
+    pick = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000 if latencies else float('nan')
+    return {
+        'writes': len(latencies),
+        'writes_per_sec': len(latencies) / elapsed,
+        'p50': pick(0.5),
+        'p99': pick(0.99),
+        'max': latencies[-1] * 1000 if latencies else float('nan'),
+        'locked': len(errors),
+        'read_seconds': result['read_seconds'],
+    }
+
+
+def main():
+    labels = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+
+    print(f"📏 라벨 {labels}개, 쓰기 스레드 {writers}개, 읽기 약 {duration:.0f}초 동안 동시 실행")
+    print(f"⚙️ 적용 PRAGMA: {', '.join(f'{name}={value}' for name, value in db_config.sqlite_pragmas())}")
+    print(f"{'설정':<16}{'쓰기 수':>8}{'쓰기/초':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'최대(ms)':>10}{'locked':>8}{'읽기(초)':>10}")
+    print("-" * 82)
+    for name, tuned in (('기본(rollback)', False), ('db_config', True)):
+        r = run(labels, writers, duration, tuned)
+        print(f"{name:<16}{r['writes']:>8}{r['writes_per_sec']:>10.1f}{r['p50']:>10.1f}{r['p99']:>10.1f}"
+              f"{r['max']:>10.1f}{r['locked']:>8}{r['read_seconds']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+테스트 공통 설정
+- main.py / database_manager.py는 import 시점에 환경변수로 DB와 캐시 위치를 정하므로 먼저 임시 경로를 지정
+- DB를 사용하는 테스트는 database_url 픽스처로 SQLite와 PostgreSQL(TEST_DATABASE_URL) 양쪽에서 실행
+  (TEST_DATABASE_URL이 없으면 PostgreSQL 쪽은 건너뜀)
+
+예: TEST_DATABASE_URL=postgresql://user:pw@localhost/labeling_test python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+
+TEST_DIR = tempfile.mkdtemp(prefix='labeling_test_')
+SQLITE_URL = f"sqlite:///{os.path.join(TEST_DIR, 'app.db')}"
+
+os.environ['DATABASE_URL'] = SQLITE_URL
+os.environ['RENDER_CACHE_DIR'] = os.path.join(TEST_DIR, 'renders')
+os.environ['EXPORT_JOB_DIR'] = os.path.join(TEST_DIR, 'exports')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import db_config
+from user import db
+
+BACKENDS = ('sqlite', 'postgresql')
+
+
+def bind_database(app, uri):
+    """app의 DB 연결을 uri로 바꾸고 빈 스키마를 만듦 (이전 엔진은 정리)
+
+    첫 요청 이후에는 db.init_app을 다시 호출할 수 없으므로 Flask-SQLAlchemy가 보관하는 기본 엔진만 교체
+    """
+    engines = db._app_engines[app]
+    for engine in engines.values():
+        engine.dispose()
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = db_config.engine_options(uri)
+    engines[None] = create_engine(uri, **app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+@pytest.fixture(scope='module', params=BACKENDS)
+def database_url(request):
+    """테스트할 DB URI (PostgreSQL은 TEST_DATABASE_URL이 있을 때만)"""
+    if request.param == 'sqlite':
+        return SQLITE_URL
+    uri = os.environ.get('TEST_DATABASE_URL')
+    if not uri:
+        pytest.skip('TEST_DATABASE_URL이 설정되지 않아 PostgreSQL 테스트를 건너뜁니다.')
+    return uri
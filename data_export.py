@@ -0,0 +1,301 @@
+"""
+데이터베이스 내보내기
+- DB에서 행을 yield_per로 조금씩 읽어 openpyxl write-only 워크북에 바로 기록
+- 전체 데이터를 dict / DataFrame / 메모리 워크북으로 만들지 않으므로 라벨 수와 관계없이 메모리 사용량이 일정
+- 머신러닝 파이프라인용 CSV / JSONL / Parquet 형식 (질환은 JSON 문자열 대신 리스트 또는 원-핫 컬럼)
+- main.py(API)와 database_manager.py(CLI)에서 함께 사용
+"""
+
+import io
+import csv
+import json
+
+from sqlalchemy import select, func
+
+from user import db, User, File, Label, DISEASE_CATALOG
+
+EXPORT_CHUNK_SIZE = 1000  # DB에서 한 번에 읽어올 행 수
+EXCEL_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# 형식 -> (MIME 타입, 확장자)
+EXPORT_FORMATS = {
+    'xlsx': (EXCEL_MIMETYPE, 'xlsx'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson; charset=utf-8', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+# 한 줄씩 바로 내보낼 수 있는 텍스트 형식 (임시 파일 없이 응답 스트리밍 가능)
+TEXT_EXPORT_FORMATS = ('csv', 'jsonl')
+
+
+def format_datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def _stream(stmt):
+    """select 결과를 EXPORT_CHUNK_SIZE 단위로 나누어 가져오며 한 행씩 반환"""
+    return db.session.execute(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+
+
+def iter_user_rows():
+    stmt = select(User.id, User.username, User.email, User.created_at).order_by(User.id)
+    for row in _stream(stmt):
+        yield [row.id, row.username, row.email, format_datetime(row.created_at)]
+
+
+def iter_file_rows():
+    stmt = select(File.id, File.filename, File.file_path, File.file_size,
+                  File.upload_date, File.uploaded_by).order_by(File.id)
+    for row in _stream(stmt):
+        size_kb = row.file_size / 1024 if row.file_size else 0
+        yield [row.id, row.filename, row.file_path, round(size_kb, 1),
+               format_datetime(row.upload_date), row.uploaded_by]
+
+
+def iter_label_rows():
+    stmt = select(Label.id, Label.user_id, Label.file_id, Label.disease, Label.view_type,
+                  Label.code, Label.description, Label.created_at).order_by(Label.id)
+    for row in _stream(stmt):
+        yield [row.id, row.user_id, row.file_id, row.disease, row.view_type,
+               row.code, row.description, format_datetime(row.created_at)]
+
+
+# 시트 정의: 데이터 종류 -> (시트 이름, 헤더, 행 생성 함수)
+EXPORT_SHEETS = {
+    'users': ('사용자', ['ID', '사용자명', '이메일', '가입일'], iter_user_rows),
+    'files': ('파일', ['ID', '파일명', '파일경로', '크기(KB)', '업로드일', '업로더ID'], iter_file_rows),
+    'labels': ('라벨', ['ID', '사용자ID', '파일ID', '질환', '사진종류', '코드', '설명', '생성일'], iter_label_rows),
+}
+
+
+def count_export_rows(data_types=('users', 'files', 'labels')):
+    """내보낼 전체 행 수 (진행률 표시용)"""
+    models = {'users': User, 'files': File, 'labels': Label}
+    return sum(db.session.query(func.count(models[data_type].id)).scalar() or 0 for data_type in data_types)
+
+
+def write_excel_export(dest, data_types=('users', 'files', 'labels'), include_summary=True, progress=None):
+    """데이터베이스를 Excel 파일로 스트리밍 기록
+
+    Args:
+        dest: 저장할 파일 경로 또는 쓰기 가능한 바이너리 파일 객체
+        data_types: 내보낼 데이터 종류 (EXPORT_SHEETS의 키)
+        include_summary: 요약 시트 추가 여부
+        progress: 진행 콜백 progress(지금까지 기록한 행 수)
+
+    Returns:
+        {데이터 종류: 행 수, 'total_size_kb': 총 파일 크기(KB)}
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    counts = {}
+    rows_written = 0
+
+    for data_type in data_types:
+        sheet_name, headers, iter_rows = EXPORT_SHEETS[data_type]
+        ws = wb.create_sheet(sheet_name)
+        ws.append(headers)
+
+        count = 0
+        for row in iter_rows():
+            ws.append(row)
+            count += 1
+            rows_written += 1
+            if progress and rows_written % EXPORT_CHUNK_SIZE == 0:
+                progress(rows_written)
+        counts[data_type] = count
+
+    total_size = db.session.query(func.sum(File.file_size)).scalar() or 0
+    counts['total_size_kb'] = round(total_size / 1024, 1)
+
+    if include_summary:
+        # 요약 시트
+        ws = wb.create_sheet('요약')
+        ws.append(['항목', '개수'])
+        for data_type in data_types:
+            ws.append([EXPORT_SHEETS[data_type][0], counts[data_type]])
+        ws.append(['총 크기(KB)', counts['total_size_kb']])
+
+    wb.save(dest)
+    if progress:
+        progress(rows_written)
+    return counts
+
+
+# ==================== CSV / JSONL / Parquet ====================
+def iter_user_records():
+    stmt = select(User.id, User.username, User.email, User.created_at).order_by(User.id)
+    for row in _stream(stmt):
+        yield {'id': row.id, 'username': row.username, 'email': row.email, 'created_at': row.created_at}
+
+
+def iter_file_records():
+    stmt = select(File.id, File.filename, File.file_path, File.file_size,
+                  File.upload_date, File.uploaded_by).order_by(File.id)
+    for row in _stream(stmt):
+        yield {'id': row.id, 'filename': row.filename, 'file_path': row.file_path,
+               'file_size': row.file_size, 'upload_date': row.upload_date, 'uploaded_by': row.uploaded_by}
+
+
+def iter_label_records():
+    stmt = select(Label.id, Label.user_id, User.username, Label.file_id, File.filename,
+                  Label.disease, Label.view_type, Label.code, Label.description, Label.created_at) \
+        .outerjoin(User, Label.user_id == User.id) \
+        .outerjoin(File, Label.file_id == File.id) \
+        .order_by(Label.id)
+    for row in _stream(stmt):
+        yield {'id': row.id, 'user_id': row.user_id, 'username': row.username,
+               'file_id': row.file_id, 'filename': row.filename,
+               'diseases': Label.parse_diseases(row.disease), 'view_type': row.view_type,
+               'code': row.code, 'description': row.description, 'created_at': row.created_at}
+
+
+# 레코드 정의: 데이터 종류 -> ([(필드명, 타입)], 레코드 생성 함수)
+# 타입: int / str / datetime / list(문자열 리스트)
+EXPORT_RECORDS = {
+    'users': ([('id', 'int'), ('username', 'str'), ('email', 'str'), ('created_at', 'datetime')],
+              iter_user_records),
+    'files': ([('id', 'int'), ('filename', 'str'), ('file_path', 'str'), ('file_size', 'int'),
+               ('upload_date', 'datetime'), ('uploaded_by', 'int')],
+              iter_file_records),
+    'labels': ([('id', 'int'), ('user_id', 'int'), ('username', 'str'), ('file_id', 'int'),
+                ('filename', 'str'), ('diseases', 'list'), ('view_type', 'str'), ('code', 'str'),
+                ('description', 'str'), ('created_at', 'datetime')],
+               iter_label_records),
+}
+
+
+def _csv_header(fields):
+    header = []
+    for name, field_type in fields:
+        if field_type == 'list':
+            # 질환 리스트는 카탈로그 기준 원-핫 컬럼으로 펼침
+            header.extend(f'disease_{disease}' for disease in DISEASE_CATALOG)
+        else:
+            header.append(name)
+    return header
+
+
+def _csv_row(fields, record):
+    row = []
+    for name, field_type in fields:
+        value = record[name]
+        if field_type == 'list':
+            row.extend(1 if disease in value else 0 for disease in DISEASE_CATALOG)
+        elif field_type == 'datetime':
+            row.append(value.isoformat() if value else '')
+        else:
+            row.append('' if value is None else value)
+    return row
+
+
+def _jsonl_line(fields, record):
+    data = {}
+    for name, field_type in fields:
+        value = record[name]
+        if field_type == 'datetime':
+            value = value.isoformat() if value else None
+        data[name] = value
+    return json.dumps(data, ensure_ascii=False) + '\n'
+
+
+def iter_text_export(fmt, data_type='labels', progress=None):
+    """CSV/JSONL 내용을 EXPORT_CHUNK_SIZE 행 단위의 문자열 조각으로 생성 (응답 스트리밍용)"""
+    fields, iter_records = EXPORT_RECORDS[data_type]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(_csv_header(fields))
+
+    rows_written = 0
+    for record in iter_records():
+        if writer:
+            writer.writerow(_csv_row(fields, record))
+        else:
+            buffer.write(_jsonl_line(fields, record))
+        rows_written += 1
+        if rows_written % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            if progress:
+                progress(rows_written)
+    yield buffer.getvalue()
+    if progress:
+        progress(rows_written)
+
+
+def _parquet_schema(fields):
+    import pyarrow as pa
+
+    types = {
+        'int': pa.int64(),
+        'str': pa.string(),
+        'datetime': pa.timestamp('us'),
+        'list': pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[field_type]) for name, field_type in fields])
+
+
+def write_parquet_export(dest, data_type='labels', progress=None):
+    """Parquet 파일로 스트리밍 기록 (EXPORT_CHUNK_SIZE 행 단위 row group)
+
+    질환은 list<string>, 날짜는 timestamp 컬럼으로 저장되어 pandas/pyarrow에서 다시 파싱할 필요가 없음
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields, iter_records = EXPORT_RECORDS[data_type]
+    schema = _parquet_schema(fields)
+    rows_written = 0
+    batch = []
+
+    with pq.ParquetWriter(dest, schema) as writer:
+        for record in iter_records():
+            batch.append(record)
+            if len(batch) >= EXPORT_CHUNK_SIZE:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                rows_written += len(batch)
+                batch = []
+                if progress:
+                    progress(rows_written)
+        if batch or rows_written == 0:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            rows_written += len(batch)
+    if progress:
+        progress(rows_written)
+    return rows_written
+
+
+def write_export(dest, fmt='xlsx', data_type=None, progress=None):
+    """형식에 맞춰 파일로 내보내기
+
+    Args:
+        dest: 저장할 파일 경로 (xlsx/parquet는 바이너리 파일 객체도 가능)
+        fmt: 'xlsx' / 'csv' / 'jsonl' / 'parquet'
+        data_type: 'users' / 'files' / 'labels' (xlsx에서 None이면 전체 시트 + 요약)
+
+    Returns:
+        기록한 데이터 행 수
+    """
+    if fmt == 'xlsx':
+        data_types = (data_type,) if data_type else tuple(EXPORT_SHEETS)
+        counts = write_excel_export(dest, data_types=data_types,
+                                    include_summary=data_type is None, progress=progress)
+        return sum(counts[t] for t in data_types)
+    if fmt == 'parquet':
+        return write_parquet_export(dest, data_type or 'labels', progress=progress)
+    if fmt in TEXT_EXPORT_FORMATS:
+        rows = {'count': 0}
+
+        def track(rows_written):
+            rows['count'] = rows_written
+            if progress:
+                progress(rows_written)
+
+        with open(dest, 'w', encoding='utf-8', newline='') as f:
+            for chunk in iter_text_export(fmt, data_type or 'labels', progress=track):
+                f.write(chunk)
+        return rows['count']
+    raise ValueError(f'지원하지 않는 형식입니다: {fmt}')
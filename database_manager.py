@@ -10,19 +10,26 @@
 
 import os
 import sys
-import sqlite3
-import shutil
 import json
 from datetime import datetime
 from pathlib import Path
 from flask import Flask
-from sqlalchemy import inspect
+from sqlalchemy import inspect, func
+from sqlalchemy.exc import OperationalError, ProgrammingError
 
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from user import db, User, File, Label, ensure_database_permissions
+import image_cache
+import dicom_render
+import label_stats
+import data_export
+import ingest
+import db_config  # DB 연결 설정 (DATABASE_URL, 연결 풀, SQLite PRAGMA)
+import db_backup
+import db_snapshots
 
 # ==================== 환경 설정 ====================
 
@@ -32,7 +39,7 @@ UPLOAD_FOLDER = 'uploads'
 BACKUP_DIR = 'database/backups'
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), DB_PATH)}"
+DATABASE_URI = db_config.configure_app(app, os.path.join(os.path.dirname(__file__), DB_PATH))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
@@ -43,7 +50,7 @@ UPLOAD_FOLDER_PATH = os.path.join(os.path.dirname(__file__), UPLOAD_FOLDER)
 # ==================== 환경 관리 ====================
 def show_environment_info():
     print(f"\n[환경 정보]")
-    print(f"  데이터베이스: {DB_PATH}")
+    print(f"  데이터베이스: {DB_PATH if db_config.is_sqlite(DATABASE_URI) else db_config.display_uri(DATABASE_URI)}")
     print(f"  업로드 폴더: {UPLOAD_FOLDER}")
     print(f"  백업 폴더: {BACKUP_DIR}")
 
@@ -52,15 +59,24 @@ def ensure_backup_dir():
     if not os.path.exists(BACKUP_DIR_PATH):
         os.makedirs(BACKUP_DIR_PATH)
 
-def create_backup(description=""):
+def create_backup(description="", compression=None):
+    if not db_config.is_sqlite(DATABASE_URI):
+        print("ℹ️ 외부 데이터베이스는 pg_dump 등 DB 서버의 백업 도구를 사용하세요.")
+        return None
     ensure_backup_dir()
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_filename = f"app_backup_{timestamp}.db"
     backup_path = os.path.join(BACKUP_DIR_PATH, backup_filename)
     current_db = os.path.join(os.path.dirname(__file__), DB_PATH)
     if os.path.exists(current_db):
-        shutil.copy2(current_db, backup_path)
-        print(f"✅ 백업 생성 완료: {backup_filename}")
+        # 실행 중인 웹 앱을 멈추지 않고 백업 API로 복사 후 무결성 검사까지 통과해야 백업으로 인정
+        try:
+            backup_path = db_backup.online_backup(current_db, backup_path, compression=compression)
+        except db_backup.BackupError as e:
+            print(f"❌ 백업 실패: {e}")
+            return None
+        print(f"✅ 백업 생성 완료: {os.path.basename(backup_path)} "
+              f"({os.path.getsize(backup_path)/1024/1024:.2f}MB, 무결성 검사 통과)")
         return backup_path
     else:
         print("❌ 현재 데이터베이스 파일을 찾을 수 없습니다.")
@@ -68,11 +84,14 @@ def create_backup(description=""):
 
 def list_backups():
     ensure_backup_dir()
-    return [f for f in os.listdir(BACKUP_DIR_PATH) if f.endswith('.db')]
+    return sorted(f for f in os.listdir(BACKUP_DIR_PATH) if db_backup.is_backup_file(f))
 
 def restore_backup(backup_filename):
     backup_path = os.path.join(BACKUP_DIR_PATH, backup_filename)
     current_db = os.path.join(os.path.dirname(__file__), DB_PATH)
+    if not db_config.is_sqlite(DATABASE_URI):
+        print("ℹ️ 외부 데이터베이스는 pg_restore 등 DB 서버의 복원 도구를 사용하세요.")
+        return False
     if not os.path.exists(backup_path):
         print(f"❌ 백업 파일을 찾을 수 없습니다: {backup_filename}")
         return False
@@ -80,37 +99,108 @@ def restore_backup(backup_filename):
     if confirm.lower() != 'yes':
         print("복원이 취소되었습니다.")
         return False
-    shutil.copy2(backup_path, current_db)
+    # 파일을 덮어쓰지 않고 백업 API로 복원 (압축 백업은 풀어서 무결성 검사 후 복원)
+    try:
+        db_backup.restore_online(backup_path, current_db)
+    except db_backup.BackupError as e:
+        print(f"❌ 복원 실패: {e}")
+        return False
     print(f"✅ 백업에서 복원 완료: {backup_filename}")
     return True
 
-# ==================== 데이터베이스 관리 기능 ====================
-def connect_database():
-    db_path = os.path.join(os.path.dirname(__file__), DB_PATH)
-    # SSH 환경에서 데이터베이스 권한 문제 해결
+# ==================== 증분 스냅샷 ====================
+def create_snapshot_backup():
+    """바뀐 페이지만 저장하는 증분 스냅샷 생성 후 보관 정책에 따라 정리"""
+    if not db_config.is_sqlite(DATABASE_URI):
+        print("ℹ️ 외부 데이터베이스는 DB 서버의 백업/PITR 기능(WAL 아카이브 등)을 사용하세요.")
+        return None
+    current_db = os.path.join(os.path.dirname(__file__), DB_PATH)
     try:
-        # 데이터베이스 파일이 존재하는지 확인
-        if os.path.exists(db_path):
-            # 파일 권한 확인 및 수정
-            import stat
-            current_permissions = os.stat(db_path).st_mode
-            if not (current_permissions & stat.S_IWRITE):
-                # 쓰기 권한이 없으면 추가
-                os.chmod(db_path, current_permissions | stat.S_IWRITE)
-                print(f"✅ 데이터베이스 파일 권한 수정: {db_path}")
-        
-        # 데이터베이스 디렉토리 권한 확인
-        db_dir = os.path.dirname(db_path)
-        if not os.path.exists(db_dir):
-            os.makedirs(db_dir, mode=0o755)
-            print(f"✅ 데이터베이스 디렉토리 생성: {db_dir}")
-        
-        return sqlite3.connect(db_path)
-    except Exception as e:
-        print(f"❌ 데이터베이스 연결 오류: {e}")
-        # 대체 방법: 메모리 데이터베이스 사용
-        print("⚠️ 메모리 데이터베이스를 사용합니다.")
-        return sqlite3.connect(':memory:')
+        snapshot = db_snapshots.create_snapshot(current_db)
+    except db_backup.BackupError as e:
+        print(f"❌ 스냅샷 생성 실패: {e}")
+        return None
+    changed_mb = snapshot['new_pages'] * snapshot['page_size'] / 1024 / 1024
+    print(f"✅ 스냅샷 생성 완료: {snapshot['name']} "
+          f"(전체 {snapshot['page_count']}페이지 중 {snapshot['new_pages']}페이지 저장, {changed_mb:.2f}MB)")
+    if snapshot['pruned']:
+        print(f"🧹 보관 기간이 지난 스냅샷 {len(snapshot['pruned'])}개 정리: {', '.join(snapshot['pruned'])}")
+    return snapshot
+
+def show_snapshots():
+    snapshots = db_snapshots.list_snapshots()
+    print("\n=== 증분 스냅샷 목록 ===")
+    if not snapshots:
+        print("스냅샷이 없습니다.")
+        return
+    for snapshot in snapshots:
+        print(f"{snapshot['created_at']}  {snapshot['name']}  "
+              f"(페이지 {snapshot['page_count']}개, 새로 저장 {snapshot['new_pages']}개)")
+    stats = db_snapshots.snapshot_stats()
+    print(f"💾 사용량: {stats['stored_bytes']/1024/1024:.2f}MB "
+          f"(전체 백업으로 보관했다면 {stats['full_bytes']/1024/1024:.2f}MB)")
+    print(f"📅 보관 정책: 시간별 {db_snapshots.SNAPSHOT_KEEP_HOURLY}개, "
+          f"일별 {db_snapshots.SNAPSHOT_KEEP_DAILY}개, 주별 {db_snapshots.SNAPSHOT_KEEP_WEEKLY}개")
+
+def restore_snapshot_backup(as_of=None, output_path=None, confirm=True):
+    """as_of 시각 기준 스냅샷으로 복원 (output_path를 지정하면 실행 중인 DB 대신 새 파일로)"""
+    if not db_config.is_sqlite(DATABASE_URI):
+        print("ℹ️ 외부 데이터베이스는 DB 서버의 백업/PITR 기능(WAL 아카이브 등)을 사용하세요.")
+        return False
+    snapshot = db_snapshots.find_snapshot(as_of)
+    if snapshot is None:
+        print("❌ 해당 시각 이전의 스냅샷이 없습니다.")
+        return False
+    print(f"📸 사용할 스냅샷: {snapshot['name']} ({snapshot['created_at']})")
+    if not output_path and confirm:
+        answer = input("실행 중인 DB를 이 스냅샷으로 덮어씁니다. 계속하시겠습니까? (yes를 입력하세요): ")
+        if answer.lower() != 'yes':
+            print("복원이 취소되었습니다.")
+            return False
+    current_db = os.path.join(os.path.dirname(__file__), DB_PATH)
+    try:
+        db_snapshots.restore_snapshot(current_db, as_of=as_of, output_path=output_path)
+    except db_backup.BackupError as e:
+        print(f"❌ 스냅샷 복원 실패: {e}")
+        return False
+    print(f"✅ 스냅샷 복원 완료: {output_path or DB_PATH}")
+    return True
+
+def parse_as_of(value):
+    """복원 기준 시각 (ISO 형식 날짜/시각, 로컬 시간)"""
+    return datetime.fromisoformat(value)
+
+# ==================== 데이터베이스 관리 기능 ====================
+def _is_missing_table(error):
+    """테이블이 없어서 난 오류인지 (SQLite: no such table, PostgreSQL: does not exist)"""
+    message = str(error)
+    return 'no such table' in message or 'does not exist' in message
+
+def query_users():
+    """(id, 사용자명, 이메일, 가입일) 목록"""
+    with app.app_context():
+        return db.session.execute(
+            db.select(User.id, User.username, User.email, User.created_at)
+        ).all()
+
+def query_files():
+    """(id, 파일명, 크기, 업로드일, 업로더) 목록"""
+    with app.app_context():
+        return db.session.execute(
+            db.select(File.id, File.filename, File.file_size, File.upload_date, User.username)
+            .join(User, File.uploaded_by == User.id)
+        ).all()
+
+def query_labels():
+    """(id, 사용자명, 파일명, 질환, 사진종류, 번호, 설명, 생성일) 목록 (최근 순)"""
+    with app.app_context():
+        return db.session.execute(
+            db.select(Label.id, User.username, File.filename, Label.disease, Label.view_type,
+                      Label.code, Label.description, Label.created_at)
+            .join(User, Label.user_id == User.id)
+            .join(File, Label.file_id == File.id)
+            .order_by(Label.created_at.desc())
+        ).all()
 
 def create_database_with_cascade():
     """CASCADE DELETE를 지원하는 새로운 데이터베이스 생성"""
@@ -123,7 +213,10 @@ def create_database_with_cascade():
             
             # 데이터베이스 삭제 후 재생성
             db_path = os.path.join(os.path.dirname(__file__), DB_PATH)
-            if os.path.exists(db_path):
+            if not db_config.is_sqlite(DATABASE_URI):
+                db.drop_all()
+                print("✅ 기존 테이블 삭제 완료")
+            elif os.path.exists(db_path):
                 os.remove(db_path)
                 print("✅ 기존 데이터베이스 삭제 완료")
             
@@ -143,20 +236,16 @@ def create_database_with_cascade():
             return False
 
 def view_all_users():
-    conn = connect_database()
-    cursor = conn.cursor()
-    
     print("=== 모든 사용자 정보 ===")
     try:
-        cursor.execute("SELECT id, username, email, created_at FROM user")
-        users = cursor.fetchall()
+        users = query_users()
         if users:
             for user in users:
                 print(f"ID: {user[0]}, 사용자명: {user[1]}, 이메일: {user[2]}, 가입일: {user[3]}")
         else:
             print("사용자가 없습니다.")
-    except sqlite3.OperationalError as e:
-        if "no such table" in str(e):
+    except (OperationalError, ProgrammingError) as e:
+        if _is_missing_table(e):
             print("❌ 사용자 테이블이 존재하지 않습니다.")
             print("데이터베이스가 초기화되지 않았습니다.")
             print("환경 전환을 다시 시도하거나 데이터베이스를 생성하세요.")
@@ -164,29 +253,19 @@ def view_all_users():
             print(f"❌ 데이터베이스 오류: {e}")
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
-    finally:
-        conn.close()
 
 def view_all_files():
-    conn = connect_database()
-    cursor = conn.cursor()
-    
     print("\n=== 모든 파일 정보 ===")
     try:
-        cursor.execute("""
-            SELECT f.id, f.filename, f.file_size, f.upload_date, u.username 
-            FROM file f 
-            JOIN user u ON f.uploaded_by = u.id
-        """)
-        files = cursor.fetchall()
+        files = query_files()
         if files:
             for file in files:
                 size_kb = file[2] / 1024 if file[2] else 0
                 print(f"ID: {file[0]}, 파일명: {file[1]}, 크기: {size_kb:.1f}KB, 업로드일: {file[3]}, 업로더: {file[4]}")
         else:
             print("파일이 없습니다.")
-    except sqlite3.OperationalError as e:
-        if "no such table" in str(e):
+    except (OperationalError, ProgrammingError) as e:
+        if _is_missing_table(e):
             print("❌ 파일 테이블이 존재하지 않습니다.")
             print("데이터베이스가 초기화되지 않았습니다.")
             print("환경 전환을 다시 시도하거나 데이터베이스를 생성하세요.")
@@ -194,8 +273,6 @@ def view_all_files():
             print(f"❌ 데이터베이스 오류: {e}")
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
-    finally:
-        conn.close()
 
 def add_sample_user():
     with app.app_context():
@@ -211,8 +288,18 @@ def add_sample_user():
         return new_user
 
 # ==================== 파일 업로드 기능 ====================
-def upload_files_from_folder(folder_path):
-    """지정된 폴더의 파일들을 데이터베이스에 업로드 (하위 폴더 재귀 처리, DICOM 변환 포함)"""
+def upload_files_from_folder(folder_path, workers=None, since=None):
+    """지정된 폴더의 파일들을 데이터베이스에 업로드 (하위 폴더 재귀 처리, DICOM 변환 포함)
+    
+    DICOM 변환과 썸네일 생성은 프로세스 풀에서 병렬로, DB 저장은 단일 기록 스레드에서 묶음 단위로 처리
+    업로드 매니페스트와 크기/수정 시각이 같은 파일은 다시 처리하지 않음
+    
+    Args:
+        folder_path: 업로드할 폴더 경로
+        workers: 변환 프로세스 수 (None이면 INGEST_WORKERS 환경변수, 기본 CPU 코어 수)
+        since: 기준 시각(epoch 초) 또는 'last'(마지막 업로드 시각).
+               수정 시각이 이보다 이전인 디렉토리의 파일은 확인하지 않음
+    """
     with app.app_context():
         # SSH 환경에서 데이터베이스 권한 문제 해결
         try:
@@ -234,131 +321,98 @@ def upload_files_from_folder(folder_path):
             os.makedirs(UPLOAD_FOLDER_PATH, mode=0o755)
             print(f"✅ 업로드 폴더를 생성했습니다: {UPLOAD_FOLDER_PATH}")
         
-        # 폴더 내 파일들 처리
-        allowed_extensions = {'.txt', '.jpg', '.jpeg', '.png', '.dcm'}
-        uploaded_count = 0
-        skipped_count = 0
+        if since == 'last':
+            since = ingest.last_scan_time()
+            if since is None:
+                print("ℹ️ 이전 업로드 기록이 없어 전체 폴더를 확인합니다.")
+        if since is not None:
+            print(f"🕒 {datetime.fromtimestamp(since).strftime('%Y-%m-%d %H:%M:%S')} 이후 변경된 디렉토리만 확인합니다.")
         
-        print(f"\n📁 폴더 '{folder_path}'에서 파일을 검색합니다...")
+        skipped = {'count': 0, 'unchanged': 0}
         
-        # 재귀적으로 모든 파일 찾기
-        for root, dirs, files in os.walk(folder_path):
-            # 상대 경로 계산
-            rel_root = os.path.relpath(root, folder_path)
-            if rel_root == '.':
-                rel_root = ''
-            
-            print(f"\n📂 하위 폴더: {rel_root if rel_root else '루트'}")
-            
-            for filename in files:
-                file_path = os.path.join(root, filename)
-                
-                # 파일 확장자 확인
-                file_ext = os.path.splitext(filename)[1].lower()
-                if file_ext not in allowed_extensions:
-                    print(f"  ⚠️  건너뜀: {filename} (지원되지 않는 확장자)")
-                    skipped_count += 1
-                    continue
-                
-                # 폴더 구조를 반영한 파일명 생성
-                if rel_root:
-                    db_filename = f"{rel_root}/{filename}"
-                else:
-                    db_filename = filename
-                
-                # 이미 데이터베이스에 존재하는지 확인
-                existing_file = File.query.filter_by(filename=db_filename).first()
-                if existing_file:
-                    print(f"  ⚠️  건너뜀: {db_filename} (이미 데이터베이스에 존재)")
-                    skipped_count += 1
-                    continue
-                
-                try:
-                    # 파일 크기 확인
-                    file_size = os.path.getsize(file_path)
-                    
-                    if file_ext == '.dcm':
-                        # DICOM 파일: PNG로 변환하여 환경별 uploads에 캐싱
-                        import pydicom
-                        from PIL import Image
-                        import numpy as np
-                        
-                        # PNG 파일명 생성 (폴더 구조 유지)
-                        png_filename = os.path.splitext(db_filename)[0] + '.png'
-                        png_path = os.path.join(UPLOAD_FOLDER_PATH, png_filename)
-                        
-                        # 업로드 폴더에 하위 폴더 구조 생성
-                        png_dir = os.path.dirname(png_path)
-                        if png_dir != UPLOAD_FOLDER_PATH and not os.path.exists(png_dir):
-                            os.makedirs(png_dir)
-                        
-                        # 이미 변환된 PNG가 있는지 확인
-                        if not os.path.exists(png_path):
-                            # DICOM 파일 읽기 및 PNG 변환
-                            ds = pydicom.dcmread(file_path)
-                            arr = ds.pixel_array
-                            
-                            # Normalize to 0-255 for display
-                            arr = arr.astype(float)
-                            arr = (arr - arr.min()) / (arr.max() - arr.min()) * 255.0
-                            arr = arr.astype(np.uint8)
-                            
-                            if arr.ndim == 2:
-                                img = Image.fromarray(arr)
-                            else:
-                                img = Image.fromarray(arr[0])
-                            
-                            # PNG로 저장
-                            img.save(png_path, format='PNG')
-                            print(f"  🔄 변환됨: {filename} -> {png_filename}")
-                        else:
-                            print(f"  📋 캐시 사용: {png_filename} (이미 변환됨)")
-                        
-                        # 데이터베이스에 PNG 파일 정보가 이미 있는지 확인
-                        existing_png = File.query.filter_by(filename=png_filename).first()
-                        if existing_png:
-                            print(f"  ⚠️  건너뜀: {png_filename} (이미 데이터베이스에 존재)")
-                            skipped_count += 1
-                            continue
-                        
-                        # 데이터베이스에 PNG 파일 정보 저장
-                        png_size = os.path.getsize(png_path)
-                        new_file = File(
-                            filename=png_filename,
-                            file_path=png_path,
-                            file_size=png_size,
-                            uploaded_by=admin_user.id
-                        )
-                        
-                        db.session.add(new_file)
-                        db.session.commit()
-                        
-                        print(f"  ✅ 등록됨: {png_filename} (DICOM 변환)")
-                        uploaded_count += 1
-                        
-                    else:
-                        # 일반 파일: 원본 경로 그대로 참조 (복사하지 않음)
-                        new_file = File(
-                            filename=db_filename,
-                            file_path=file_path,  # 원본 경로 그대로 사용
-                            file_size=file_size,
-                            uploaded_by=admin_user.id
-                        )
-                        
-                        db.session.add(new_file)
-                        db.session.commit()
-                        
-                        print(f"  ✅ 등록됨: {db_filename} (경로 참조)")
-                        uploaded_count += 1
-                    
-                except Exception as e:
-                    print(f"  ❌ 오류: {db_filename} - {str(e)}")
-                    db.session.rollback()
+        def skip(filename, reason):
+            print(f"  ⚠️  건너뜀: {filename} ({reason})")
+            skipped['count'] += 1
+        
+        def unchanged(task):
+            skipped['unchanged'] += 1
+        
+        def unchanged_dir(rel_root, file_count):
+            skipped['unchanged'] += file_count
+        
+        # 등록된 파일명과 매니페스트는 시작할 때 한 번만 읽어둠 (파일마다 DB를 조회하지 않음)
+        registered = ingest.registered_files()
+        manifest = ingest.load_manifest()
+        print(f"\n📁 폴더 '{folder_path}'에서 파일을 검색합니다... "
+              f"(등록된 파일 {len(registered)}개, 매니페스트 {len(manifest)}개)")
+        
+        tasks = ingest.iter_ingest_tasks(folder_path, UPLOAD_FOLDER_PATH, on_skip=skip,
+                                         since=since, on_unchanged_dir=unchanged_dir)
+        tasks = ingest.plan_ingest_tasks(tasks, registered, manifest, on_skip=skip, on_unchanged=unchanged)
+        counts = ingest.run_ingest(app, tasks, admin_user.id, workers=workers,
+                                   known_hashes=ingest.registered_hashes())
         
         print(f"\n📊 업로드 완료!")
-        print(f"   ✅ 성공: {uploaded_count}개 파일")
-        print(f"   ⚠️  건너뜀: {skipped_count}개 파일")
-        print(f"   📁 총 처리: {uploaded_count + skipped_count}개 파일")
+        print(f"   ✅ 성공: {counts['insert']}개 파일 (DICOM 변환 {counts['converted']}개, 썸네일 {counts['thumbnails']}개)")
+        if counts['update']:
+            print(f"   🔄 변경되어 다시 처리: {counts['update']}개 파일")
+        if counts['manifest']:
+            print(f"   📋 이미 등록됨 (매니페스트만 기록): {counts['manifest']}개 파일")
+        if counts['link']:
+            print(f"   🔗 내용 중복 (기존 파일로 연결): {counts['link']}개 파일")
+        print(f"   ⏭️  변경 없음: {skipped['unchanged']}개 파일")
+        print(f"   ⚠️  건너뜀: {skipped['count']}개 파일")
+        if counts['failed']:
+            print(f"   ❌ 실패: {counts['failed']}개 파일")
+        print(f"   💾 DB 저장: {counts['batches']}개 묶음 (묶음당 최대 {ingest.INGEST_BATCH_SIZE}행)")
+        total = (counts['insert'] + counts['update'] + counts['manifest'] + counts['link']
+                 + counts['failed'] + skipped['count'] + skipped['unchanged'])
+        print(f"   📁 총 처리: {total}개 파일")
+        if counts['elapsed'] > 0:
+            print(f"   ⏱️  {counts['elapsed']:.1f}초, {counts['files'] / counts['elapsed']:.1f} files/s, "
+                  f"{counts['bytes'] / counts['elapsed'] / 1024 / 1024:.1f} MB/s")
+
+def report_duplicate_files():
+    """내용 해시(SHA-256)가 같은 파일 보고서"""
+    with app.app_context():
+        try:
+            missing = File.query.filter(File.content_hash.is_(None)).count()
+            groups = ingest.find_duplicate_files()
+            
+            print("\n=== 내용 중복 파일 보고서 ===")
+            if missing:
+                print(f"⚠️ 내용 해시가 없는 파일 {missing}개는 비교하지 못했습니다 "
+                      f"(migrate_file_content_hash.py로 채울 수 있습니다).")
+            if not groups:
+                print("✅ 내용이 같은 파일이 없습니다.")
+                return groups
+            
+            # 파일별 라벨 수 (한 번의 GROUP BY로 조회)
+            file_ids = [file.id for _, files in groups for file in files]
+            label_counts = dict(db.session.query(Label.file_id, db.func.count(Label.id))
+                                .filter(Label.file_id.in_(file_ids))
+                                .group_by(Label.file_id).all())
+            
+            extra = sum(len(files) - 1 for _, files in groups)
+            wasted = sum((files[0].file_size or 0) * (len(files) - 1) for _, files in groups)
+            for content_hash, files in groups:
+                print(f"\n🔁 {content_hash[:12]}… ({len(files)}개)")
+                for file in files:
+                    print(f"   - ID {file.id}: {file.filename} (라벨 {label_counts.get(file.id, 0)}개)")
+            print(f"\n📊 중복 묶음 {len(groups)}개, 불필요한 파일 {extra}개 ({wasted / 1024 / 1024:.1f}MB)")
+            return groups
+        except Exception as e:
+            print(f"❌ 중복 파일 확인 중 오류 발생: {e}")
+            return []
+
+def parse_since(value):
+    """--since 값 변환: 'last' 그대로, epoch 초 또는 ISO 형식 날짜/시각(로컬 시간)은 epoch 초로"""
+    if value == 'last':
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
 
 # ==================== 데이터베이스 무결성 검증 ====================
 def verify_database_integrity():
@@ -375,15 +429,13 @@ def verify_database_integrity():
 
 # ==================== Excel Export 기능 ====================
 def export_to_excel():
-    """데이터베이스를 Excel 파일로 내보내기"""
+    """데이터베이스를 Excel 파일로 내보내기 (DB에서 스트리밍, 일정한 메모리 사용)"""
     try:
-        import pandas as pd
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, PatternFill
+        import openpyxl
     except ImportError:
         print("❌ Excel export를 위해 필요한 패키지가 설치되지 않았습니다.")
         print("다음 명령어로 설치하세요:")
-        print("pip install pandas openpyxl")
+        print("pip install openpyxl")
         return False
     
     with app.app_context():
@@ -396,82 +448,17 @@ def export_to_excel():
             print(f"📊 데이터베이스를 Excel로 내보내는 중...")
             print(f"파일: {excel_filename}")
             
-            # 1. 사용자 데이터 내보내기
-            users_data = []
-            users = User.query.all()
-            for user in users:
-                users_data.append({
-                    'ID': user.id,
-                    '사용자명': user.username,
-                    '이메일': user.email,
-                    '가입일': user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else ''
-                })
-            
-            # 2. 파일 데이터 내보내기
-            files_data = []
-            files = File.query.all()
-            for file in files:
-                size_kb = file.file_size / 1024 if file.file_size else 0
-                files_data.append({
-                    'ID': file.id,
-                    '파일명': file.filename,
-                    '파일경로': file.file_path,
-                    '크기(KB)': round(size_kb, 1),
-                    '업로드일': file.upload_date.strftime('%Y-%m-%d %H:%M:%S') if file.upload_date else '',
-                    '업로더ID': file.uploaded_by
-                })
-            
-            # 3. 라벨 데이터 내보내기
-            labels_data = []
-            labels = Label.query.all()
-            for label in labels:
-                labels_data.append({
-                    'ID': label.id,
-                    '사용자ID': label.user_id,
-                    '파일ID': label.file_id,
-                    '질환': label.disease,
-                    '사진종류': label.view_type,
-                    '코드': label.code,
-                    '설명': label.description,
-                    '생성일': label.created_at.strftime('%Y-%m-%d %H:%M:%S') if label.created_at else ''
-                })
+            def progress(rows_written):
+                print(f"  ... {rows_written}행 기록")
             
-            # Excel 파일 생성
-            with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-                # 사용자 시트
-                if users_data:
-                    df_users = pd.DataFrame(users_data)
-                    df_users.to_excel(writer, sheet_name='사용자', index=False)
-                
-                # 파일 시트
-                if files_data:
-                    df_files = pd.DataFrame(files_data)
-                    df_files.to_excel(writer, sheet_name='파일', index=False)
-                
-                # 라벨 시트
-                if labels_data:
-                    df_labels = pd.DataFrame(labels_data)
-                    df_labels.to_excel(writer, sheet_name='라벨', index=False)
-                
-                # 요약 시트
-                summary_data = {
-                    '항목': ['사용자', '파일', '라벨', '총 크기(KB)'],
-                    '개수': [
-                        len(users_data),
-                        len(files_data),
-                        len(labels_data),
-                        round(sum(f['크기(KB)'] for f in files_data), 1)
-                    ]
-                }
-                df_summary = pd.DataFrame(summary_data)
-                df_summary.to_excel(writer, sheet_name='요약', index=False)
+            counts = data_export.write_excel_export(excel_path, progress=progress)
             
             print(f"✅ Excel 파일이 생성되었습니다: {excel_filename}")
             print(f"📊 내보낸 데이터:")
-            print(f"  - 사용자: {len(users_data)}명")
-            print(f"  - 파일: {len(files_data)}개")
-            print(f"  - 라벨: {len(labels_data)}개")
-            print(f"  - 총 크기: {round(sum(f['크기(KB)'] for f in files_data), 1)}KB")
+            print(f"  - 사용자: {counts['users']}명")
+            print(f"  - 파일: {counts['files']}개")
+            print(f"  - 라벨: {counts['labels']}개")
+            print(f"  - 총 크기: {counts['total_size_kb']}KB")
             
             return True
             
@@ -479,76 +466,42 @@ def export_to_excel():
             print(f"❌ Excel 내보내기 중 오류 발생: {e}")
             return False
 
-def export_selected_data(data_type):
-    """선택한 데이터만 Excel로 내보내기"""
-    try:
-        import pandas as pd
-    except ImportError:
-        print("❌ Excel export를 위해 필요한 패키지가 설치되지 않았습니다.")
-        print("다음 명령어로 설치하세요:")
-        print("pip install pandas openpyxl")
-        return False
+def export_selected_data(data_type, fmt='xlsx'):
+    """선택한 데이터만 내보내기 (xlsx / csv / jsonl / parquet)"""
+    required = {'xlsx': 'openpyxl', 'parquet': 'pyarrow'}.get(fmt)
+    if required:
+        try:
+            __import__(required)
+        except ImportError:
+            print(f"❌ {fmt} export를 위해 필요한 패키지가 설치되지 않았습니다.")
+            print("다음 명령어로 설치하세요:")
+            print(f"pip install {required}")
+            return False
     
     with app.app_context():
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            excel_filename = f"{data_type}_export_{timestamp}.xlsx"
-            excel_path = os.path.join(os.path.dirname(__file__), excel_filename)
-            
-            if data_type == 'users':
-                users_data = []
-                users = User.query.all()
-                for user in users:
-                    users_data.append({
-                        'ID': user.id,
-                        '사용자명': user.username,
-                        '이메일': user.email,
-                        '가입일': user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else ''
-                    })
-                df = pd.DataFrame(users_data)
-                sheet_name = '사용자'
-                
-            elif data_type == 'files':
-                files_data = []
-                files = File.query.all()
-                for file in files:
-                    size_kb = file.file_size / 1024 if file.file_size else 0
-                    files_data.append({
-                        'ID': file.id,
-                        '파일명': file.filename,
-                        '파일경로': file.file_path,
-                        '크기(KB)': round(size_kb, 1),
-                        '업로드일': file.upload_date.strftime('%Y-%m-%d %H:%M:%S') if file.upload_date else '',
-                        '업로더ID': file.uploaded_by
-                    })
-                df = pd.DataFrame(files_data)
-                sheet_name = '파일'
-                
-            elif data_type == 'labels':
-                labels_data = []
-                labels = Label.query.all()
-                for label in labels:
-                    labels_data.append({
-                        'ID': label.id,
-                        '사용자ID': label.user_id,
-                        '파일ID': label.file_id,
-                        '질환': label.disease,
-                        '사진종류': label.view_type,
-                        '코드': label.code,
-                        '설명': label.description,
-                        '생성일': label.created_at.strftime('%Y-%m-%d %H:%M:%S') if label.created_at else ''
-                    })
-                df = pd.DataFrame(labels_data)
-                sheet_name = '라벨'
+            ext = data_export.EXPORT_FORMATS[fmt][1]
+            export_filename = f"{data_type}_export_{timestamp}.{ext}"
+            export_path = os.path.join(os.path.dirname(__file__), export_filename)
             
-            df.to_excel(excel_path, sheet_name=sheet_name, index=False)
-            print(f"✅ {sheet_name} 데이터가 Excel로 내보내졌습니다: {excel_filename}")
+            sheet_name = data_export.EXPORT_SHEETS[data_type][0]
+            rows = data_export.write_export(export_path, fmt, data_type)
+            print(f"✅ {sheet_name} 데이터가 {fmt}로 내보내졌습니다: {export_filename} ({rows}행)")
             return True
             
         except Exception as e:
-            print(f"❌ Excel 내보내기 중 오류 발생: {e}")
+            print(f"❌ {fmt} 내보내기 중 오류 발생: {e}")
             return False
 
+def export_all_data(fmt='xlsx'):
+    """전체 데이터 내보내기 (xlsx는 시트별 파일 하나, 그 외 형식은 데이터 종류별 파일)"""
+    if fmt == 'xlsx':
+        return export_to_excel()
+    # csv/jsonl/parquet는 파일 하나에 한 종류만 담을 수 있으므로 종류마다 따로 저장
+    results = [export_selected_data(data_type, fmt) for data_type in data_export.EXPORT_SHEETS]
+    return all(results)
+
 # ==================== 데이터베이스 뷰어 기능 ====================
 def open_console_database_viewer():
     """콘솔 기반 데이터베이스 뷰어"""
@@ -585,70 +538,49 @@ def open_console_database_viewer():
 
 def view_all_labels():
     """모든 라벨링 정보 조회"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    
     print("\n=== 모든 라벨링 정보 ===")
     try:
-        cursor.execute("""
-            SELECT l.id, u.username, f.filename, l.disease, l.view_type, l.code, l.description, l.created_at
-            FROM label l
-            JOIN user u ON l.user_id = u.id
-            JOIN file f ON l.file_id = f.id
-            ORDER BY l.created_at DESC
-        """)
-        labels = cursor.fetchall()
+        labels = query_labels()
         if labels:
             print(f"{'ID':<4} {'사용자':<10} {'파일명':<20} {'질환':<15} {'사진종류':<8} {'번호':<8} {'설명':<30} {'생성일':<20}")
             print("-" * 120)
             for label in labels:
-                print(f"{label[0]:<4} {label[1]:<10} {label[2]:<20} {label[3]:<15} {label[4]:<8} {label[5]:<8} {label[6]:<30} {label[7]:<20}")
+                print(f"{label[0]:<4} {label[1]:<10} {label[2]:<20} {label[3]:<15} {label[4]:<8} {label[5]:<8} {label[6]:<30} {str(label[7]):<20}")
         else:
             print("라벨링 정보가 없습니다.")
-    except sqlite3.OperationalError as e:
-        if "no such table" in str(e):
+    except (OperationalError, ProgrammingError) as e:
+        if _is_missing_table(e):
             print("❌ 라벨 테이블이 존재하지 않습니다.")
         else:
             print(f"❌ 데이터베이스 오류: {e}")
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
-    finally:
-        conn.close()
 
 def show_database_stats():
     """데이터베이스 통계 정보"""
-    conn = connect_database()
-    cursor = conn.cursor()
-    
     print("\n=== 데이터베이스 통계 ===")
     try:
-        # 사용자 수
-        cursor.execute("SELECT COUNT(*) FROM user")
-        user_count = cursor.fetchone()[0]
-        
-        # 파일 수
-        cursor.execute("SELECT COUNT(*) FROM file")
-        file_count = cursor.fetchone()[0]
-        
-        # 라벨 수
-        cursor.execute("SELECT COUNT(*) FROM label")
-        label_count = cursor.fetchone()[0]
-        
-        # 파일 크기 합계
-        cursor.execute("SELECT SUM(file_size) FROM file")
-        total_size = cursor.fetchone()[0] or 0
+        with app.app_context():
+            # 사용자 수
+            user_count = db.session.scalar(db.select(func.count(User.id)))
+            
+            # 파일 수 / 파일 크기 합계
+            file_count, total_size = db.session.execute(
+                db.select(func.count(File.id), func.coalesce(func.sum(File.file_size), 0))
+            ).one()
+            
+            # 라벨 수
+            label_count = db.session.scalar(db.select(func.count(Label.id)))
         
         print(f"👥 사용자 수: {user_count}명")
         print(f"📁 파일 수: {file_count}개")
         print(f"🏷️ 라벨 수: {label_count}개")
         print(f"💾 총 파일 크기: {total_size/1024/1024:.2f}MB")
         
-    except sqlite3.OperationalError as e:
+    except (OperationalError, ProgrammingError) as e:
         print(f"❌ 데이터베이스 오류: {e}")
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
-    finally:
-        conn.close()
 
 def refresh_all_data():
     """모든 데이터 새로고침"""
@@ -699,9 +631,6 @@ def open_gui_database_viewer():
             self.root.title("데이터베이스 뷰어")
             self.root.geometry("1200x800")
             
-            # 데이터베이스 경로
-            self.db_path = os.path.join(os.path.dirname(__file__), DB_PATH)
-            
             # 탭 생성
             self.notebook = ttk.Notebook(root)
             self.notebook.pack(fill='both', expand=True, padx=10, pady=10)
@@ -808,22 +737,13 @@ def open_gui_database_viewer():
         def load_users(self):
             """사용자 데이터 로드"""
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
                 # 기존 데이터 삭제
                 for item in self.users_tree.get_children():
                     self.users_tree.delete(item)
                 
-                # 사용자 데이터 조회
-                cursor.execute("SELECT id, username, email, created_at FROM user")
-                users = cursor.fetchall()
-                
                 # 트리뷰에 데이터 추가
-                for user in users:
-                    self.users_tree.insert('', 'end', values=user)
-                
-                conn.close()
+                for user in query_users():
+                    self.users_tree.insert('', 'end', values=tuple(user))
                 
             except Exception as e:
                 messagebox.showerror("오류", f"사용자 데이터 로드 실패: {str(e)}")
@@ -831,58 +751,30 @@ def open_gui_database_viewer():
         def load_files(self):
             """파일 데이터 로드"""
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
                 # 기존 데이터 삭제
                 for item in self.files_tree.get_children():
                     self.files_tree.delete(item)
                 
-                # 파일 데이터 조회
-                cursor.execute("""
-                    SELECT f.id, f.filename, f.file_size, f.upload_date, u.username 
-                    FROM file f 
-                    JOIN user u ON f.uploaded_by = u.id
-                """)
-                files = cursor.fetchall()
-                
                 # 트리뷰에 데이터 추가
-                for file in files:
+                for file in query_files():
                     size_kb = file[2] / 1024 if file[2] else 0
                     self.files_tree.insert('', 'end', values=(
                         file[0], file[1], f"{size_kb:.1f}", file[3], file[4]
                     ))
                 
-                conn.close()
-                
             except Exception as e:
                 messagebox.showerror("오류", f"파일 데이터 로드 실패: {str(e)}")
 
         def load_labels(self):
             """라벨링 데이터 로드"""
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
                 # 기존 데이터 삭제
                 for item in self.labels_tree.get_children():
                     self.labels_tree.delete(item)
                 
-                # 라벨링 데이터 조회
-                cursor.execute("""
-                    SELECT l.id, u.username, f.filename, l.disease, l.view_type, l.code, l.description, l.created_at
-                    FROM label l
-                    JOIN user u ON l.user_id = u.id
-                    JOIN file f ON l.file_id = f.id
-                    ORDER BY l.created_at DESC
-                """)
-                labels = cursor.fetchall()
-                
                 # 트리뷰에 데이터 추가
-                for label in labels:
-                    self.labels_tree.insert('', 'end', values=label)
-                
-                conn.close()
+                for label in query_labels():
+                    self.labels_tree.insert('', 'end', values=tuple(label))
                 
             except Exception as e:
                 messagebox.showerror("오류", f"라벨링 데이터 로드 실패: {str(e)}")
@@ -935,7 +827,8 @@ def delete_file_by_id(file_id):
                     os.remove(file.file_path)
                     print(f"✅ 실제 파일 삭제: {file.file_path}")
                 
-                # 데이터베이스에서 삭제 (CASCADE DELETE로 관련 라벨도 자동 삭제)
+                # 데이터베이스에서 삭제 (CASCADE DELETE로 관련 라벨도 자동 삭제, 통계에서도 제외)
+                label_stats.remove_labels_for_files([file.id])
                 db.session.delete(file)
                 db.session.commit()
                 print(f"✅ 파일 {file.filename}이(가) 삭제되었습니다.")
@@ -1014,7 +907,8 @@ def delete_multiple_files_by_ids(file_ids):
                         os.remove(file.file_path)
                         print(f"✅ 실제 파일 삭제: {file.file_path}")
                     
-                    # 데이터베이스에서 삭제 (CASCADE DELETE로 관련 라벨도 자동 삭제)
+                    # 데이터베이스에서 삭제 (CASCADE DELETE로 관련 라벨도 자동 삭제, 통계에서도 제외)
+                    label_stats.remove_labels_for_files([file.id])
                     db.session.delete(file)
                     deleted_count += 1
                     deleted_labels += label_count
@@ -1067,7 +961,114 @@ def list_files_for_deletion():
             print(f"❌ 파일 목록 조회 중 오류: {e}")
             return []
 
+# ==================== 렌더링 캐시 관리 ====================
+def prewarm_render_cache():
+    """데이터베이스에 등록된 DICOM 파일들을 미리 렌더링하여 캐시에 저장
+
+    - .dcm으로 등록된 파일: 기본 렌더링 (/api/files/<id>/image)
+    - PNG로 변환되어 등록된 파일: 업로드 매니페스트의 원본 DICOM에 윈도우 프리셋 적용 (get_image와 같은 원본 사용)
+    """
+    with app.app_context():
+        files = File.query.all()
+        sources = ingest.dicom_source_paths()
+    dicom_paths = [
+        file.file_path for file in files
+        if file.filename.lower().endswith('.dcm') and os.path.exists(file.file_path)
+    ]
+    # 같은 원본이 여러 파일로 연결될 수 있으므로 중복 제거
+    source_paths = sorted({
+        sources[file.id] for file in files
+        if not file.filename.lower().endswith('.dcm') and file.id in sources
+    })
+    
+    if not dicom_paths and not source_paths:
+        print("ℹ️ 캐시할 DICOM 파일이 없습니다.")
+        return
+    
+    def progress_for(paths):
+        def progress(i, path):
+            if i % 50 == 0 or i == len(paths):
+                print(f"  ... {i}/{len(paths)}")
+        return progress
+    
+    results = []
+    if dicom_paths:
+        print(f"🔄 DICOM 파일 {len(dicom_paths)}개를 렌더링 캐시에 저장합니다...")
+        results.append(image_cache.prewarm(dicom_paths, progress=progress_for(dicom_paths)))
+    if source_paths:
+        presets = ', '.join(dicom_render.WINDOW_PRESETS)
+        print(f"🔄 PNG로 변환된 파일의 원본 DICOM {len(source_paths)}개에 윈도우 프리셋({presets})을 렌더링합니다...")
+        results.append(image_cache.prewarm(source_paths, progress=progress_for(source_paths),
+                                           windows=list(dicom_render.WINDOW_PRESETS.values())))
+    rendered, skipped, failed = (sum(counts) for counts in zip(*results))
+    print(f"✅ 캐시 준비 완료: 새로 렌더링 {rendered}개, 이미 캐시됨 {skipped}개, 실패 {failed}개")
+    show_render_cache_stats()
+
+def purge_render_cache():
+    """렌더링 캐시 전체 삭제"""
+    confirm = input("렌더링 캐시를 모두 삭제하시겠습니까? (yes를 입력하세요): ")
+    if confirm.lower() != 'yes':
+        print("삭제가 취소되었습니다.")
+        return
+    removed = image_cache.purge()
+    print(f"✅ 캐시 파일 {removed}개를 삭제했습니다.")
+
+def show_render_cache_stats():
+    """렌더링 캐시 상태 출력"""
+    stats = image_cache.get_stats()
+    print(f"\n[렌더링 캐시]")
+    print(f"  위치: {image_cache.RENDER_CACHE_DIR}")
+    print(f"  크기: {stats['size_bytes']/1024/1024:.1f}MB / {stats['max_bytes']/1024/1024:.0f}MB")
+    print(f"  적중: {stats['hits']}회, 실패: {stats['misses']}회 (적중률 {stats['hit_rate']*100:.1f}%)")
+    print(f"  삭제(LRU): {stats['evictions']}개")
+
+# ==================== 라벨 통계 관리 ====================
+def rebuild_label_stats():
+    """label_stats 요약 테이블을 처음부터 다시 계산하고 실제 라벨 데이터와 일치하는지 검증"""
+    with app.app_context():
+        try:
+            # label_stats 테이블이 없으면 생성 (기존 테이블은 그대로 유지)
+            db.create_all()
+            
+            mismatches = label_stats.verify_label_stats()
+            if mismatches:
+                print(f"⚠️ 현재 통계와 실제 라벨 데이터가 {len(mismatches)}개 항목에서 다릅니다:")
+                for user_id, metric, stored, actual in mismatches[:20]:
+                    scope = '전체' if user_id == label_stats.GLOBAL_SCOPE else f'사용자 {user_id}'
+                    print(f"   - [{scope}] {metric}: 저장됨 {stored} / 실제 {actual}")
+                if len(mismatches) > 20:
+                    print(f"   ... 외 {len(mismatches) - 20}개")
+            else:
+                print("✅ 현재 통계가 실제 라벨 데이터와 일치합니다.")
+            
+            row_count = label_stats.rebuild_label_stats()
+            print(f"✅ 통계 재계산 완료: {row_count}개 항목")
+            
+            mismatches = label_stats.verify_label_stats()
+            if mismatches:
+                print(f"❌ 재계산 후에도 {len(mismatches)}개 항목이 일치하지 않습니다.")
+                return False
+            print("✅ 재계산된 통계 검증 완료")
+            return True
+        except Exception as e:
+            print(f"❌ 통계 재계산 중 오류 발생: {e}")
+            return False
+
 # ==================== 메뉴 업데이트 ====================
+def choose_export_format():
+    """내보내기 형식 선택 (잘못 선택하면 None)"""
+    print("\n형식을 선택하세요:")
+    print("1. Excel (xlsx)")
+    print("2. CSV (질환 원-핫 컬럼)")
+    print("3. JSONL (질환 리스트)")
+    print("4. Parquet (질환 리스트, 타입 지정 컬럼)")
+    format_choice = input("선택하세요 (1-4, 기본 1): ").strip() or '1'
+    formats = {'1': 'xlsx', '2': 'csv', '3': 'jsonl', '4': 'parquet'}
+    if format_choice not in formats:
+        print("잘못된 선택입니다.")
+        return None
+    return formats[format_choice]
+
 def main():
     while True:
         print("\n" + "="*50)
@@ -1080,20 +1081,31 @@ def main():
         print("5. 백업 목록 조회")
         print("6. 백업에서 복원")
         print("7. 무결성 검증")
-        print("8. Excel로 전체 데이터 내보내기")
-        print("9. Excel로 선택 데이터 내보내기")
+        print("8. 전체 데이터 내보내기 (Excel/CSV/JSONL/Parquet)")
+        print("9. 선택 데이터 내보내기 (Excel/CSV/JSONL/Parquet)")
         print("10. SQLite 뷰어 열기 (GUI/콘솔)")
         print("11. 파일 삭제")
         print("12. CASCADE DELETE 지원 DB 생성")
-        print("13. 종료")
-        choice = input("\n선택하세요 (1-13): ")
+        print("13. 렌더링 캐시 관리")
+        print("14. 라벨 통계 재계산 및 검증")
+        print("15. 내용 중복 파일 보고서")
+        print("16. 증분 스냅샷 (생성/목록/시점 복원)")
+        print("17. 종료")
+        choice = input("\n선택하세요 (1-17): ")
         if choice == '1':
             view_all_users()
         elif choice == '2':
             view_all_files()
         elif choice == '3':
             folder_path = input("업로드할 폴더 경로를 입력하세요: ")
-            upload_files_from_folder(folder_path)
+            workers = input(f"변환 워커 수를 입력하세요 (기본 {ingest.INGEST_WORKERS}): ").strip()
+            since = input("변경 확인 기준 시각 (예: 2025-07-01 09:00, last=마지막 업로드 이후, 빈칸=전체 확인): ").strip()
+            try:
+                since = parse_since(since) if since else None
+            except ValueError:
+                print("잘못된 시각 형식입니다. 전체 폴더를 확인합니다.")
+                since = None
+            upload_files_from_folder(folder_path, workers=int(workers) if workers.isdigit() else None, since=since)
         elif choice == '4':
             create_backup()
         elif choice == '5':
@@ -1115,21 +1127,22 @@ def main():
         elif choice == '7':
             verify_database_integrity()
         elif choice == '8':
-            export_to_excel()
+            fmt = choose_export_format()
+            if fmt:
+                export_all_data(fmt)
         elif choice == '9':
             print("\n내보낼 데이터를 선택하세요:")
             print("1. 사용자 데이터")
             print("2. 파일 데이터")
             print("3. 라벨 데이터")
             data_choice = input("선택하세요 (1-3): ")
-            if data_choice == '1':
-                export_selected_data('users')
-            elif data_choice == '2':
-                export_selected_data('files')
-            elif data_choice == '3':
-                export_selected_data('labels')
-            else:
+            data_types = {'1': 'users', '2': 'files', '3': 'labels'}
+            if data_choice not in data_types:
                 print("잘못된 선택입니다.")
+                continue
+            fmt = choose_export_format()
+            if fmt:
+                export_selected_data(data_types[data_choice], fmt)
         elif choice == '10':
             open_database_viewer()
         elif choice == '11':
@@ -1171,10 +1184,105 @@ def main():
             else:
                 print("작업이 취소되었습니다.")
         elif choice == '13':
+            print("\n=== 렌더링 캐시 관리 ===")
+            print("1. 캐시 미리 생성 (DICOM 전체)")
+            print("2. 캐시 비우기")
+            print("3. 캐시 상태 보기")
+            cache_choice = input("선택하세요 (1-3): ")
+            if cache_choice == '1':
+                prewarm_render_cache()
+            elif cache_choice == '2':
+                purge_render_cache()
+            elif cache_choice == '3':
+                show_render_cache_stats()
+            else:
+                print("잘못된 선택입니다.")
+        elif choice == '14':
+            rebuild_label_stats()
+        elif choice == '15':
+            report_duplicate_files()
+        elif choice == '16':
+            print("\n=== 증분 스냅샷 ===")
+            print("1. 스냅샷 생성")
+            print("2. 스냅샷 목록")
+            print("3. 특정 시각으로 복원")
+            snapshot_choice = input("선택하세요 (1-3): ")
+            if snapshot_choice == '1':
+                create_snapshot_backup()
+            elif snapshot_choice == '2':
+                show_snapshots()
+            elif snapshot_choice == '3':
+                as_of = input("복원 기준 시각 (예: 2025-07-01 09:00, 빈칸=최신): ").strip()
+                try:
+                    restore_snapshot_backup(parse_as_of(as_of) if as_of else None)
+                except ValueError:
+                    print("잘못된 시각 형식입니다.")
+            else:
+                print("잘못된 선택입니다.")
+        elif choice == '17':
             print("프로그램을 종료합니다.")
             break
         else:
             print("올바른 선택을 해주세요.")
 
+def run_cli(argv):
+    """명령행 실행 (인자 없이 실행하면 대화형 메뉴)"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='통합 데이터베이스 관리 도구 (인자 없이 실행하면 메뉴)')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    upload_parser = subparsers.add_parser('upload', help='폴더에서 파일 업로드 (바뀐 파일만 처리)')
+    upload_parser.add_argument('folder', help='업로드할 폴더 경로')
+    upload_parser.add_argument('--workers', type=int, default=None,
+                               help=f'변환 워커 수 (기본 {ingest.INGEST_WORKERS})')
+    upload_parser.add_argument('--since', type=parse_since, default=None,
+                               help="이 시각 이후 수정된 디렉토리만 확인 (epoch 초, ISO 날짜/시각, 또는 'last')")
+    
+    subparsers.add_parser('duplicates', help='내용(SHA-256)이 같은 파일 보고서')
+    
+    export_parser = subparsers.add_parser('export', help='데이터 내보내기 (Excel/CSV/JSONL/Parquet)')
+    export_parser.add_argument('--type', choices=['all'] + list(data_export.EXPORT_SHEETS), default='all',
+                               help='내보낼 데이터 종류 (기본 all: xlsx는 전체 시트, 그 외 형식은 종류별 파일)')
+    export_parser.add_argument('--format', choices=list(data_export.EXPORT_FORMATS), default='xlsx',
+                               help='파일 형식 (기본 xlsx)')
+    
+    backup_parser = subparsers.add_parser('backup', help='실행 중인 DB를 온라인 백업 (cron 등에서 사용)')
+    backup_parser.add_argument('--compress', choices=['gzip', 'zstd'], default=None,
+                               help=f"압축 방식 (기본: BACKUP_COMPRESSION={db_backup.BACKUP_COMPRESSION or '없음'})")
+    
+    subparsers.add_parser('snapshot', help='바뀐 페이지만 저장하는 증분 스냅샷 생성 및 보관 정책 정리 (cron 등에서 사용)')
+    
+    restore_parser = subparsers.add_parser('restore-snapshot', help='특정 시각 기준 스냅샷으로 복원')
+    restore_parser.add_argument('--at', type=parse_as_of, default=None,
+                                help='복원 기준 시각 (ISO 날짜/시각, 기본: 최신 스냅샷)')
+    restore_parser.add_argument('--output', default=None,
+                                help='실행 중인 DB 대신 이 파일로 복원 (확인/감사용)')
+    restore_parser.add_argument('--yes', action='store_true', help='확인 없이 실행 중인 DB에 복원')
+    
+    args = parser.parse_args(argv)
+    if args.command == 'upload':
+        upload_files_from_folder(args.folder, workers=args.workers, since=args.since)
+    elif args.command == 'duplicates':
+        report_duplicate_files()
+    elif args.command == 'export':
+        if args.type == 'all':
+            success = export_all_data(args.format)
+        else:
+            success = export_selected_data(args.type, args.format)
+        if not success:
+            sys.exit(1)
+    elif args.command == 'backup':
+        if not create_backup(compression=args.compress):
+            sys.exit(1)
+    elif args.command == 'snapshot':
+        if not create_snapshot_backup():
+            sys.exit(1)
+    elif args.command == 'restore-snapshot':
+        if not restore_snapshot_backup(args.at, output_path=args.output, confirm=not args.yes):
+            sys.exit(1)
+    else:
+        main()
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    run_cli(sys.argv[1:])
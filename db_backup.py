@@ -0,0 +1,186 @@
+"""
+SQLite 온라인 백업/복원
+- 파일 복사(shutil.copy2) 대신 SQLite 백업 API(sqlite3.Connection.backup)로 페이지 단위 복사
+  → 웹 앱이 쓰는 중에도 깨지지 않은 백업이 만들어지고, 복사하는 동안 서버가 계속 응답
+- WAL 모드에서는 원본에 읽기 트랜잭션 하나를 유지하여 모든 단계가 같은 시점(스냅샷)을 복사
+  (WAL에서는 읽기 트랜잭션이 쓰기를 막지 않음)
+- 임시 파일에 복사 → PRAGMA integrity_check 통과 후 압축(선택) → 최종 이름으로 변경
+- gzip(표준 라이브러리) / zstd(zstandard 패키지가 설치된 경우) 압축 지원
+"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+# 백업 설정 (환경변수로 변경 가능)
+BACKUP_PAGES_PER_STEP = int(os.environ.get('BACKUP_PAGES_PER_STEP', '1024'))  # 한 단계에 복사할 페이지 수
+BACKUP_STEP_PAUSE_MS = int(os.environ.get('BACKUP_STEP_PAUSE_MS', '0'))  # 단계 사이 쉬는 시간 (디스크 부하 조절)
+BACKUP_COMPRESSION = os.environ.get('BACKUP_COMPRESSION', '').lower()  # '', 'gzip', 'zstd'
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+BACKUP_SUFFIXES = ('.db', '.db.gz', '.db.zst')
+
+
+class BackupError(Exception):
+    """백업 생성/검증/복원 실패"""
+
+
+def is_backup_file(filename):
+    return filename.endswith(BACKUP_SUFFIXES)
+
+
+def integrity_check(db_path):
+    """PRAGMA integrity_check 결과가 'ok'면 None, 아니면 오류 메시지 목록"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = [row[0] for row in conn.execute('PRAGMA integrity_check')]
+    except sqlite3.DatabaseError as e:
+        # 헤더가 손상되면 검사 자체가 실패함
+        return [str(e)]
+    finally:
+        conn.close()
+    return None if rows == ['ok'] else rows
+
+
+def _copy_pages(source, target, pages, pause, progress=None):
+    """source 연결의 main DB를 target 연결로 페이지 단위 복사"""
+    journal_mode = source.execute('PRAGMA journal_mode').fetchone()[0].lower()
+    hold_snapshot = journal_mode == 'wal'
+    if hold_snapshot:
+        # 읽기 트랜잭션을 먼저 열어 두면 단계 사이에 다른 연결이 커밋해도 백업이 처음부터 다시 시작되지 않음
+        source.execute('BEGIN')
+        source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+
+    def on_step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+        if pause and remaining:
+            time.sleep(pause)
+
+    try:
+        source.backup(target, pages=pages, progress=on_step)
+    finally:
+        if hold_snapshot:
+            source.execute('COMMIT')
+
+
+def _compress(path, compression):
+    """path를 압축한 파일 경로 반환 (원본은 삭제)"""
+    compressed = path + COMPRESSION_SUFFIXES[compression]
+    with open(path, 'rb') as src:
+        if compression == 'gzip':
+            with gzip.open(compressed, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+        else:
+            with open(compressed, 'wb') as raw:
+                with zstandard.ZstdCompressor(level=10, threads=-1).stream_writer(raw) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.remove(path)
+    return compressed
+
+
+def _decompress_to(path, target_path):
+    """압축된 백업을 target_path로 풀기 (압축이 아니면 복사)"""
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rb') as src, open(target_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    elif path.endswith('.zst'):
+        if zstandard is None:
+            raise BackupError("zstd 백업을 풀려면 zstandard 패키지가 필요합니다 (pip install zstandard)")
+        with open(path, 'rb') as raw, open(target_path, 'wb') as dst:
+            with zstandard.ZstdDecompressor().stream_reader(raw) as src:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+    else:
+        shutil.copyfile(path, target_path)
+
+
+def online_backup(db_path, backup_path, compression=None, pages=None, pause_ms=None, progress=None):
+    """실행 중인 DB를 백업 API로 복사하고 검증한 뒤 (압축하여) backup_path에 저장
+
+    Args:
+        backup_path: 압축하지 않은 .db 경로 (압축하면 .gz / .zst가 붙음)
+        compression: '', 'gzip', 'zstd' (None이면 BACKUP_COMPRESSION)
+        progress: progress(복사한 페이지 수, 전체 페이지 수) 콜백
+
+    Returns:
+        최종 백업 파일 경로
+
+    Raises:
+        BackupError: 원본이 없거나, 검증에 실패했거나, 압축 방식을 사용할 수 없을 때
+    """
+    compression = BACKUP_COMPRESSION if compression is None else compression
+    pages = BACKUP_PAGES_PER_STEP if pages is None else pages
+    pause_ms = BACKUP_STEP_PAUSE_MS if pause_ms is None else pause_ms
+    if compression and compression not in COMPRESSION_SUFFIXES:
+        raise BackupError(f"지원하지 않는 압축 방식입니다: {compression}")
+    if compression == 'zstd' and zstandard is None:
+        raise BackupError("zstd 압축을 사용하려면 zstandard 패키지가 필요합니다 (pip install zstandard)")
+    if not os.path.exists(db_path):
+        raise BackupError(f"데이터베이스 파일을 찾을 수 없습니다: {db_path}")
+
+    backup_dir = os.path.dirname(os.path.abspath(backup_path))
+    os.makedirs(backup_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.backup_', suffix='.db', dir=backup_dir)
+    os.close(fd)
+    try:
+        source = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        target = sqlite3.connect(tmp_path)
+        try:
+            _copy_pages(source, target, pages, pause_ms / 1000, progress)
+            # 백업 파일 하나만으로 열 수 있도록 WAL이 아닌 일반 저널 모드로 저장
+            target.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            target.close()
+            source.close()
+
+        errors = integrity_check(tmp_path)
+        if errors:
+            raise BackupError(f"백업 무결성 검사 실패: {'; '.join(errors[:5])}")
+
+        final_tmp = _compress(tmp_path, compression) if compression else tmp_path
+        final_path = backup_path + (COMPRESSION_SUFFIXES[compression] if compression else '')
+        os.replace(final_tmp, final_path)
+        return final_path
+    finally:
+        for leftover in (tmp_path, tmp_path + '.gz', tmp_path + '.zst'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+def restore_online(backup_path, db_path, pages=None, progress=None):
+    """백업 파일(.db / .db.gz / .db.zst)을 검증한 뒤 백업 API로 실행 중인 DB에 덮어씀
+
+    파일을 덮어쓰지 않고 SQLite 연결을 통해 복원하므로 WAL/잠금 상태가 꼬이지 않으며,
+    열려 있는 다른 연결은 다음 트랜잭션부터 복원된 데이터를 봄
+
+    Raises:
+        BackupError: 백업 파일이 손상되었을 때
+    """
+    pages = BACKUP_PAGES_PER_STEP if pages is None else pages
+    db_dir = os.path.dirname(os.path.abspath(db_path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.restore_', suffix='.db', dir=db_dir)
+    os.close(fd)
+    try:
+        _decompress_to(backup_path, tmp_path)
+        errors = integrity_check(tmp_path)
+        if errors:
+            raise BackupError(f"백업 무결성 검사 실패: {'; '.join(errors[:5])}")
+
+        source = sqlite3.connect(tmp_path)
+        target = sqlite3.connect(db_path, timeout=30)
+        try:
+            source.backup(target, pages=pages, progress=(lambda s, r, t: progress(t - r, t)) if progress else None)
+        finally:
+            target.close()
+            source.close()
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,177 @@
+"""
+데이터베이스 연결 설정
+- DATABASE_URL 환경변수로 DB 선택 (없으면 database/app.db SQLite, PostgreSQL 예: postgresql://user:pw@host/labeling)
+- PostgreSQL 연결 풀 설정 (pool_size, max_overflow, pool_recycle, pool_pre_ping)
+- DB 종류에 맞는 upsert(INSERT ... ON CONFLICT DO UPDATE) 문 생성 (SQLite / PostgreSQL)
+- 마이그레이션 스크립트용 엔진/백업 도우미
+- SQLite 연결이 만들어질 때마다 PRAGMA 적용 (SQLAlchemy 엔진 connect 이벤트, 환경변수로 변경 가능)
+  - journal_mode=WAL: 긴 읽기(내보내기 등)가 쓰기(add_label)를 막지 않고, 쓰기도 읽기를 막지 않음
+  - synchronous=NORMAL: WAL에서는 커밋마다 fsync하지 않아도 손상되지 않음 (전원 장애 시 마지막 커밋만 잃을 수 있음)
+  - busy_timeout: 쓰기가 겹치면 바로 "database is locked" 오류 대신 잠시 기다림
+  - cache_size / mmap_size: 페이지 캐시와 메모리 매핑 읽기 크기
+  - foreign_keys=ON: 외래 키 제약과 ON DELETE CASCADE 적용
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+
+from sqlalchemy import event, create_engine, inspect
+from sqlalchemy.engine import Engine, make_url
+
+import db_backup
+
+# 외부 DB 연결 풀 설정 (SQLite에는 적용하지 않음, 환경변수로 변경 가능)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '1800'))  # 초, 방화벽/서버가 끊은 오래된 연결 교체
+# 날짜 컬럼은 시간대 없이 한국 시간으로 저장하므로 PostgreSQL 세션 시간대도 맞춤
+DB_TIMEZONE = os.environ.get('DB_TIMEZONE', 'Asia/Seoul')
+
+
+def database_uri(default_sqlite_path):
+    """DATABASE_URL 환경변수, 없으면 기본 SQLite 파일 경로의 URI"""
+    uri = os.environ.get('DATABASE_URL')
+    if not uri:
+        return f"sqlite:///{os.path.abspath(default_sqlite_path)}"
+    # 일부 호스팅의 postgres:// 형식은 SQLAlchemy가 인식하지 못함
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def sqlite_path(uri):
+    """SQLite 파일 경로 (SQLite가 아니면 None)"""
+    return make_url(uri).database if is_sqlite(uri) else None
+
+
+def display_uri(uri):
+    """로그/화면 출력용 URI (비밀번호 가림)"""
+    return make_url(uri).render_as_string(hide_password=True)
+
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS (SQLite는 기본값 사용)"""
+    if is_sqlite(uri):
+        return {}
+    options = {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': True,  # 끊긴 연결을 사용하기 전에 확인하여 교체
+    }
+    if make_url(uri).get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c timezone={DB_TIMEZONE}'}
+    return options
+
+
+def configure_app(app, default_sqlite_path):
+    """Flask 앱에 DB URI와 엔진 옵션 설정 (db.init_app 전에 호출)"""
+    uri = database_uri(default_sqlite_path)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri)
+    return uri
+
+
+def dialect_insert(table):
+    """현재 DB 종류의 INSERT 문 (on_conflict_do_update / excluded 사용 가능, SQLite와 PostgreSQL 동일한 사용법)"""
+    from user import db
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+# SQLite PRAGMA 설정 (환경변수로 변경 가능)
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_CACHE_SIZE_MB = int(os.environ.get('SQLITE_CACHE_SIZE_MB', '64'))
+SQLITE_MMAP_SIZE_MB = int(os.environ.get('SQLITE_MMAP_SIZE_MB', '256'))
+SQLITE_FOREIGN_KEYS = os.environ.get('SQLITE_FOREIGN_KEYS', '1').lower() in ('1', 'true', 'yes', 'on')
+
+
+def sqlite_pragmas():
+    """적용할 PRAGMA 목록 [(이름, 값)]"""
+    return [
+        ('journal_mode', SQLITE_JOURNAL_MODE),
+        ('synchronous', SQLITE_SYNCHRONOUS),
+        ('busy_timeout', SQLITE_BUSY_TIMEOUT_MS),
+        ('cache_size', -SQLITE_CACHE_SIZE_MB * 1024),  # 음수 = KiB 단위
+        ('mmap_size', SQLITE_MMAP_SIZE_MB * 1024 * 1024),
+        ('foreign_keys', 'ON' if SQLITE_FOREIGN_KEYS else 'OFF'),
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection):
+    """sqlite3 연결에 PRAGMA 적용 (journal_mode는 트랜잭션 밖에서만 바뀌므로 연결 직후 호출)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # 모든 엔진에 등록되므로 SQLite 연결에만 적용
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        apply_sqlite_pragmas(dbapi_connection)
+
+
+# ==================== 마이그레이션 스크립트 도우미 ====================
+def migration_uri():
+    """마이그레이션 스크립트가 사용할 DB (앱과 같은 DATABASE_URL, 없으면 database/app.db)
+
+    기본 경로는 현재 디렉토리가 아닌 이 파일 위치 기준 (다른 곳에서 실행해도 같은 DB 사용)
+    """
+    return database_uri(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'app.db'))
+
+
+def migration_engine(uri):
+    """마이그레이션 스크립트용 엔진 (SQLite면 위의 PRAGMA도 적용됨)"""
+    return create_engine(uri, **engine_options(uri))
+
+
+def column_names(conn, table):
+    return {column['name'] for column in inspect(conn).get_columns(table)}
+
+
+def index_names(conn, table):
+    inspector = inspect(conn)
+    names = {index['name'] for index in inspector.get_indexes(table)}
+    # PostgreSQL에서는 유니크 제약이 인덱스 목록이 아닌 제약 목록에 나올 수 있음
+    names.update(constraint['name'] for constraint in inspector.get_unique_constraints(table))
+    return names
+
+
+def backup_for_migration(uri):
+    """마이그레이션 전 백업 (SQLite: database/ 아래 온라인 백업, 그 외: pg_dump 등으로 직접 백업하도록 안내)
+
+    Returns:
+        계속 진행해도 되면 True
+    """
+    if not is_sqlite(uri):
+        print(f"ℹ️ {make_url(uri).get_backend_name()} 데이터베이스입니다. "
+              f"마이그레이션 전에 pg_dump 등으로 백업했는지 확인하세요.")
+        return True
+
+    db_path = sqlite_path(uri)
+    backup_path = os.path.join(os.path.dirname(db_path), f'app_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.db')
+    try:
+        # 백업 API로 복사하고 무결성 검사를 통과한 백업만 인정
+        backup_path = db_backup.online_backup(db_path, backup_path)
+        print(f"✅ 데이터베이스 백업 생성: {backup_path}")
+        return True
+    except Exception as e:
+        print(f"⚠️ 백업 생성 실패: {e}")
+        return False
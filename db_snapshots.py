@@ -0,0 +1,318 @@
+"""
+SQLite 증분 스냅샷 (페이지 해시 매니페스트)
+- 스냅샷마다 DB 전체를 복사하지 않고, 이전 스냅샷에 없던 페이지만 저장
+  1. db_backup.online_backup으로 일관된 임시 복사본을 만들고 무결성 검사
+  2. 페이지 단위로 SHA-256(앞 16바이트)을 계산해 pages.bin에 순서대로 기록 (페이지 목록 = DB 전체)
+  3. 기존 스냅샷들의 팩에 없는 페이지만 zlib 압축하여 새 팩(.pack)과 인덱스(.idx)에 저장
+- 특정 시각 기준 복원: 그 시각 이전의 가장 최근 스냅샷 페이지들을 모아 DB를 다시 만든 뒤
+  페이지 해시와 PRAGMA integrity_check로 검증하고 백업 API로 복원
+- 보관 정책(시간별/일별/주별 개수)에 따라 스냅샷 생성 후 자동 정리
+  (지워지는 스냅샷의 팩에만 있던 페이지는 남는 스냅샷으로 옮긴 뒤 삭제)
+
+디렉토리 구조:
+    snapshots/
+        snap_20250701_090000/
+            manifest.json   # 생성 시각, 페이지 크기/개수, 새로 저장한 페이지 수
+            pages.bin       # 페이지 순서대로 16바이트 해시
+            pages.pack      # 새 페이지 (zlib 압축)
+            pages.idx       # 팩 인덱스: 해시(16) + 위치(8) + 길이(4)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import zlib
+from datetime import datetime, timedelta
+
+import db_backup
+from db_backup import BackupError
+
+# 스냅샷 설정 (환경변수로 변경 가능)
+SNAPSHOT_DIR = os.environ.get(
+    'SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'backups', 'snapshots')
+)
+SNAPSHOT_KEEP_HOURLY = int(os.environ.get('SNAPSHOT_KEEP_HOURLY', '24'))  # 최근 N시간은 시간마다 하나
+SNAPSHOT_KEEP_DAILY = int(os.environ.get('SNAPSHOT_KEEP_DAILY', '7'))  # 최근 N일은 하루에 하나
+SNAPSHOT_KEEP_WEEKLY = int(os.environ.get('SNAPSHOT_KEEP_WEEKLY', '8'))  # 최근 N주는 한 주에 하나
+SNAPSHOT_COMPRESS_LEVEL = int(os.environ.get('SNAPSHOT_COMPRESS_LEVEL', '6'))
+
+DIGEST_SIZE = 16
+INDEX_RECORD = struct.Struct('>16sQI')  # 해시, 팩 내 위치, 압축된 길이
+SNAPSHOT_PREFIX = 'snap_'
+NAME_FORMAT = '%Y%m%d_%H%M%S'
+
+
+def _snapshot_root(root=None):
+    return os.path.abspath(root or SNAPSHOT_DIR)
+
+
+def page_digest(page):
+    return hashlib.sha256(page).digest()[:DIGEST_SIZE]
+
+
+def list_snapshots(root=None):
+    """스냅샷 매니페스트 목록 (오래된 순, 만드는 중이던 스냅샷은 제외)"""
+    root = _snapshot_root(root)
+    if not os.path.isdir(root):
+        return []
+    snapshots = []
+    for name in os.listdir(root):
+        manifest_path = os.path.join(root, name, 'manifest.json')
+        if name.startswith(SNAPSHOT_PREFIX) and os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            manifest['path'] = os.path.join(root, name)
+            snapshots.append(manifest)
+    return sorted(snapshots, key=lambda m: m['created_at'])
+
+
+def _read_pages(snapshot):
+    """스냅샷의 페이지 해시 목록"""
+    with open(os.path.join(snapshot['path'], 'pages.bin'), 'rb') as f:
+        data = f.read()
+    return [data[i:i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+
+def _read_index(idx_path):
+    with open(idx_path, 'rb') as f:
+        data = f.read()
+    return [INDEX_RECORD.unpack_from(data, i) for i in range(0, len(data), INDEX_RECORD.size)]
+
+
+def _page_locations(snapshots):
+    """해시 → (팩 경로, 위치, 길이) (주어진 스냅샷들의 모든 팩)"""
+    locations = {}
+    for snapshot in snapshots:
+        for name in sorted(os.listdir(snapshot['path'])):
+            if name.endswith('.idx'):
+                pack_path = os.path.join(snapshot['path'], name[:-len('.idx')] + '.pack')
+                for digest, offset, length in _read_index(os.path.join(snapshot['path'], name)):
+                    locations.setdefault(digest, (pack_path, offset, length))
+    return locations
+
+
+def _write_pack(directory, name, pages):
+    """(해시, 페이지) 목록을 name.pack / name.idx로 저장"""
+    with open(os.path.join(directory, name + '.pack'), 'wb') as pack, \
+            open(os.path.join(directory, name + '.idx'), 'wb') as idx:
+        for digest, page in pages:
+            data = zlib.compress(page, SNAPSHOT_COMPRESS_LEVEL)
+            idx.write(INDEX_RECORD.pack(digest, pack.tell(), len(data)))
+            pack.write(data)
+
+
+def _read_page(location):
+    pack_path, offset, length = location
+    with open(pack_path, 'rb') as f:
+        f.seek(offset)
+        return zlib.decompress(f.read(length))
+
+
+def create_snapshot(db_path, root=None, prune=True, now=None):
+    """증분 스냅샷 생성 (이전 스냅샷들에 없는 페이지만 저장) 후 보관 정책에 따라 정리
+
+    Returns:
+        새 스냅샷 매니페스트 (new_pages: 새로 저장한 페이지 수, pruned: 정리된 스냅샷 이름 목록)
+    """
+    root = _snapshot_root(root)
+    now = now or datetime.now()
+    os.makedirs(root, exist_ok=True)
+
+    name = SNAPSHOT_PREFIX + now.strftime(NAME_FORMAT)
+    suffix = 1
+    while os.path.exists(os.path.join(root, name)):
+        name = f"{SNAPSHOT_PREFIX}{now.strftime(NAME_FORMAT)}_{suffix}"
+        suffix += 1
+
+    known = _page_locations(list_snapshots(root))
+    work_dir = tempfile.mkdtemp(prefix='.snap_', dir=root)
+    try:
+        # 일관된 복사본 (백업 API + 무결성 검사)
+        copy_path = db_backup.online_backup(db_path, os.path.join(work_dir, 'copy.db'), compression='')
+        page_size = _page_size(copy_path)
+
+        new_pages = []
+        seen = set()
+        page_count = 0
+        with open(copy_path, 'rb') as src, open(os.path.join(work_dir, 'pages.bin'), 'wb') as pages_bin:
+            while True:
+                page = src.read(page_size)
+                if not page:
+                    break
+                digest = page_digest(page)
+                pages_bin.write(digest)
+                page_count += 1
+                if digest not in known and digest not in seen:
+                    seen.add(digest)
+                    new_pages.append((digest, page))
+        os.remove(copy_path)
+
+        _write_pack(work_dir, 'pages', new_pages)
+        manifest = {
+            'name': name,
+            'created_at': now.isoformat(timespec='seconds'),
+            'page_size': page_size,
+            'page_count': page_count,
+            'new_pages': len(new_pages),
+        }
+        # 매니페스트를 마지막에 써야 목록에 나타남 (중간에 실패한 스냅샷은 무시됨)
+        with open(os.path.join(work_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.rename(work_dir, os.path.join(root, name))
+    except Exception:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+    manifest['path'] = os.path.join(root, name)
+    manifest['pruned'] = prune_snapshots(root, now=now) if prune else []
+    return manifest
+
+
+def _page_size(db_path):
+    with open(db_path, 'rb') as f:
+        header = f.read(100)
+    page_size = struct.unpack('>H', header[16:18])[0]
+    return 65536 if page_size == 1 else page_size
+
+
+def select_retained(snapshots, now=None, hourly=None, daily=None, weekly=None):
+    """보관할 스냅샷 이름 집합 (시간/일/주 구간마다 가장 최근 스냅샷 하나, 최신 스냅샷은 항상 보관)"""
+    hourly = SNAPSHOT_KEEP_HOURLY if hourly is None else hourly
+    daily = SNAPSHOT_KEEP_DAILY if daily is None else daily
+    weekly = SNAPSHOT_KEEP_WEEKLY if weekly is None else weekly
+    now = now or datetime.now()
+    if not snapshots:
+        return set()
+
+    keep = {snapshots[-1]['name']}
+    rules = [
+        (hourly, timedelta(hours=hourly), lambda t: t.strftime('%Y%m%d%H')),
+        (daily, timedelta(days=daily), lambda t: t.strftime('%Y%m%d')),
+        (weekly, timedelta(weeks=weekly), lambda t: t.isocalendar()[:2]),
+    ]
+    for count, window, bucket_of in rules:
+        if count <= 0:
+            continue
+        buckets = set()
+        for snapshot in reversed(snapshots):  # 최신 순
+            created_at = datetime.fromisoformat(snapshot['created_at'])
+            if now - created_at >= window:
+                break
+            bucket = bucket_of(created_at)
+            if bucket not in buckets:
+                buckets.add(bucket)
+                keep.add(snapshot['name'])
+    return keep
+
+
+def prune_snapshots(root=None, now=None):
+    """보관 정책에 맞지 않는 스냅샷 삭제
+
+    삭제할 스냅샷의 팩에만 있고 남는 스냅샷이 사용하는 페이지는
+    남는 스냅샷 중 가장 오래된 것에 carry_<이름>.pack으로 옮긴 뒤 삭제
+
+    Returns:
+        삭제한 스냅샷 이름 목록
+    """
+    snapshots = list_snapshots(root)
+    keep = select_retained(snapshots, now=now)
+    kept = [s for s in snapshots if s['name'] in keep]
+    dropped = [s for s in snapshots if s['name'] not in keep]
+    if not dropped:
+        return []
+
+    referenced = set()
+    for snapshot in kept:
+        referenced.update(_read_pages(snapshot))
+    available = _page_locations(kept)
+    dropped_locations = _page_locations(dropped)
+    oldest_kept = kept[0]
+
+    for snapshot in dropped:
+        carry = [
+            (digest, _read_page(dropped_locations[digest]))
+            for digest in sorted(referenced - set(available))
+            if dropped_locations.get(digest, ('',))[0].startswith(snapshot['path'] + os.sep)
+        ]
+        if carry:
+            _write_pack(oldest_kept['path'], f"carry_{snapshot['name']}", carry)
+            available.update((digest, None) for digest, _ in carry)
+        shutil.rmtree(snapshot['path'])
+    return [s['name'] for s in dropped]
+
+
+def find_snapshot(as_of=None, root=None):
+    """as_of 시각 이전의 가장 최근 스냅샷 (as_of가 없으면 최신), 없으면 None"""
+    snapshots = list_snapshots(root)
+    if as_of is not None:
+        snapshots = [s for s in snapshots if datetime.fromisoformat(s['created_at']) <= as_of]
+    return snapshots[-1] if snapshots else None
+
+
+def rebuild_snapshot(snapshot, target_path, root=None):
+    """스냅샷 페이지들로 DB 파일을 다시 만들고 검증
+
+    Raises:
+        BackupError: 페이지가 없거나 해시/무결성 검사가 맞지 않을 때
+    """
+    locations = _page_locations(list_snapshots(root))
+    with open(target_path, 'wb') as f:
+        for number, digest in enumerate(_read_pages(snapshot), 1):
+            if digest not in locations:
+                raise BackupError(f"{snapshot['name']}: {number}번 페이지를 찾을 수 없습니다")
+            page = _read_page(locations[digest])
+            if page_digest(page) != digest:
+                raise BackupError(f"{snapshot['name']}: {number}번 페이지 해시가 맞지 않습니다")
+            f.write(page)
+    errors = db_backup.integrity_check(target_path)
+    if errors:
+        raise BackupError(f"스냅샷 무결성 검사 실패: {'; '.join(errors[:5])}")
+
+
+def restore_snapshot(db_path, as_of=None, root=None, output_path=None):
+    """as_of 시각 기준 스냅샷으로 복원
+
+    Args:
+        output_path: 지정하면 실행 중인 DB 대신 이 파일로 복원 (확인/감사용)
+
+    Returns:
+        복원에 사용한 스냅샷 매니페스트
+
+    Raises:
+        BackupError: 해당 시각 이전 스냅샷이 없거나 검증에 실패했을 때
+    """
+    snapshot = find_snapshot(as_of, root)
+    if snapshot is None:
+        raise BackupError("해당 시각 이전의 스냅샷이 없습니다")
+
+    if output_path:
+        rebuild_snapshot(snapshot, output_path, root)
+        return snapshot
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.snapshot_', suffix='.db', dir=os.path.dirname(os.path.abspath(db_path)))
+    os.close(fd)
+    try:
+        rebuild_snapshot(snapshot, tmp_path, root)
+        db_backup.restore_online(tmp_path, db_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return snapshot
+
+
+def snapshot_stats(root=None):
+    """스냅샷 개수와 디스크 사용량 / 스냅샷을 모두 전체 백업으로 했을 때의 크기"""
+    snapshots = list_snapshots(root)
+    stored = 0
+    for snapshot in snapshots:
+        for name in os.listdir(snapshot['path']):
+            stored += os.path.getsize(os.path.join(snapshot['path'], name))
+    return {
+        'snapshots': len(snapshots),
+        'stored_bytes': stored,
+        'full_bytes': sum(s['page_size'] * s['page_count'] for s in snapshots),
+    }
@@ -0,0 +1,284 @@
+"""
+DICOM → 8비트 표시용 영상 변환 (image_cache와 폴더 업로드가 함께 사용)
+- 저장값 → Modality LUT(RescaleSlope/Intercept 또는 Modality LUT Sequence) → VOI(WindowCenter/Width 또는 VOI LUT Sequence)
+- MONOCHROME1은 밝기를 반전
+- 정수 영상은 가능한 모든 저장값(최대 65536개)에 대해 uint8 LUT를 한 번 만든 뒤 인덱싱만 하므로
+  영상 크기만큼의 float64 배열을 만들지 않음 (결과 uint8 배열 하나만 할당)
+- 정수 LUT를 쓸 수 없는 영상(실수/32비트)은 float32 배열 하나에서 제자리 연산
+- 값이 모두 같은 영상도 0으로 나누지 않음
+- 디코딩(decode_dicom)과 윈도우 적용(apply_window)을 나누어, 디코딩한 배열을 재사용하면
+  윈도우를 바꿀 때 DICOM을 다시 읽지 않고 LUT만 다시 적용
+"""
+
+import numpy as np
+
+# 렌더링 결과가 바뀌면 올려서 디스크 캐시에 남은 이전 결과를 사용하지 않도록 함
+RENDER_VERSION = 2
+
+# 정수 LUT를 만들 최대 저장값 비트 수 (16비트 = LUT 65536개 항목)
+MAX_LUT_BITS = 16
+
+# 윈도우 프리셋 (WindowCenter, WindowWidth) - Modality LUT 적용 후 값(CT는 HU) 기준
+WINDOW_PRESETS = {
+    'lung': (-600.0, 1500.0),
+    'mediastinum': (50.0, 350.0),
+    'abdomen': (40.0, 400.0),
+}
+
+# 윈도우 적용에 필요한 태그 (디코딩 후 픽셀 데이터 없이 이 태그만 보관)
+_META_KEYWORDS = (
+    'SamplesPerPixel', 'PhotometricInterpretation', 'NumberOfFrames',
+    'BitsAllocated', 'BitsStored', 'PixelRepresentation',
+    'RescaleSlope', 'RescaleIntercept', 'ModalityLUTSequence',
+    'WindowCenter', 'WindowWidth', 'VOILUTFunction', 'VOILUTSequence',
+)
+
+
+def _voi_lut_sequence_lut(values, ds):
+    """VOI LUT Sequence를 LUT 정의역 값에 적용하여 0-1 범위로 반환"""
+    try:
+        from pydicom.pixels import apply_voi
+    except ImportError:  # pydicom 2.x
+        from pydicom.pixel_data_handlers.util import apply_voi
+
+    item = ds.VOILUTSequence[0]
+    bits = item.LUTDescriptor[2]
+    mapped = apply_voi(np.rint(values).astype(np.int64), ds, index=0)
+    return mapped.astype(np.float32) / float(2 ** bits - 1)
+
+
+def _modality(values, ds):
+    """저장값에 Modality LUT 적용 (LUT 정의역이나 float32 배열에 사용)"""
+    if 'ModalityLUTSequence' in ds:
+        try:
+            from pydicom.pixels import apply_modality_lut
+        except ImportError:  # pydicom 2.x
+            from pydicom.pixel_data_handlers.util import apply_modality_lut
+        # LUT는 정수 저장값으로 인덱싱
+        return apply_modality_lut(np.rint(values).astype(np.int64), ds).astype(np.float32)
+
+    slope = float(ds.get('RescaleSlope', 1) or 1)
+    intercept = float(ds.get('RescaleIntercept', 0) or 0)
+    if slope != 1:
+        values *= np.float32(slope)
+    if intercept != 0:
+        values += np.float32(intercept)
+    return values
+
+
+def first_window(ds):
+    """DICOM 태그의 첫 번째 (WindowCenter, WindowWidth), 없으면 None"""
+    center = ds.get('WindowCenter')
+    width = ds.get('WindowWidth')
+    if center is None or width is None:
+        return None
+    # 값이 여러 개(MultiValue)면 첫 번째 사용
+    if not isinstance(center, (int, float)):
+        center = center[0]
+    if not isinstance(width, (int, float)):
+        width = width[0]
+    return float(center), float(width)
+
+
+def _apply_window(values, center, width, function='LINEAR'):
+    """Modality 적용 값을 제자리에서 0-1 범위로 변환 (DICOM PS3.3 C.11.2.1.2)"""
+    if function == 'SIGMOID':
+        values -= np.float32(center)
+        values *= np.float32(-4.0 / max(width, 1e-6))
+        np.clip(values, -80.0, 80.0, out=values)  # float32 exp 오버플로 방지
+        np.exp(values, out=values)
+        values += np.float32(1.0)
+        np.reciprocal(values, out=values)
+        return values
+
+    if function == 'LINEAR_EXACT':
+        width = max(width, 1e-6)
+        values -= np.float32(center - width / 2)
+        values *= np.float32(1.0 / width)
+    elif width <= 1:
+        # 폭이 1 이하인 LINEAR 윈도우는 중심값 기준 이진화
+        np.greater(values, center - 0.5, out=values, casting='unsafe')
+        return values
+    else:
+        values -= np.float32(center - 0.5 - (width - 1) / 2)
+        values *= np.float32(1.0 / (width - 1))
+    np.clip(values, 0.0, 1.0, out=values)
+    return values
+
+
+def _voi(values, ds, window, value_range):
+    """Modality 적용 값을 제자리에서 0-1 범위로 변환
+
+    Args:
+        window: (center, width) 직접 지정, None이면 VOI LUT Sequence → 태그의 윈도우 → 최소/최대 순으로 사용
+        value_range: 영상 실제 값의 (최소, 최대) - 윈도우 정보가 없을 때 사용
+
+    Returns:
+        0-1 범위 값, VOI LUT Sequence를 적용해야 하면 None
+    """
+    if window is None:
+        if 'VOILUTSequence' in ds:
+            # pydicom과 같이 VOI LUT Sequence를 윈도우 태그보다 우선 사용
+            return None
+        window = first_window(ds)
+    if window is not None:
+        function = str(ds.get('VOILUTFunction', 'LINEAR')).upper()
+        return _apply_window(values, window[0], window[1], function)
+
+    return _stretch(values, *value_range)
+
+
+def _stretch(values, lo, hi):
+    """최소/최대 범위를 제자리에서 0-1로 늘림"""
+    if hi <= lo:
+        # 값이 모두 같은 영상: 0으로 나누지 않고 검은 영상으로 표시
+        values[...] = 0
+        return values
+    values -= np.float32(lo)
+    values *= np.float32(1.0 / (hi - lo))
+    np.clip(values, 0.0, 1.0, out=values)
+    return values
+
+
+def _to_uint8(unit, invert):
+    """0-1 범위 값을 0-255 uint8로 변환 (MONOCHROME1이면 반전)"""
+    if invert:
+        np.subtract(np.float32(1.0), unit, out=unit)
+    unit *= np.float32(255.0)
+    unit += np.float32(0.5)
+    return unit.astype(np.uint8)
+
+
+def _select_frame(arr, ds, frame):
+    samples = int(ds.get('SamplesPerPixel', 1) or 1)
+    frames = int(ds.get('NumberOfFrames', 1) or 1)
+    if frames > 1 or (samples == 1 and arr.ndim == 3):
+        return arr[min(frame, arr.shape[0] - 1)]
+    return arr
+
+
+def build_lut(ds, arr, window=None):
+    """정수 저장값 → uint8 표시값 LUT 생성
+
+    Returns:
+        (lut, 인덱스 배열) - lut[인덱스 배열]이 변환 결과
+        인덱스 배열은 원본을 그대로 보거나(view) uint16으로 재해석한 것이라 복사하지 않음
+    """
+    if arr.dtype == np.uint8:
+        domain = np.arange(256, dtype=np.float32)
+        index = arr
+    elif arr.dtype == np.uint16:
+        domain = np.arange(2 ** 16, dtype=np.float32)
+        index = arr
+    else:
+        # int8/int16: 같은 크기의 부호 없는 정수로 재해석하여 음수 저장값도 LUT 인덱스로 사용
+        bits = arr.dtype.itemsize * 8
+        unsigned = np.dtype(f'uint{bits}')
+        domain = np.arange(2 ** bits, dtype=np.int64)
+        domain[domain >= 2 ** (bits - 1)] -= 2 ** bits
+        domain = domain.astype(np.float32)
+        index = arr.view(unsigned)
+
+    lo, hi = float(arr.min()), float(arr.max())
+    domain = _modality(domain, ds)
+    # 최소/최대 스트레칭은 영상에 실제로 있는 값 범위 기준 (Modality 적용 후 값, 기울기가 음수일 수 있음)
+    bounds = _modality(np.array([lo, hi], dtype=np.float32), ds)
+    value_range = (float(bounds.min()), float(bounds.max()))
+
+    unit = _voi(domain, ds, window, value_range)
+    if unit is None:
+        unit = _voi_lut_sequence_lut(domain, ds)
+    invert = str(ds.get('PhotometricInterpretation', '')).upper() == 'MONOCHROME1'
+    return _to_uint8(unit, invert), index
+
+
+def resolve_window(preset=None, center=None, width=None):
+    """프리셋 이름 또는 (center, width)로 윈도우 결정
+
+    Returns:
+        (center, width), 아무것도 지정하지 않으면 None
+
+    Raises:
+        ValueError: 알 수 없는 프리셋이거나 center/width 중 하나만 있거나 width가 0 이하인 경우
+    """
+    if preset:
+        try:
+            return WINDOW_PRESETS[preset.lower()]
+        except KeyError:
+            raise ValueError(f"알 수 없는 윈도우 프리셋입니다: {preset} (가능: {', '.join(WINDOW_PRESETS)})")
+    if center is None and width is None:
+        return None
+    if center is None or width is None:
+        raise ValueError("윈도우는 center와 width를 함께 지정해야 합니다.")
+    center, width = float(center), float(width)
+    if not np.isfinite(center) or not np.isfinite(width) or width <= 0:
+        raise ValueError("윈도우 width는 0보다 큰 유한한 값이어야 합니다.")
+    return center, width
+
+
+def decode_dicom(ds, frame=0):
+    """DICOM 픽셀 디코딩 (윈도우 적용 전 저장값)
+
+    Returns:
+        (저장값 배열, 메타데이터 Dataset) - 메타데이터에는 픽셀 데이터 없이 윈도우 적용에 필요한 태그만 복사
+    """
+    from pydicom.dataset import Dataset
+
+    arr = _select_frame(ds.pixel_array, ds, frame)
+    meta = Dataset()
+    for keyword in _META_KEYWORDS:
+        if keyword in ds:
+            meta.add(ds.data_element(keyword))
+    if hasattr(ds, 'file_meta'):
+        # VOI/Modality LUT Sequence의 LUTData 해석(엔디언)에 필요
+        meta.file_meta = ds.file_meta
+    return arr, meta
+
+
+def apply_window(arr, meta=None, window=None):
+    """디코딩된 저장값 배열을 8비트 표시용 배열로 변환 (원본 배열은 바꾸지 않음)
+
+    Args:
+        arr: decode_dicom이 반환한 저장값 배열 (일반 8비트 영상 배열도 가능)
+        meta: decode_dicom이 반환한 메타데이터, None이면 태그 없는 MONOCHROME2 영상으로 취급
+        window: (WindowCenter, WindowWidth) 직접 지정, None이면 DICOM 태그 사용 (없으면 최소/최대)
+
+    Returns:
+        uint8 numpy 배열 (컬러 영상이면 (행, 열, 3))
+    """
+    if meta is None:
+        from pydicom.dataset import Dataset
+        meta = Dataset()
+
+    if int(meta.get('SamplesPerPixel', 1) or 1) > 1 or arr.ndim == 3:
+        # 컬러 영상은 윈도우를 적용하지 않음
+        if arr.dtype == np.uint8:
+            return arr
+        values = arr.astype(np.float32)
+        return _to_uint8(_stretch(values, float(values.min()), float(values.max())), False)
+
+    if arr.dtype.kind in 'iu' and arr.dtype.itemsize * 8 <= MAX_LUT_BITS:
+        lut, index = build_lut(meta, arr, window)
+        return lut[index]
+
+    # 실수/32비트 영상: float32 배열 하나에서 제자리 연산
+    values = _modality(arr.astype(np.float32), meta)
+    unit = _voi(values, meta, window, (float(values.min()), float(values.max())))
+    if unit is None:
+        unit = _voi_lut_sequence_lut(values, meta)
+    invert = str(meta.get('PhotometricInterpretation', '')).upper() == 'MONOCHROME1'
+    return _to_uint8(unit, invert)
+
+
+def render_dicom(ds, window=None, frame=0):
+    """DICOM 데이터셋을 8비트 표시용 2D 배열로 변환
+
+    Args:
+        ds: pydicom Dataset
+        window: (WindowCenter, WindowWidth) 직접 지정, None이면 DICOM 태그 사용 (없으면 최소/최대)
+        frame: 다중 프레임 영상에서 사용할 프레임 번호
+
+    Returns:
+        uint8 numpy 배열 (컬러 영상이면 (행, 열, 3))
+    """
+    return apply_window(*decode_dicom(ds, frame), window=window)
@@ -0,0 +1,224 @@
+"""
+백그라운드 내보내기 작업
+- POST /api/export/jobs 요청을 작업 큐(스레드 풀)에 넣고 작업 ID를 바로 반환
+- 진행률(기록한 행 수 / 전체 행 수) 조회
+- 완성된 파일은 만료 시각까지 디스크에 보관하여 다시 다운로드 가능
+- 작업 상태는 EXPORT_JOB_DIR의 <작업 ID>.json에 저장하므로 여러 워커 프로세스 중 어디로 조회가 들어와도,
+  서버를 재시작해도 같은 작업을 찾을 수 있음 (실행은 작업을 받은 프로세스의 스레드 풀에서만 진행)
+"""
+
+import os
+import re
+import json
+import uuid
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import data_export
+
+# 작업 설정 (환경변수로 변경 가능)
+EXPORT_JOB_DIR = os.environ.get(
+    'EXPORT_JOB_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'exports')
+)
+EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', '2'))
+EXPORT_JOB_TTL = timedelta(hours=int(os.environ.get('EXPORT_JOB_TTL_HOURS', '24')))
+
+_DATETIME_FIELDS = ('created_at', 'started_at', 'finished_at', 'expires_at')
+_JOB_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_JOB_WORKERS, thread_name_prefix='export-job')
+_lock = threading.Lock()
+
+
+def _job_file(job_id):
+    return os.path.join(EXPORT_JOB_DIR, f'{job_id}.json')
+
+
+def _save_job(job):
+    """작업 상태를 JSON으로 저장 (임시 파일에 쓴 뒤 교체하여 다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 함)"""
+    data = {key: value.isoformat() if key in _DATETIME_FIELDS and value else value for key, value in job.items()}
+    tmp_path = f'{_job_file(job["id"])}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, _job_file(job['id']))
+
+
+def _load_job(job_id):
+    """저장된 작업 상태 (없으면 None)"""
+    if not _JOB_ID_PATTERN.fullmatch(job_id):
+        return None
+    try:
+        with open(_job_file(job_id), encoding='utf-8') as f:
+            job = json.load(f)
+    except (OSError, ValueError):
+        return None
+    for key in _DATETIME_FIELDS:
+        if job.get(key):
+            job[key] = datetime.fromisoformat(job[key])
+    return job
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _update_job(job_id, **fields):
+    # 작업은 받은 프로세스에서만 갱신되므로 프로세스 안에서만 잠금
+    with _lock:
+        job = _load_job(job_id)
+        if job is not None:
+            job.update(fields)
+            _save_job(job)
+
+
+def _run_export_job(app, job_id):
+    """작업 스레드에서 실행: 임시 파일(.part)에 기록한 뒤 완료 시 이름을 바꿔 공개"""
+    job = _load_job(job_id)
+    part_path = job['path'] + '.part'
+    try:
+        with app.app_context():
+            data_types = (job['data_type'],) if job['data_type'] else tuple(data_export.EXPORT_SHEETS)
+            _update_job(job_id, status='running', started_at=datetime.now(),
+                        total_rows=data_export.count_export_rows(data_types))
+            data_export.write_export(
+                part_path, job['format'], job['data_type'],
+                progress=lambda rows_written: _update_job(job_id, rows_written=rows_written)
+            )
+        os.replace(part_path, job['path'])
+        finished_at = datetime.now()
+        _update_job(job_id, status='done', finished_at=finished_at,
+                    expires_at=finished_at + EXPORT_JOB_TTL)
+        print(f"✅ 내보내기 작업 완료: {job_id}")
+    except Exception as e:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        # 실패한 작업도 만료 시각을 두어 cleanup_expired_jobs에서 삭제되도록 함
+        finished_at = datetime.now()
+        _update_job(job_id, status='failed', error=str(e), finished_at=finished_at,
+                    expires_at=finished_at + EXPORT_JOB_TTL)
+        print(f"❌ 내보내기 작업 실패: {job_id} - {e}")
+
+
+def submit_export_job(app, user_id, download_name, fmt='xlsx', data_type=None):
+    """내보내기 작업을 큐에 넣고 작업 정보를 반환
+
+    Args:
+        fmt: data_export.EXPORT_FORMATS의 키
+        data_type: 내보낼 데이터 종류 (None이면 전체 데이터, xlsx만 가능)
+    """
+    mimetype, ext = data_export.EXPORT_FORMATS[fmt]
+    cleanup_expired_jobs()
+    os.makedirs(EXPORT_JOB_DIR, exist_ok=True)
+
+    job_id = uuid.uuid4().hex
+    job = {
+        'id': job_id,
+        'user_id': user_id,
+        'pid': os.getpid(),  # 작업을 실행하는 프로세스 (재시작 등으로 중단된 작업 확인용)
+        'status': 'queued',
+        'rows_written': 0,
+        'total_rows': None,
+        'format': fmt,
+        'data_type': data_type,
+        'path': os.path.join(EXPORT_JOB_DIR, f'{job_id}.{ext}'),
+        'download_name': download_name,
+        'mimetype': mimetype,
+        'error': None,
+        'created_at': datetime.now(),
+        'started_at': None,
+        'finished_at': None,
+        'expires_at': None,
+    }
+    with _lock:
+        _save_job(job)
+    _executor.submit(_run_export_job, app, job_id)
+    return job
+
+
+def get_job(job_id):
+    """작업 정보 반환 (없거나 만료되었으면 None)
+
+    실행 중이던 프로세스가 종료된 작업(서버 재시작 등)은 실패로 표시
+    """
+    job = _load_job(job_id)
+    if job is None:
+        return None
+    if job['expires_at'] and job['expires_at'] < datetime.now():
+        return None
+    if job['status'] in ('queued', 'running') and job['pid'] != os.getpid() and not _pid_alive(job['pid']):
+        finished_at = datetime.now()
+        job.update(status='failed', error='서버가 재시작되어 작업이 중단되었습니다.', finished_at=finished_at,
+                   expires_at=finished_at + EXPORT_JOB_TTL)
+        with _lock:
+            _save_job(job)
+    return job
+
+
+def job_to_dict(job):
+    """API 응답용 작업 정보"""
+    total = job['total_rows']
+    if job['status'] == 'done':
+        progress = 100
+    elif total:
+        progress = min(99, int(job['rows_written'] * 100 / total))
+    else:
+        progress = 0
+    return {
+        'id': job['id'],
+        'status': job['status'],
+        'format': job['format'],
+        'data_type': job['data_type'],
+        'rows_written': job['rows_written'],
+        'total_rows': total,
+        'progress': progress,
+        'error': job['error'],
+        'created_at': job['created_at'].isoformat(),
+        'expires_at': job['expires_at'].isoformat() if job['expires_at'] else None,
+        'download_url': f"/api/export/jobs/{job['id']}/download" if job['status'] == 'done' else None,
+    }
+
+
+def cleanup_expired_jobs():
+    """만료된 작업과 파일 삭제 (작업 정보가 없는 오래된 파일 포함)"""
+    if not os.path.exists(EXPORT_JOB_DIR):
+        return 0
+    now = datetime.now()
+    expired_paths = []
+    active_paths = set()
+    for name in os.listdir(EXPORT_JOB_DIR):
+        if not name.endswith('.json'):
+            continue
+        job = _load_job(name[:-len('.json')])
+        if job is None:
+            continue
+        if job['expires_at'] and job['expires_at'] < now:
+            expired_paths.extend([job['path'], _job_file(job['id'])])
+        else:
+            active_paths.update([job['path'], _job_file(job['id'])])
+
+    for name in os.listdir(EXPORT_JOB_DIR):
+        path = os.path.join(EXPORT_JOB_DIR, name)
+        if path in active_paths or path in expired_paths \
+                or (path.endswith('.part') and path[:-len('.part')] in active_paths):
+            continue
+        modified = datetime.fromtimestamp(os.path.getmtime(path))
+        if modified + EXPORT_JOB_TTL < now:
+            expired_paths.append(path)
+
+    removed = 0
+    for path in expired_paths:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,122 @@
+"""
+파일/이미지 응답의 HTTP 조건부 캐싱 (ETag / Last-Modified / Cache-Control)
+- 강한 ETag: 원본 절대 경로 + 크기 + 수정 시각(ns) (+ 렌더링 파라미터)의 해시 → 파일을 읽지 않고 stat만으로 계산
+- If-None-Match / If-Modified-Since가 일치하면 본문 없이 304 응답 (DICOM 렌더링, 파일 읽기 생략)
+- URL의 v 파라미터가 현재 버전과 같으면 내용이 바뀔 수 없으므로 1년 immutable,
+  없거나 다르면 매번 재검증(no-cache) - 재검증은 304로 끝나므로 본문을 다시 받지 않음
+- 파일 버전(file_version)은 파일 목록 API에도 포함되어 화면에서 ?v=를 붙여 요청
+- Range 요청은 206 Partial Content로 응답 (If-Range로 이어받기)
+- SENDFILE_MODE=x-sendfile|x-accel이면 본문과 Range 처리를 앞단 웹 서버(Apache/lighttpd, nginx)에 맡기고
+  Python 워커는 헤더만 응답
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+from flask import request, Response, send_file
+from werkzeug.http import is_resource_modified
+from werkzeug.utils import send_file as werkzeug_send_file
+
+# 버전이 고정된 URL(?v=)의 캐시 유지 시간
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# 기본은 브라우저 캐시만 허용 (private), 앞단 프록시 캐시도 허용하려면 FILE_CACHE_PUBLIC=1
+FILE_CACHE_PUBLIC = os.environ.get('FILE_CACHE_PUBLIC', '').lower() in ('1', 'true', 'yes')
+
+# 파일 전송 방식: '' (Flask가 직접 전송), 'x-sendfile' (Apache mod_xsendfile / lighttpd), 'x-accel' (nginx)
+SENDFILE_MODE = os.environ.get('SENDFILE_MODE', '').lower()
+# x-accel: X_ACCEL_ROOT 아래의 파일 경로를 nginx internal location(X_ACCEL_PREFIX) 경로로 바꿔 전달
+X_ACCEL_ROOT = os.environ.get('X_ACCEL_ROOT', os.path.dirname(os.path.abspath(__file__)))
+X_ACCEL_PREFIX = os.environ.get('X_ACCEL_PREFIX', '/protected/')
+
+
+def file_version(path, st=None):
+    """원본 파일 버전 토큰 (경로 + 크기 + 수정 시각), 파일이 없으면 None"""
+    try:
+        st = st or os.stat(path)
+    except OSError:
+        return None
+    raw = f'{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def validators(path, params=None):
+    """(ETag, 버전, Last-Modified) 계산
+
+    Args:
+        params: 같은 원본에서 만든 다른 표현(렌더링 파라미터 등), ETag에만 반영
+    """
+    st = os.stat(path)
+    version = file_version(path, st)
+    etag = version
+    if params is not None:
+        raw = version + json.dumps(params, sort_keys=True, ensure_ascii=False)
+        etag = hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+    last_modified = datetime.fromtimestamp(int(st.st_mtime), timezone.utc)
+    return etag, version, last_modified
+
+
+def apply_cache_headers(response, etag, version, last_modified):
+    """응답에 ETag/Last-Modified/Cache-Control 설정"""
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    if FILE_CACHE_PUBLIC:
+        response.cache_control.public = True
+    else:
+        response.cache_control.private = True
+    if version and request.args.get('v') == version:
+        # send_file이 설정한 no-cache는 제거
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag, version, last_modified):
+    """클라이언트 캐시가 최신이면 304 응답, 아니면 None"""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return apply_cache_headers(Response(status=304), etag, version, last_modified)
+
+
+def _offload_header(path):
+    """앞단 웹 서버에 전송을 맡길 (헤더 이름, 값), 사용하지 않거나 맡길 수 없는 경로면 None"""
+    path = os.path.realpath(path)
+    if SENDFILE_MODE == 'x-sendfile':
+        return 'X-Sendfile', path
+    if SENDFILE_MODE == 'x-accel':
+        root = os.path.realpath(X_ACCEL_ROOT)
+        if os.path.commonpath([root, path]) != root:
+            # nginx location 밖의 파일은 Flask가 직접 전송
+            return None
+        rel = os.path.relpath(path, root).replace(os.sep, '/')
+        return 'X-Accel-Redirect', X_ACCEL_PREFIX.rstrip('/') + '/' + quote(rel)
+    return None
+
+
+def send_cached_file(path, validators, **kwargs):
+    """send_file + ETag/Last-Modified/Cache-Control
+
+    - If-None-Match 등이 일치하면 304, Range 요청은 206 (If-Range가 다르면 전체 전송)
+    - SENDFILE_MODE를 사용하면 빈 본문에 X-Sendfile / X-Accel-Redirect 헤더만 설정 (Range는 웹 서버가 처리)
+    """
+    etag, version, last_modified = validators
+    offload = _offload_header(path)
+    if offload is None:
+        response = send_file(path, etag=etag, last_modified=last_modified, conditional=True, **kwargs)
+        return apply_cache_headers(response, etag, version, last_modified)
+
+    cached = not_modified(etag, version, last_modified)
+    if cached:
+        return cached
+    # Content-Type / Content-Disposition(한글 파일명 포함)은 werkzeug가 만든 헤더를 그대로 사용
+    response = werkzeug_send_file(path, request.environ, use_x_sendfile=True, conditional=False, **kwargs)
+    del response.headers['X-Sendfile']
+    response.headers.pop('Content-Length', None)  # 본문 길이는 웹 서버가 설정
+    response.headers[offload[0]] = offload[1]
+    response.accept_ranges = 'bytes'
+    return apply_cache_headers(response, etag, version, last_modified)
@@ -0,0 +1,522 @@
+"""
+렌더링 이미지 디스크 캐시
+- DICOM → PNG 변환 결과를 디스크에 저장하여 재사용
+- 캐시 키: 원본 파일 경로 + 수정 시각(mtime) + 크기 + 렌더링 파라미터 (내용 기반 주소)
+- 용량 제한 LRU 정리 (가장 오래 사용되지 않은 파일부터 삭제)
+- 적중/실패 카운터 제공
+- 목록 화면용 썸네일 (크기별 버킷: 128/256/512, JPEG/WebP)
+- 다음 파일 미리 렌더링(prefetch): 백그라운드 스레드 하나가 대기열의 DICOM을 순서대로 캐시에 저장
+  (PNG로 변환되어 등록된 파일은 원본 DICOM을 디코딩 배열 메모리 캐시에 보관)
+- 윈도우 지정 렌더링: 최근 디코딩한 픽셀 배열을 메모리 LRU(용량 제한)에 보관하여
+  윈도우만 바꾼 요청은 DICOM을 다시 읽지 않고 LUT 적용 + PNG 인코딩만 수행
+"""
+
+import os
+import json
+import hashlib
+import threading
+import queue
+import tempfile
+from collections import OrderedDict
+
+import dicom_render
+
+# 캐시 설정 (환경변수로 변경 가능)
+RENDER_CACHE_DIR = os.environ.get(
+    'RENDER_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'renders')
+)
+RENDER_CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_MB', '2048')) * 1024 * 1024
+# 용량 초과 시 이 비율까지 줄임 (매 저장마다 정리가 반복되지 않도록 여유를 둠)
+RENDER_CACHE_TRIM_RATIO = 0.9
+
+# 기본 렌더링 파라미터 (get_image의 DICOM 변환 결과)
+# renderer: 변환 방식이 바뀌면 캐시 키가 달라지도록 dicom_render.RENDER_VERSION 포함
+DEFAULT_RENDER_PARAMS = {'kind': 'full', 'format': 'png', 'frame': 0, 'renderer': dicom_render.RENDER_VERSION}
+
+# 썸네일 설정 (요청 크기는 가장 가까운 상위 버킷으로 올림)
+THUMBNAIL_SIZES = (128, 256, 512)
+THUMBNAIL_FORMATS = ('jpeg', 'webp')
+THUMBNAIL_QUALITY = int(os.environ.get('THUMBNAIL_QUALITY', '80'))
+THUMBNAIL_MIMETYPES = {'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+
+# 디코딩 배열 메모리 캐시 설정 (0이면 사용 안 함)
+DECODED_CACHE_MAX_BYTES = int(os.environ.get('DECODED_CACHE_MAX_MB', '512')) * 1024 * 1024
+# 윈도우 지정 렌더링은 조작할 때마다 새로 만들어지므로 빠른 압축 수준으로 인코딩
+WINDOW_PNG_COMPRESS_LEVEL = int(os.environ.get('WINDOW_PNG_COMPRESS_LEVEL', '1'))
+
+# 미리 렌더링 설정: 라벨 저장 후 다음 몇 개 파일을 렌더링할지, 대기열 최대 길이
+PREFETCH_COUNT = int(os.environ.get('PREFETCH_COUNT', '3'))
+PREFETCH_QUEUE_SIZE = 64
+PREFETCH_RENDER = 'render'  # .dcm 파일: 기본 렌더링을 디스크 캐시에 저장
+PREFETCH_DECODE = 'decode'  # PNG로 변환된 파일의 원본 DICOM: 디코딩 배열을 메모리 LRU에 보관
+
+_lock = threading.Lock()
+_evict_lock = threading.Lock()  # LRU 정리는 한 번에 하나만 실행
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'decoded_hits': 0, 'decoded_misses': 0,
+          'prefetched': 0}
+_current_size = None  # 캐시 전체 크기 (처음 필요할 때 한 번만 계산)
+_decoded = OrderedDict()  # (경로, mtime, 크기, 프레임) → (저장값 배열, 메타데이터), 끝쪽이 최근 사용
+_decoded_size = 0
+_prefetch_queue = queue.Queue(maxsize=PREFETCH_QUEUE_SIZE)
+_prefetch_pending = set()  # 대기열에 있거나 처리 중인 (종류, 경로) (중복 요청 방지)
+_prefetch_thread = None
+
+
+def _render_key(source_path, params):
+    """원본 파일 정보와 렌더링 파라미터로 캐시 키 생성"""
+    st = os.stat(source_path)
+    key_data = {
+        'path': os.path.abspath(source_path),
+        'mtime': st.st_mtime_ns,
+        'size': st.st_size,
+        'params': params,
+    }
+    raw = json.dumps(key_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _cache_path(key, ext):
+    # 한 디렉토리에 파일이 너무 많아지지 않도록 앞 2글자로 분산
+    return os.path.join(RENDER_CACHE_DIR, key[:2], f'{key}.{ext}')
+
+
+def _iter_cache_files():
+    if not os.path.exists(RENDER_CACHE_DIR):
+        return
+    for root, dirs, files in os.walk(RENDER_CACHE_DIR):
+        for name in files:
+            if name.endswith('.tmp'):
+                continue
+            yield os.path.join(root, name)
+
+
+def _scan_cache_size():
+    total = 0
+    for path in _iter_cache_files():
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def lookup(source_path, params=None):
+    """캐시된 렌더링 파일 경로 반환 (없으면 None)"""
+    params = params or DEFAULT_RENDER_PARAMS
+    path = _cache_path(_render_key(source_path, params), params.get('format', 'png'))
+    if os.path.exists(path):
+        try:
+            # LRU 순서 갱신 (접근 시각을 수정 시각으로 기록)
+            os.utime(path, None)
+        except OSError:
+            pass
+        with _lock:
+            _stats['hits'] += 1
+        return path
+    with _lock:
+        _stats['misses'] += 1
+    return None
+
+
+def store(source_path, data, params=None):
+    """렌더링 결과(bytes)를 캐시에 저장하고 저장된 경로 반환"""
+    global _current_size
+    params = params or DEFAULT_RENDER_PARAMS
+    path = _cache_path(_render_key(source_path, params), params.get('format', 'png'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # 임시 파일에 쓴 뒤 교체하여 읽는 쪽에서 반쯤 쓰인 파일을 보지 않도록 함
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # 같은 키를 다시 저장하면(재렌더링, 동시에 발생한 캐시 실패) 기존 파일 크기만큼은 이미 포함되어 있음
+        try:
+            replaced_size = os.path.getsize(path)
+        except OSError:
+            replaced_size = 0
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    with _lock:
+        _stats['stores'] += 1
+        if _current_size is None:
+            _current_size = _scan_cache_size()
+        else:
+            _current_size += len(data) - replaced_size
+        over_limit = _current_size > RENDER_CACHE_MAX_BYTES
+    # 다른 요청이 이미 정리 중이면 기다리지 않고 바로 반환
+    if over_limit and not _evict_lock.locked():
+        evict()
+    return path
+
+
+def evict(target_bytes=None):
+    """가장 오래 사용되지 않은 파일부터 삭제하여 캐시 크기를 제한 이하로 유지
+
+    디렉토리 탐색과 삭제는 _lock 밖에서 수행하므로 정리 중에도 lookup/store는 기다리지 않음
+    (동시에 여러 정리가 실행되지 않도록 _evict_lock으로만 직렬화)
+    """
+    global _current_size
+    if target_bytes is None:
+        target_bytes = int(RENDER_CACHE_MAX_BYTES * RENDER_CACHE_TRIM_RATIO)
+
+    with _evict_lock:
+        entries = []
+        for path in _iter_cache_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+
+        removed = freed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total - freed <= target_bytes:
+                break
+            try:
+                os.remove(path)
+                freed += size
+                removed += 1
+            except OSError:
+                pass
+
+        with _lock:
+            # 탐색하는 동안 저장된 파일은 _current_size에 이미 더해져 있으므로 삭제한 만큼만 뺌
+            if _current_size is None:
+                _current_size = total - freed
+            else:
+                _current_size = max(0, _current_size - freed)
+            _stats['evictions'] += removed
+    return removed
+
+
+def purge():
+    """캐시 전체 삭제, 삭제한 파일 수 반환"""
+    return evict(target_bytes=0)
+
+
+def get_stats():
+    """적중/실패 카운터와 현재 캐시 크기 반환"""
+    global _current_size
+    with _lock:
+        if _current_size is None:
+            _current_size = _scan_cache_size()
+        stats = dict(_stats)
+        stats['size_bytes'] = _current_size
+        stats['decoded_entries'] = len(_decoded)
+        stats['decoded_bytes'] = _decoded_size
+    stats['max_bytes'] = RENDER_CACHE_MAX_BYTES
+    stats['decoded_max_bytes'] = DECODED_CACHE_MAX_BYTES
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+    return stats
+
+
+def render_dicom_image(file_path):
+    """DICOM 파일을 읽어 8비트 PIL 이미지로 변환 (Modality/VOI LUT, 윈도우, MONOCHROME1 반영)"""
+    import pydicom
+    from PIL import Image
+
+    ds = pydicom.dcmread(file_path)
+    return Image.fromarray(dicom_render.render_dicom(ds))
+
+
+def render_dicom_png(file_path):
+    """DICOM 파일을 읽어 PNG bytes로 변환"""
+    import io
+
+    img_io = io.BytesIO()
+    render_dicom_image(file_path).save(img_io, 'PNG')
+    return img_io.getvalue()
+
+
+def get_or_render_dicom(file_path):
+    """캐시된 PNG 경로를 반환하고, 없으면 변환하여 캐시에 저장"""
+    cached = lookup(file_path)
+    if cached:
+        return cached
+    return store(file_path, render_dicom_png(file_path))
+
+
+# ==================== 윈도우 지정 렌더링 ====================
+def _decode_source(file_path, frame=0):
+    """원본을 윈도우 적용 전 배열로 디코딩 (DICOM이 아니면 8비트 흑백/컬러 배열, 메타데이터 None)"""
+    import numpy as np
+
+    if file_path.lower().endswith('.dcm'):
+        import pydicom
+        return dicom_render.decode_dicom(pydicom.dcmread(file_path), frame)
+
+    from PIL import Image
+    with Image.open(file_path) as img:
+        if img.mode in ('I', 'I;16', 'I;16B', 'F'):
+            return np.asarray(img), None
+        return np.asarray(img.convert('RGB' if img.mode in ('RGB', 'RGBA', 'P', 'CMYK') else 'L')), None
+
+
+def _decoded_key(file_path, frame=0):
+    st = os.stat(file_path)
+    return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size, frame)
+
+
+def get_decoded(file_path, frame=0, record_stats=True):
+    """디코딩된 (저장값 배열, 메타데이터)를 메모리 LRU에서 반환, 없으면 디코딩하여 보관
+
+    Args:
+        record_stats: False면 적중/실패 통계에 포함하지 않음 (미리 디코딩용)
+    """
+    global _decoded_size
+    key = _decoded_key(file_path, frame)
+
+    with _lock:
+        entry = _decoded.get(key)
+        if entry is not None:
+            _decoded.move_to_end(key)
+            if record_stats:
+                _stats['decoded_hits'] += 1
+            return entry
+        if record_stats:
+            _stats['decoded_misses'] += 1
+
+    # 디코딩은 잠금 밖에서 수행 (동시에 같은 파일을 요청하면 중복 디코딩될 수 있으나 결과는 같음)
+    entry = _decode_source(file_path, frame)
+    nbytes = entry[0].nbytes
+    if nbytes > DECODED_CACHE_MAX_BYTES:
+        return entry
+
+    with _lock:
+        if key not in _decoded:
+            _decoded[key] = entry
+            _decoded_size += nbytes
+        _decoded.move_to_end(key)
+        while _decoded_size > DECODED_CACHE_MAX_BYTES:
+            _, (old_arr, _) = _decoded.popitem(last=False)
+            _decoded_size -= old_arr.nbytes
+    return entry
+
+
+def clear_decoded():
+    """디코딩 배열 메모리 캐시 비우기"""
+    global _decoded_size
+    with _lock:
+        _decoded.clear()
+        _decoded_size = 0
+
+
+def window_params(window):
+    return dict(DEFAULT_RENDER_PARAMS, window=[float(window[0]), float(window[1])])
+
+
+def _encode_window_png(arr, meta, window):
+    import io
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.fromarray(dicom_render.apply_window(arr, meta, window)).save(
+        out, 'PNG', compress_level=WINDOW_PNG_COMPRESS_LEVEL)
+    return out.getvalue()
+
+
+def get_or_render_window(file_path, window):
+    """윈도우(center, width)를 적용한 PNG 캐시 경로 반환, 없으면 디코딩 배열에 LUT만 다시 적용하여 저장"""
+    params = window_params(window)
+    cached = lookup(file_path, params)
+    if cached:
+        return cached
+
+    arr, meta = get_decoded(file_path)
+    return store(file_path, _encode_window_png(arr, meta, window), params)
+
+
+def prewarm(file_paths, progress=None, windows=None):
+    """DICOM 파일들을 미리 렌더링하여 캐시에 저장
+
+    Args:
+        windows: 기본 렌더링 대신 저장할 윈도우 (center, width) 목록
+            (PNG로 변환되어 등록된 파일의 원본 DICOM은 윈도우 지정 요청에만 사용되므로 프리셋을 지정)
+
+    Returns:
+        (rendered, skipped, failed) 개수
+    """
+    rendered = skipped = failed = 0
+    for i, path in enumerate(file_paths, 1):
+        try:
+            if windows is None:
+                if lookup(path):
+                    skipped += 1
+                else:
+                    store(path, render_dicom_png(path))
+                    rendered += 1
+            else:
+                missing = [window for window in windows if not lookup(path, window_params(window))]
+                if not missing:
+                    skipped += 1
+                else:
+                    # 한 번만 디코딩하여 모든 윈도우에 사용 (메모리 LRU는 조회 중인 영상용이므로 거치지 않음)
+                    arr, meta = _decode_source(path)
+                    for window in missing:
+                        store(path, _encode_window_png(arr, meta, window), window_params(window))
+                    rendered += 1
+        except Exception as e:
+            failed += 1
+            print(f"  ❌ 렌더링 실패: {path} - {e}")
+        if progress:
+            progress(i, path)
+    return rendered, skipped, failed
+
+
+def _prefetch_worker():
+    while True:
+        item = _prefetch_queue.get()
+        kind, path = item
+        try:
+            if kind == PREFETCH_DECODE:
+                # PNG로 변환되어 등록된 파일: 원본 DICOM을 메모리 LRU에 디코딩해 두어 윈도우 조절을 바로 처리
+                with _lock:
+                    cached = _decoded_key(path) in _decoded
+                if not cached:
+                    get_decoded(path, record_stats=False)
+                    with _lock:
+                        _stats['prefetched'] += 1
+            # lookup()은 적중/실패 통계에 포함되므로 캐시 파일 존재 여부만 직접 확인
+            elif not os.path.exists(_cache_path(_render_key(path, DEFAULT_RENDER_PARAMS), 'png')):
+                store(path, render_dicom_png(path))
+                with _lock:
+                    _stats['prefetched'] += 1
+        except Exception as e:
+            print(f"  ⚠️ 미리 렌더링 실패: {path} - {e}")
+        finally:
+            with _lock:
+                _prefetch_pending.discard(item)
+
+
+def prefetch_async(file_paths, source_paths=()):
+    """DICOM 파일들을 백그라운드 스레드에서 미리 준비 (요청은 기다리지 않음)
+
+    Args:
+        file_paths: .dcm으로 등록된 파일 경로 → 기본 렌더링을 캐시에 저장 (DICOM이 아니면 제외)
+        source_paths: PNG로 변환되어 등록된 파일의 원본 DICOM 경로 → 디코딩 배열을 메모리 LRU에 보관
+
+    Returns:
+        대기열에 새로 넣은 개수 (이미 대기 중이면 제외, 대기열이 가득 차면 나머지 생략)
+    """
+    global _prefetch_thread
+    items = [(PREFETCH_RENDER, path) for path in file_paths if path.lower().endswith('.dcm')]
+    if DECODED_CACHE_MAX_BYTES > 0:
+        items += [(PREFETCH_DECODE, path) for path in source_paths]
+    queued = 0
+    with _lock:
+        if _prefetch_thread is None or not _prefetch_thread.is_alive():
+            _prefetch_thread = threading.Thread(target=_prefetch_worker, name='render-prefetch', daemon=True)
+            _prefetch_thread.start()
+        for item in items:
+            if item in _prefetch_pending:
+                continue
+            # 작업 스레드가 먼저 꺼내 처리해도 대기 표시가 남지 않도록 넣기 전에 표시
+            _prefetch_pending.add(item)
+            try:
+                _prefetch_queue.put_nowait(item)
+            except queue.Full:
+                _prefetch_pending.discard(item)
+                break
+            queued += 1
+    return queued
+
+
+# ==================== 썸네일 ====================
+def thumbnail_bucket(requested_size):
+    """요청 크기를 담을 수 있는 가장 작은 버킷 반환 (최대 버킷으로 제한)"""
+    for size in THUMBNAIL_SIZES:
+        if requested_size <= size:
+            return size
+    return THUMBNAIL_SIZES[-1]
+
+
+def supported_thumbnail_formats():
+    """현재 Pillow 빌드에서 인코딩 가능한 썸네일 형식"""
+    from PIL import features
+    return [fmt for fmt in THUMBNAIL_FORMATS if fmt != 'webp' or features.check('webp')]
+
+
+def thumbnail_params(size, fmt):
+    return {'kind': 'thumbnail', 'size': size, 'format': fmt, 'renderer': dicom_render.RENDER_VERSION}
+
+
+def _open_source_image(file_path, max_size):
+    """원본 이미지를 썸네일 생성용 8비트 L/RGB 이미지로 열기"""
+    from PIL import Image
+    import numpy as np
+
+    if file_path.lower().endswith('.dcm'):
+        return render_dicom_image(file_path)
+
+    # 파일 핸들을 바로 닫도록 with로 열고, 변환본(또는 복사본)을 반환
+    with Image.open(file_path) as img:
+        # JPEG는 디코딩 단계에서 축소하여 전체 해상도 디코딩을 피함
+        img.draft(img.mode if img.mode in ('L', 'RGB') else 'RGB', (max_size, max_size))
+
+        if img.mode in ('I', 'I;16', 'I;16B', 'F'):
+            # 16비트/실수 영상은 0-255 범위로 정규화
+            arr = np.asarray(img, dtype=np.float32)
+            lo, hi = float(arr.min()), float(arr.max())
+            scale = 255.0 / (hi - lo) if hi > lo else 0.0
+            arr -= lo
+            arr *= scale
+            return Image.fromarray(arr.astype(np.uint8))
+        if img.mode not in ('L', 'RGB'):
+            return img.convert('RGB')
+        return img.copy()
+
+
+def _encode_thumbnail(img, size, fmt):
+    import io
+
+    thumb = img.copy()
+    thumb.thumbnail((size, size))
+    out = io.BytesIO()
+    thumb.save(out, fmt.upper(), quality=THUMBNAIL_QUALITY)
+    return out.getvalue()
+
+
+def get_or_render_thumbnail(file_path, size, fmt='jpeg'):
+    """캐시된 썸네일 경로를 반환하고, 없으면 생성하여 캐시에 저장"""
+    size = thumbnail_bucket(size)
+    params = thumbnail_params(size, fmt)
+    cached = lookup(file_path, params)
+    if cached:
+        return cached
+    img = _open_source_image(file_path, size)
+    return store(file_path, _encode_thumbnail(img, size, fmt), params)
+
+
+def generate_thumbnails(file_path):
+    """모든 크기/형식의 썸네일을 한 번의 디코딩으로 미리 생성 (업로드 시 사용)
+
+    Returns:
+        새로 생성한 썸네일 개수
+    """
+    formats = supported_thumbnail_formats()
+    missing = [
+        (size, fmt)
+        for size in THUMBNAIL_SIZES
+        for fmt in formats
+        if not os.path.exists(_cache_path(_render_key(file_path, thumbnail_params(size, fmt)), fmt))
+    ]
+    if not missing:
+        return 0
+
+    img = _open_source_image(file_path, max(size for size, _ in missing))
+    # 큰 크기부터 축소하여 다음 크기의 입력으로 재사용
+    for size in sorted({size for size, _ in missing}, reverse=True):
+        img.thumbnail((size, size))
+        for fmt in formats:
+            if (size, fmt) in missing:
+                store(file_path, _encode_thumbnail(img, size, fmt), thumbnail_params(size, fmt))
+    return len(missing)
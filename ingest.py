@@ -0,0 +1,485 @@
+"""
+폴더 파일 수집(ingest) 파이프라인
+- 프로세스 풀(spawn)에서 DICOM → PNG 변환과 썸네일 생성을 병렬 처리
+- 단일 기록 스레드가 File 행을 묶음 단위 Core insert + 트랜잭션으로 저장 (SQLite 쓰기는 한 곳에서만)
+- 진행 중 처리량(files/s, MB/s) 출력
+- 매니페스트(ingest_manifest: 원본 경로, 크기, 수정 시각, 내용 해시, file_id)로 다시 업로드할 때 바뀐 파일만 처리
+- since 모드: 디렉토리 수정 시각이 기준 시각 이전이면 해당 디렉토리의 파일은 stat도 하지 않고 건너뜀
+- 내용 해시(SHA-256) 중복 제거: 이미 등록된 파일과 내용이 같으면 새 File을 만들지 않고 매니페스트에서 기존 File로 연결
+- 워커 함수는 모듈 최상위에 두어 프로세스 풀로 전달(pickle) 가능하도록 함
+"""
+
+import os
+import time
+import queue
+import hashlib
+import threading
+import multiprocessing
+from datetime import timezone, timedelta
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import image_cache
+
+# 수집 설정 (환경변수로 변경 가능)
+INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', str(os.cpu_count() or 1)))
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', '2000'))  # 한 트랜잭션에 저장할 File 행 수
+INGEST_PROGRESS_INTERVAL = 2.0  # 처리량 출력 간격(초)
+HASH_CHUNK_SIZE = 1024 * 1024   # 내용 해시 계산 시 한 번에 읽을 크기
+
+ALLOWED_EXTENSIONS = {'.txt', '.jpg', '.jpeg', '.png', '.dcm'}
+THUMBNAIL_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+# 작업 종류
+ACTION_INSERT = 'insert'      # 새 파일: 처리 후 File 행 추가
+ACTION_UPDATE = 'update'      # 등록된 파일의 원본이 바뀜: 다시 처리 후 File 행 갱신
+ACTION_MANIFEST = 'manifest'  # 매니페스트 도입 전에 등록된 파일: 처리 없이 매니페스트만 기록
+ACTION_LINK = 'link'          # 등록된 파일과 내용이 같은 새 파일: File 행 없이 매니페스트에서 기존 File로 연결
+
+_DONE = object()  # 기록 스레드 종료 신호
+_known_hashes = frozenset()  # 워커 프로세스: 이미 등록된 내용 해시 (중복이면 변환/썸네일 생략)
+
+
+def iter_ingest_tasks(folder_path, upload_dir, on_skip=None, since=None, on_unchanged_dir=None):
+    """폴더를 재귀적으로 탐색하며 처리할 파일 작업을 생성
+
+    Args:
+        since: 기준 시각(epoch 초). 디렉토리 수정 시각이 이보다 이전이면 그 디렉토리의 파일은 건너뜀
+               (하위 디렉토리는 따로 확인하므로 계속 탐색)
+        on_unchanged_dir: since로 건너뛴 디렉토리 콜백 on_unchanged_dir(상대 경로, 파일 수)
+
+    Yields:
+        {'filename': DB에 저장할 파일명, 'source_path': 원본 절대 경로, 'ext': 확장자,
+         'png_path': DICOM 변환 결과 경로(DICOM만)}
+    """
+    for root, dirs, files in os.walk(folder_path):
+        # 상대 경로 계산
+        rel_root = os.path.relpath(root, folder_path)
+        if rel_root == '.':
+            rel_root = ''
+        rel_root = rel_root.replace(os.sep, '/')
+
+        # 파일 추가/삭제/이름 변경은 디렉토리 수정 시각을 바꾸므로 그 이전 디렉토리는 바뀐 파일이 없음
+        if since is not None and os.stat(root).st_mtime < since:
+            if on_unchanged_dir:
+                on_unchanged_dir(rel_root, len(files))
+            continue
+
+        print(f"\n📂 하위 폴더: {rel_root if rel_root else '루트'} ({len(files)}개 파일)")
+
+        for filename in files:
+            file_ext = os.path.splitext(filename)[1].lower()
+            if file_ext not in ALLOWED_EXTENSIONS:
+                if on_skip:
+                    on_skip(filename, '지원되지 않는 확장자')
+                continue
+
+            # 폴더 구조를 반영한 파일명 생성
+            db_filename = f"{rel_root}/{filename}" if rel_root else filename
+            task = {
+                'filename': db_filename,
+                'source_path': os.path.abspath(os.path.join(root, filename)),
+                'ext': file_ext,
+                'png_path': None,
+            }
+            if file_ext == '.dcm':
+                # DICOM은 PNG로 변환하여 uploads에 캐싱 (폴더 구조 유지), DB에는 PNG로 등록
+                task['filename'] = os.path.splitext(db_filename)[0] + '.png'
+                task['png_path'] = os.path.join(upload_dir, task['filename'])
+            yield task
+
+
+def registered_files():
+    """이미 등록된 파일명 → File.id 전체를 한 번에 읽어 반환 (파일마다 조회하지 않도록)"""
+    from user import db, File
+    return dict(db.session.execute(db.select(File.filename, File.id)).all())
+
+
+def registered_hashes():
+    """이미 등록된 내용 해시 → 파일명 (해시가 없는 행 제외)"""
+    from user import db, File
+    rows = db.session.execute(db.select(File.content_hash, File.filename)
+                              .where(File.content_hash.isnot(None))
+                              .order_by(File.id.desc()))
+    # 같은 해시가 여러 개면 가장 먼저 등록된 파일로 연결
+    return {row.content_hash: row.filename for row in rows}
+
+
+def find_duplicate_files():
+    """내용 해시가 같은 File 묶음 목록 [(해시, [File, ...]), ...] (등록 순)"""
+    from user import db, File
+    duplicate_hashes = db.select(File.content_hash) \
+        .where(File.content_hash.isnot(None)) \
+        .group_by(File.content_hash) \
+        .having(db.func.count(File.id) > 1)
+    files = db.session.scalars(
+        db.select(File).where(File.content_hash.in_(duplicate_hashes)).order_by(File.content_hash, File.id)
+    )
+    groups = {}
+    for file in files:
+        groups.setdefault(file.content_hash, []).append(file)
+    return list(groups.items())
+
+
+def load_manifest():
+    """매니페스트 전체를 원본 경로 → (크기, 수정 시각, file_id)로 읽어 반환"""
+    from user import db, IngestManifest
+    IngestManifest.__table__.create(db.engine, checkfirst=True)
+    rows = db.session.execute(db.select(IngestManifest.path, IngestManifest.size,
+                                        IngestManifest.mtime, IngestManifest.file_id))
+    return {row.path: (row.size, row.mtime, row.file_id) for row in rows}
+
+
+def last_scan_time():
+    """가장 최근에 매니페스트가 기록된 시각(epoch 초), 기록이 없으면 None"""
+    from user import db, IngestManifest
+    IngestManifest.__table__.create(db.engine, checkfirst=True)
+    scanned_at = db.session.scalar(db.select(db.func.max(IngestManifest.scanned_at)))
+    if scanned_at is None:
+        return None
+    # SQLite에는 시간대 없이 한국 시간으로 저장됨
+    return scanned_at.replace(tzinfo=timezone(timedelta(hours=9))).timestamp()
+
+
+def dicom_source_path(file_id):
+    """PNG로 변환되어 등록된 파일의 원본 DICOM 경로 (매니페스트 기준, 원본이 없으면 None)"""
+    from user import db, IngestManifest
+    IngestManifest.__table__.create(db.engine, checkfirst=True)
+    paths = db.session.scalars(
+        db.select(IngestManifest.path)
+        .where(IngestManifest.file_id == file_id, IngestManifest.path.ilike('%.dcm'))
+        .order_by(IngestManifest.id)
+    )
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def dicom_source_paths(file_ids=None):
+    """PNG로 변환되어 등록된 파일들의 원본 DICOM 경로 {file_id: 경로} (dicom_source_path를 한 번의 쿼리로, 원본이 없으면 제외)
+
+    Args:
+        file_ids: 조회할 File.id 목록 (None이면 전체)
+    """
+    from user import db, IngestManifest
+    IngestManifest.__table__.create(db.engine, checkfirst=True)
+    stmt = db.select(IngestManifest.file_id, IngestManifest.path) \
+        .where(IngestManifest.file_id.isnot(None), IngestManifest.path.ilike('%.dcm')) \
+        .order_by(IngestManifest.id)
+    if file_ids is not None:
+        stmt = stmt.where(IngestManifest.file_id.in_(file_ids))
+    rows = db.session.execute(stmt)
+    sources = {}
+    for file_id, path in rows:
+        if file_id not in sources and os.path.exists(path):
+            sources[file_id] = path
+    return sources
+
+
+def plan_ingest_tasks(tasks, registered, manifest, on_skip=None, on_unchanged=None):
+    """매니페스트와 비교하여 실제로 처리할 작업만 남김 (작업에 'action', 'file_id', 'size', 'mtime' 추가)
+
+    - 매니페스트의 크기/수정 시각이 같고 등록된 파일이 남아 있으면 건너뜀 (DB 조회, PNG 캐시 확인 없음)
+    - 매니페스트에 있지만 바뀐 파일은 다시 처리하여 File 행 갱신
+    - 매니페스트 없이 등록된 파일(이전 방식 업로드)은 매니페스트만 기록
+    - 다른 파일로 연결(link)된 원본이 바뀌면 새 파일로 처리 (연결된 File 행은 다른 원본의 것이므로 갱신하지 않음,
+      내용이 다시 등록된 파일과 같으면 process_ingest_file/run_ingest에서 다시 연결)
+    """
+    registered_ids = set(registered.values())
+    seen = set()
+    for task in tasks:
+        st = os.stat(task['source_path'])
+        task['size'], task['mtime'] = st.st_size, st.st_mtime
+
+        if task['filename'] in seen:
+            if on_skip:
+                on_skip(task['filename'], '같은 이름의 파일이 이미 처리됨')
+            continue
+        seen.add(task['filename'])
+
+        previous = manifest.get(task['source_path'])
+        file_id = registered.get(task['filename'])
+        if previous and previous[2] in registered_ids:
+            if previous[:2] == (task['size'], task['mtime']):
+                if on_unchanged:
+                    on_unchanged(task)
+                continue
+            if file_id is not None:
+                # 갱신은 이 원본의 파일명으로 등록된 File 행에만 적용
+                task['action'], task['file_id'] = ACTION_UPDATE, file_id
+            else:
+                # 연결(link)로 기록된 원본: 연결된 File 행은 다른 원본의 것이므로 새 파일로 처리
+                task['action'], task['file_id'] = ACTION_INSERT, None
+        elif file_id is not None:
+            task['action'], task['file_id'] = ACTION_MANIFEST, file_id
+        else:
+            task['action'], task['file_id'] = ACTION_INSERT, None
+        yield task
+
+
+def file_sha256(path):
+    """파일 내용의 SHA-256 (HASH_CHUNK_SIZE씩 읽어 메모리 사용량 일정)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _init_worker(known_hashes):
+    """워커 프로세스 초기화: 등록된 내용 해시를 한 번만 전달받음"""
+    global _known_hashes
+    _known_hashes = frozenset(known_hashes)
+
+
+def process_ingest_file(task):
+    """워커 프로세스에서 실행: 파일 하나를 변환/썸네일 생성 후 File 행 정보 반환
+
+    내용 해시를 먼저 계산하여 이미 등록된 내용이면 변환/썸네일 생성을 생략
+
+    Returns:
+        작업 정보 + {'file_path', 'file_size', 'content_hash', 'bytes_read', 'converted', 'thumbnails', 'error'}
+    """
+    result = dict(task, file_path=task['source_path'], file_size=0, content_hash=None,
+                  bytes_read=0, converted=False, thumbnails=0, error=None)
+    try:
+        result['content_hash'] = file_sha256(task['source_path'])
+        result['bytes_read'] = task['size']
+        if task['action'] == ACTION_INSERT and result['content_hash'] in _known_hashes:
+            return result
+
+        if task['ext'] == '.dcm':
+            png_path = task['png_path']
+            # 원본이 바뀐 경우(update)에는 기존 PNG가 있어도 다시 변환
+            if task['action'] == ACTION_UPDATE or not os.path.exists(png_path):
+                os.makedirs(os.path.dirname(png_path), exist_ok=True)
+                # 임시 파일에 저장 후 교체하여 중단되어도 반쯤 쓰인 PNG가 남지 않도록 함
+                tmp_path = f'{png_path}.{os.getpid()}.tmp'
+                try:
+                    image_cache.render_dicom_image(task['source_path']).save(tmp_path, format='PNG')
+                    os.replace(tmp_path, png_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                result['converted'] = True
+            result['file_path'] = png_path
+            result['file_size'] = os.path.getsize(png_path)
+        else:
+            # 일반 파일: 원본 경로 그대로 참조 (복사하지 않음)
+            result['file_size'] = task['size']
+
+        if task['ext'] == '.dcm' or task['ext'] in THUMBNAIL_EXTENSIONS:
+            try:
+                result['thumbnails'] = image_cache.generate_thumbnails(result['file_path'])
+            except Exception:
+                # 썸네일은 조회 시 다시 생성되므로 실패해도 등록은 계속 진행
+                pass
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+class _Throughput:
+    """처리량 집계 및 주기적 출력"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.files = 0
+        self.bytes = 0
+
+    def add(self, bytes_read):
+        self.files += 1
+        self.bytes += bytes_read
+        now = time.perf_counter()
+        if now - self.last_report >= INGEST_PROGRESS_INTERVAL:
+            self.last_report = now
+            print(f"  ⏱️  {self.summary()}")
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (f"{self.files}개 처리, {elapsed:.1f}초 "
+                f"({self.files / elapsed:.1f} files/s, {self.bytes / elapsed / 1024 / 1024:.1f} MB/s)")
+
+
+def _writer_loop(app, records, uploaded_by, counts):
+    """기록 스레드: 큐에서 처리 결과를 받아 묶음 단위로 저장
+
+    ORM 객체를 만들지 않고 Core insert().values([...]) 한 문장으로 묶음 전체를 넣은 뒤
+    매니페스트까지 같은 트랜잭션에서 기록하고 묶음마다 한 번만 커밋
+    """
+    from sqlalchemy import bindparam
+    from db_config import dialect_insert
+    from user import db, File, IngestManifest
+
+    file_table = File.__table__
+    update_stmt = file_table.update() \
+        .where(file_table.c.id == bindparam('b_id')) \
+        .values(file_path=bindparam('b_path'), file_size=bindparam('b_size'), content_hash=bindparam('b_hash'))
+
+    def write(rows):
+        inserts = [row for row in rows if row['action'] == ACTION_INSERT]
+        updates = [row for row in rows if row['action'] == ACTION_UPDATE]
+        links = [row for row in rows if row['action'] == ACTION_LINK]
+
+        if inserts:
+            db.session.execute(file_table.insert().values([
+                {'filename': row['filename'], 'file_path': row['file_path'], 'file_size': row['file_size'],
+                 'content_hash': row['content_hash'], 'uploaded_by': uploaded_by}
+                for row in inserts
+            ]))
+        if updates:
+            db.session.execute(update_stmt, [
+                {'b_id': row['file_id'], 'b_path': row['file_path'],
+                 'b_size': row['file_size'], 'b_hash': row['content_hash']}
+                for row in updates
+            ])
+        if inserts or links:
+            # 매니페스트에 기록할 File.id (새로 추가한 파일 / 연결할 원본 파일, 묶음당 조회 한 번)
+            names = [row['filename'] for row in inserts] + [row['duplicate_of'] for row in links]
+            ids = dict(db.session.execute(
+                db.select(File.filename, File.id).where(File.filename.in_(names))
+            ).all())
+            for row in inserts:
+                row['file_id'] = ids[row['filename']]
+            for row in links:
+                row['file_id'] = ids[row['duplicate_of']]
+
+        stmt = dialect_insert(IngestManifest.__table__).values([
+            {'path': row['source_path'], 'size': row['size'], 'mtime': row['mtime'],
+             'content_hash': row['content_hash'], 'file_id': row['file_id']}
+            for row in rows
+        ])
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['path'],
+            set_={
+                'size': stmt.excluded.size,
+                'mtime': stmt.excluded.mtime,
+                'content_hash': stmt.excluded.content_hash,
+                'file_id': stmt.excluded.file_id,
+                'scanned_at': stmt.excluded.scanned_at,
+            }
+        ))
+        db.session.commit()
+        for row in rows:
+            counts[row['action']] += 1
+
+    def flush(batch):
+        started = time.perf_counter()
+        try:
+            write(batch)
+        except Exception as e:
+            # 묶음 저장이 실패하면 한 행씩 다시 시도하여 문제 행만 제외
+            db.session.rollback()
+            print(f"  ⚠️  묶음 저장 실패, 개별 저장으로 재시도: {e}")
+            for row in batch:
+                try:
+                    write([row])
+                except Exception as row_error:
+                    db.session.rollback()
+                    counts['failed'] += 1
+                    print(f"  ❌ 오류: {row['filename']} - {row_error}")
+        elapsed = time.perf_counter() - started
+        counts['batches'] += 1
+        print(f"  💾 묶음 {counts['batches']}: {len(batch)}행 저장 {elapsed * 1000:.0f}ms "
+              f"({len(batch) / max(elapsed, 1e-9):.0f} rows/s)")
+
+    with app.app_context():
+        batch = []
+        while True:
+            row = records.get()
+            if row is _DONE:
+                break
+            batch.append(row)
+            if len(batch) >= INGEST_BATCH_SIZE:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        db.session.remove()
+
+
+def run_ingest(app, tasks, uploaded_by, workers=None, known_hashes=None):
+    """작업들을 병렬 처리하고 결과를 DB에 저장
+
+    Args:
+        app: 기록 스레드에서 사용할 Flask 앱
+        tasks: plan_ingest_tasks로 걸러낸 작업
+        uploaded_by: 업로더 사용자 ID
+        workers: 프로세스 수 (None이면 INGEST_WORKERS, 1이면 현재 프로세스에서 처리)
+        known_hashes: 등록된 내용 해시 → 파일명 (registered_hashes), 같은 내용의 새 파일은 기존 파일로 연결
+
+    Returns:
+        {'insert', 'update', 'manifest', 'link', 'failed', 'converted', 'thumbnails', 'batches',
+         'files', 'bytes', 'elapsed'} (insert/update/manifest/link는 작업 종류별 저장 건수)
+    """
+    # 이번 실행에서 등록한 파일도 포함하여 해시 → 원본 파일명 유지
+    known_hashes = dict(known_hashes or {})
+    workers = max(1, workers or INGEST_WORKERS)
+    counts = {ACTION_INSERT: 0, ACTION_UPDATE: 0, ACTION_MANIFEST: 0, ACTION_LINK: 0,
+              'failed': 0, 'converted': 0, 'thumbnails': 0, 'batches': 0}
+    throughput = _Throughput()
+
+    # 워커 프로세스는 기록 스레드(DB 연결 보유)보다 먼저 준비하고, fork 대신 spawn으로 시작하여
+    # 스레드/DB 연결/잠금 상태를 복사한 자식 프로세스가 생기지 않도록 함 (풀은 작업을 넣을 때 프로세스를 만듦)
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_worker, initargs=(list(known_hashes),))
+        print(f"⚙️  워커 {workers}개로 병렬 처리합니다.")
+    else:
+        executor = None
+        _init_worker(known_hashes)
+
+    # 기록 스레드가 밀리면 워커 결과가 메모리에 쌓이지 않도록 큐 크기를 제한
+    records = queue.Queue(maxsize=INGEST_BATCH_SIZE * 4)
+    writer = threading.Thread(target=_writer_loop, args=(app, records, uploaded_by, counts),
+                              name='ingest-writer', daemon=True)
+
+    def handle(result):
+        throughput.add(result['bytes_read'])
+        if result['error']:
+            counts['failed'] += 1
+            print(f"  ❌ 오류: {result['filename']} - {result['error']}")
+            return
+        if result['action'] == ACTION_INSERT:
+            original = known_hashes.get(result['content_hash'])
+            if original is not None:
+                print(f"  🔗 중복 내용: {result['filename']} → {original} (기존 파일로 연결)")
+                result['action'], result['duplicate_of'] = ACTION_LINK, original
+            else:
+                known_hashes[result['content_hash']] = result['filename']
+        counts['converted'] += result['converted']
+        counts['thumbnails'] += result['thumbnails']
+        records.put(result)
+
+    try:
+        writer.start()
+        try:
+            # 진행 중인 작업 수를 제한하여 대용량 폴더에서도 작업 목록을 한꺼번에 만들지 않음
+            pending = set()
+            for task in tasks:
+                if task['action'] == ACTION_MANIFEST:
+                    # 이미 등록된 파일은 변환 없이 매니페스트만 기록 (내용 해시는 다음에 바뀌었을 때 계산)
+                    records.put(dict(task, content_hash=None))
+                elif executor is None:
+                    handle(process_ingest_file(task))
+                else:
+                    pending.add(executor.submit(process_ingest_file, task))
+                    if len(pending) >= workers * 4:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            handle(future.result())
+            for future in wait(pending).done:
+                handle(future.result())
+        finally:
+            records.put(_DONE)
+            writer.join()
+    finally:
+        if executor:
+            executor.shutdown()
+
+    counts['files'] = throughput.files
+    counts['bytes'] = throughput.bytes
+    counts['elapsed'] = time.perf_counter() - throughput.started
+    print(f"  ⏱️  {throughput.summary()}")
+    return counts
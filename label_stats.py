@@ -0,0 +1,149 @@
+"""
+라벨 통계 요약 테이블 관리
+- label_stats 테이블에 전체(user_id=0) / 사용자별 통계를 미리 집계해 둠
+- add_label에서 이전 라벨과의 차이(delta)만 같은 트랜잭션 안에서 반영
+- 전체 재계산 및 검증 기능 (database_manager.py 메뉴에서 사용)
+"""
+
+from collections import Counter
+
+from sqlalchemy import func
+
+from db_config import dialect_insert
+from user import db, Label, LabelStat
+
+GLOBAL_SCOPE = 0  # 전체 통계의 user_id
+TOTAL_METRIC = 'total'
+
+
+def label_metrics(disease_mask, view_type):
+    """라벨 하나가 기여하는 통계 항목 목록"""
+    metrics = [TOTAL_METRIC, f'view:{view_type}']
+    metrics.extend(f'disease:{disease}' for disease in Label.diseases_from_mask(disease_mask))
+    return metrics
+
+
+def _add_counts(user_id, deltas):
+    """(user_id, metric)별 count에 delta를 더함 (행이 없으면 생성)"""
+    for metric, delta in deltas.items():
+        if delta == 0:
+            continue
+        stmt = dialect_insert(LabelStat).values(user_id=user_id, metric=metric, count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['user_id', 'metric'],
+            set_={'count': LabelStat.count + stmt.excluded.count}
+        )
+        db.session.execute(stmt)
+
+
+def lock_label_stats():
+    """전체 total 행을 먼저 갱신(+0)하여 쓰기 잠금을 잡음
+
+    이전 라벨 조회 → 라벨 저장 → 통계 반영이 다른 저장 요청과 섞이지 않도록
+    트랜잭션의 첫 문장으로 호출합니다.
+    """
+    stmt = dialect_insert(LabelStat).values(user_id=GLOBAL_SCOPE, metric=TOTAL_METRIC, count=0)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'metric'],
+        set_={'count': LabelStat.count}
+    )
+    db.session.execute(stmt)
+
+
+def apply_label_change(user_id, previous, current):
+    """라벨 변경분을 전체/사용자 통계에 반영 (커밋은 호출하는 쪽에서)
+
+    Args:
+        previous: 이전 라벨의 (disease_mask, view_type), 새 라벨이면 None
+        current: 저장할 라벨의 (disease_mask, view_type), 삭제면 None
+    """
+    deltas = Counter()
+    if current:
+        deltas.update(label_metrics(*current))
+    if previous:
+        deltas.subtract(label_metrics(*previous))
+    for scope in (GLOBAL_SCOPE, user_id):
+        _add_counts(scope, deltas)
+
+
+def remove_labels_for_files(file_ids):
+    """파일 삭제로 함께 지워질 라벨들을 통계에서 제외 (파일 삭제와 같은 트랜잭션에서 호출)"""
+    if not file_ids:
+        return 0
+    labels = db.session.query(Label.user_id, Label.disease_mask, Label.view_type) \
+        .filter(Label.file_id.in_(file_ids)).all()
+    for user_id, disease_mask, view_type in labels:
+        apply_label_change(user_id, (disease_mask, view_type), None)
+    return len(labels)
+
+
+def read_label_stats(user_id=None):
+    """전체 통계와 사용자 통계를 한 번의 쿼리로 조회
+
+    Returns:
+        (전체 {metric: count}, 사용자 {metric: count})
+    """
+    scopes = [GLOBAL_SCOPE] if user_id is None else [GLOBAL_SCOPE, user_id]
+    rows = db.session.query(LabelStat.user_id, LabelStat.metric, LabelStat.count) \
+        .filter(LabelStat.user_id.in_(scopes)).all()
+    global_counts, user_counts = {}, {}
+    for scope, metric, count in rows:
+        if scope == GLOBAL_SCOPE:
+            global_counts[metric] = count
+        if user_id is not None and scope == user_id:
+            user_counts[metric] = count
+    return global_counts, user_counts
+
+
+def compute_label_stats():
+    """label 테이블에서 통계를 처음부터 계산 (인덱스 GROUP BY 한 번)
+
+    Returns:
+        {(user_id, metric): count}
+    """
+    rows = db.session.query(Label.user_id, Label.disease_mask, Label.view_type, func.count(Label.id)) \
+        .group_by(Label.user_id, Label.disease_mask, Label.view_type).all()
+    counts = Counter()
+    for user_id, disease_mask, view_type, count in rows:
+        for metric in label_metrics(disease_mask, view_type):
+            counts[(GLOBAL_SCOPE, metric)] += count
+            counts[(user_id, metric)] += count
+    return counts
+
+
+def rebuild_label_stats():
+    """label_stats 테이블을 처음부터 다시 계산 (기존 행은 모두 교체)
+
+    Returns:
+        저장한 통계 행 수
+    """
+    counts = compute_label_stats()
+    try:
+        db.session.query(LabelStat).delete()
+        db.session.bulk_insert_mappings(LabelStat, [
+            {'user_id': user_id, 'metric': metric, 'count': count}
+            for (user_id, metric), count in counts.items()
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(counts)
+
+
+def verify_label_stats():
+    """label_stats 테이블이 실제 라벨 데이터와 일치하는지 검증
+
+    Returns:
+        불일치 목록 [(user_id, metric, 저장된 값, 실제 값)]
+    """
+    expected = compute_label_stats()
+    stored = {
+        (user_id, metric): count
+        for user_id, metric, count in db.session.query(LabelStat.user_id, LabelStat.metric, LabelStat.count)
+    }
+    mismatches = []
+    for key in sorted(set(expected) | set(stored), key=lambda k: (k[0], k[1])):
+        if expected.get(key, 0) != stored.get(key, 0):
+            mismatches.append((key[0], key[1], stored.get(key, 0), expected.get(key, 0)))
+    return mismatches
@@ -1,12 +1,24 @@
 import os
 import sys
+import json
+import base64
 from datetime import datetime, timezone, timedelta
 
-from flask import Flask, send_from_directory, request, jsonify, session, redirect, url_for, send_file
+from flask import Flask, send_from_directory, request, jsonify, session, redirect, url_for, send_file, Response, stream_with_context, render_template, make_response
 from flask_cors import CORS
-from user import db, User, File, Label, ensure_database_permissions
+from user import db, User, File, Label, LabelRevision, DISEASE_CATALOG, ensure_database_permissions
+import image_cache
+import label_stats
+import data_export
+import export_jobs
+import ingest
+import dicom_render
+import http_cache
+import static_assets
+import db_config  # DB 연결 설정 (DATABASE_URL, 연결 풀, SQLite PRAGMA)
 from werkzeug.utils import secure_filename
-from sqlalchemy import inspect
+from sqlalchemy import inspect, and_, or_, exists
+from sqlalchemy.orm import aliased, contains_eager
 
 # static/index.html 파일을 웹에서 접근 가능하게 제공
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
@@ -15,8 +27,11 @@ app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 # CORS 설정: 다른 도메인에서의 요청 허용 (나중에 프론트엔드 추가 시 필요)
 CORS(app, supports_credentials=True, origins=['http://localhost:5173'])
 
+# 템플릿에서 해시 포함 자산 URL 사용: {{ asset_url('dashboard.js') }}
+app.jinja_env.globals['asset_url'] = static_assets.asset_url
+
 # 데이터베이스 설정
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+db_config.configure_app(app, os.path.join(os.path.dirname(__file__), 'database', 'app.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 
@@ -207,7 +222,103 @@ def get_current_user():
             return jsonify({'success': True, 'user': user.to_dict()}), 200
     return jsonify({'success': False, 'error': '로그인이 필요합니다.'}), 401
 
+def build_file_list_query(user_id, tab='all'):
+    """파일 목록 쿼리 생성 (파일 + 현재 사용자의 라벨 + 라벨 존재 여부 + 업로더)
+    
+    파일마다 라벨/업로더를 따로 조회하던 N+1 쿼리 대신 한 번의 쿼리로 조회합니다.
+    정렬 기준은 (파일명, ID)이며 커서 기반 페이지네이션도 같은 기준을 사용합니다.
+    """
+    user_label = aliased(Label)
+    any_label = aliased(Label)
+    has_labels = exists().where(any_label.file_id == File.id).correlate(File)
+    
+    query = db.session.query(File, user_label, has_labels.label('has_labels')) \
+        .outerjoin(File.user) \
+        .options(contains_eager(File.user)) \
+        .outerjoin(user_label, and_(user_label.file_id == File.id, user_label.user_id == user_id)) \
+        .order_by(File.filename.asc(), File.id.asc())  # 기본 정렬: 파일명 오름차순
+    
+    # 탭별 필터링
+    if tab == 'completed':
+        # 완료된 파일만 (현재 사용자의 라벨이 있는 파일)
+        query = query.filter(user_label.id.isnot(None))
+    elif tab == 'incomplete':
+        # 미완료 파일만 (현재 사용자의 라벨이 없는 파일)
+        query = query.filter(user_label.id.is_(None))
+    return query
+
+def serialize_file_rows(rows):
+    """build_file_list_query 결과를 API 응답 형태로 변환"""
+    files_with_labels = []
+    for file, label, file_has_labels in rows:
+        file_dict = file.to_dict()  # 업로더는 쿼리에서 함께 로드됨
+        
+        # 현재 사용자의 라벨링 정보 추가
+        if label:
+            file_dict['user_label'] = {
+                'disease': label.disease,
+                'view_type': label.view_type,
+                'code': label.code,
+                'description': label.description
+            }
+        else:
+            file_dict['user_label'] = None
+        
+        file_dict['has_labels'] = bool(file_has_labels)
+        # 이미지/다운로드 URL에 ?v=로 붙이면 내용이 바뀌기 전까지 브라우저 캐시를 그대로 사용
+        file_dict['version'] = http_cache.file_version(file.file_path)
+        
+        files_with_labels.append(file_dict)
+    return files_with_labels
+
+def file_image_url(file_id, version):
+    """버전(?v=)을 붙인 이미지 URL (내용이 바뀌기 전까지 브라우저 캐시를 그대로 사용)"""
+    return f'/api/files/{file_id}/image?v={version}' if version else f'/api/files/{file_id}/image'
+
+def prefetch_next_files(user_id, tab, file_id, count=None):
+    """현재 탭 목록에서 file_id 다음 파일들의 DICOM 렌더링을 백그라운드에서 미리 준비
+
+    Returns:
+        [{'id', 'filename', 'image_url'}] - 화면에서 <link rel=prefetch>로 사용
+    """
+    count = image_cache.PREFETCH_COUNT if count is None else max(0, min(count, 20))
+    current = db.session.get(File, file_id)
+    if current is None or count == 0:
+        return []
+    # 목록과 같은 (파일명, ID) 순서에서 현재 파일 다음 위치부터 조회
+    rows = build_file_list_query(user_id, tab).filter(or_(
+        File.filename > current.filename,
+        and_(File.filename == current.filename, File.id > current.id)
+    )).limit(count).all()
+    files = [file for file, _, _ in rows if file.filename.lower().endswith(('.jpg', '.jpeg', '.png', '.dcm'))]
+    # PNG로 변환되어 등록된 DICOM은 get_image와 같이 매니페스트의 원본 DICOM을 미리 디코딩
+    sources = ingest.dicom_source_paths([file.id for file in files if not file.filename.lower().endswith('.dcm')])
+    image_cache.prefetch_async([file.file_path for file in files], source_paths=list(sources.values()))
+    return [{
+        'id': file.id,
+        'filename': file.filename,
+        'image_url': file_image_url(file.id, http_cache.file_version(file.file_path))
+    } for file in files]
+
+def encode_file_cursor(file):
+    """(파일명, ID)를 불투명한 커서 문자열로 인코딩"""
+    raw = json.dumps([file.filename, file.id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_file_cursor(cursor):
+    """커서 문자열을 (파일명, ID)로 디코딩 (잘못된 커서면 ValueError)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        filename, file_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('invalid cursor')
+    if not isinstance(filename, str) or not isinstance(file_id, int):
+        raise ValueError('invalid cursor')
+    return filename, file_id
+
 # 파일 목록 조회 API 엔드포인트 (페이지네이션 + 지연 로딩 적용)
+# - page/per_page: 기존 OFFSET 방식 (하위 호환)
+# - cursor: (파일명, ID) 기준 키셋 방식, 첫 페이지는 빈 값(cursor=)으로 요청
 @app.route('/api/files', methods=['GET'])
 def get_files():
     user_id = session.get('user_id')
@@ -216,18 +327,41 @@ def get_files():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)  # 한 번에 20개씩
     tab = request.args.get('tab', 'all')  # 탭 필터링
+    cursor = request.args.get('cursor')
     
-    # 기본 쿼리 (파일명 오름차순 정렬)
-    query = File.query.order_by(File.filename.asc())
+    query = build_file_list_query(user_id, tab)
     
-    # 탭별 필터링
-    if tab == 'completed':
-        # 완료된 파일만 (라벨이 있는 파일)
-        query = query.join(Label, File.id == Label.file_id).filter(Label.user_id == user_id)
-    elif tab == 'incomplete':
-        # 미완료 파일만 (라벨이 없는 파일)
-        subquery = db.session.query(Label.file_id).filter(Label.user_id == user_id).subquery()
-        query = query.filter(~File.id.in_(subquery))
+    if cursor is not None:
+        # 커서 이후 위치로 바로 이동 (OFFSET 스캔 없음), 전체 개수는 요청 시에만 계산
+        include_total = request.args.get('include_total', 'false').lower() in ('1', 'true')
+        total = query.order_by(None).count() if include_total else None
+        
+        if cursor:
+            try:
+                last_filename, last_id = decode_file_cursor(cursor)
+            except ValueError:
+                return jsonify({'success': False, 'error': '올바르지 않은 커서입니다.'}), 400
+            query = query.filter(or_(
+                File.filename > last_filename,
+                and_(File.filename == last_filename, File.id > last_id)
+            ))
+        
+        # 다음 페이지 존재 여부 확인을 위해 하나 더 조회
+        rows = query.limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        
+        return jsonify({
+            'success': True,
+            'files': serialize_file_rows(rows),
+            'pagination': {
+                'per_page': per_page,
+                'cursor': cursor,
+                'next_cursor': encode_file_cursor(rows[-1][0]) if has_next else None,
+                'has_next': has_next,
+                'total': total
+            }
+        }), 200
     
     # 페이지네이션 적용
     pagination = query.paginate(
@@ -236,33 +370,9 @@ def get_files():
         error_out=False
     )
     
-    files_with_labels = []
-    for file in pagination.items:
-        file_dict = file.to_dict()
-        
-        # 현재 사용자의 라벨링 정보 추가
-        if user_id:
-            user_label = Label.query.filter_by(user_id=user_id, file_id=file.id).first()
-            if user_label:
-                file_dict['user_label'] = {
-                    'disease': user_label.disease,
-                    'view_type': user_label.view_type,
-                    'code': user_label.code,
-                    'description': user_label.description
-                }
-            else:
-                file_dict['user_label'] = None
-        else:
-            file_dict['user_label'] = None
-        
-        # 라벨링 통계는 별도 API로 분리하여 성능 향상
-        file_dict['has_labels'] = Label.query.filter_by(file_id=file.id).count() > 0
-        
-        files_with_labels.append(file_dict)
-    
     return jsonify({
         'success': True,
-        'files': files_with_labels,
+        'files': serialize_file_rows(pagination.items),
         'pagination': {
             'page': page,
             'per_page': per_page,
@@ -273,74 +383,113 @@ def get_files():
         }
     }), 200
 
-# 파일 다운로드 API 엔드포인트
+# 파일 다운로드 API 엔드포인트 (Range/206 이어받기, SENDFILE_MODE면 앞단 웹 서버가 전송)
 @app.route('/api/files/<int:file_id>/download', methods=['GET'])
 def download_file(file_id):
     file = File.query.get_or_404(file_id)
-    return send_file(file.file_path, as_attachment=True, download_name=file.filename)
+    if not os.path.exists(file.file_path):
+        return jsonify({'success': False, 'error': '파일을 찾을 수 없습니다.'}), 404
+    return http_cache.send_cached_file(file.file_path, http_cache.validators(file.file_path),
+                            as_attachment=True, download_name=file.filename)
 
 # 파일 내용 조회 API 엔드포인트
 @app.route('/api/files/<int:file_id>/content', methods=['GET'])
 def get_file_content(file_id):
     file = File.query.get_or_404(file_id)
     try:
+        # 응답 JSON은 파일 내용과 image_url(버전 포함)에만 의존하므로 원본 기준으로 재검증
+        validators = http_cache.validators(file.file_path, {'kind': 'content'})
+        cached = http_cache.not_modified(*validators)
+        if cached:
+            return cached
+
         # 이미지 파일인지 확인
         if file.filename.lower().endswith(('.jpg', '.jpeg', '.png', '.dcm')):
-            return jsonify({
+            response = jsonify({
                 'success': True,
                 'content': None,
                 'filename': file.filename,
                 'is_image': True,
-                'image_url': f'/api/files/{file_id}/image'
-            }), 200
+                'image_url': file_image_url(file_id, validators[1])
+            })
         else:
             # 텍스트 파일인 경우
             with open(file.file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-            return jsonify({
+            response = jsonify({
                 'success': True,
                 'content': content,
                 'filename': file.filename,
                 'is_image': False
-            }), 200
+            })
+        return http_cache.apply_cache_headers(response, *validators), 200
     except Exception as e:
         return jsonify({'success': False, 'error': '파일을 읽을 수 없습니다.'}), 500
 
-# 이미지 파일 표시 API 엔드포인트 (실시간 DICOM 변환)
+def get_window_options():
+    """이미지 요청의 윈도우 파라미터 (preset 또는 wc/ww) → ((center, width) 또는 None, 오류 메시지)"""
+    # type=float 변환에 실패한 값은 None이 되므로 원래 값이 있었는지 먼저 확인
+    for name in ('wc', 'ww'):
+        if request.args.get(name) and request.args.get(name, type=float) is None:
+            return None, f"{name}는 숫자여야 합니다."
+    try:
+        window = dicom_render.resolve_window(
+            request.args.get('preset'),
+            request.args.get('wc', type=float),
+            request.args.get('ww', type=float),
+        )
+    except ValueError as e:
+        return None, str(e)
+    return window, None
+
+def send_rendered_file(render, validators, mimetype):
+    """렌더링 캐시 파일 전송 (캐시 조회 후 전송 전에 LRU 정리로 삭제되었으면 한 번 다시 렌더링)
+
+    Args:
+        render: 캐시 파일 경로를 반환하는 함수 (없으면 렌더링하여 저장)
+    """
+    try:
+        return http_cache.send_cached_file(render(), validators, mimetype=mimetype)
+    except FileNotFoundError:
+        return http_cache.send_cached_file(render(), validators, mimetype=mimetype)
+
+# 이미지 파일 표시 API 엔드포인트 (DICOM은 렌더링 캐시 사용)
+# preset=lung|mediastinum|abdomen 또는 wc/ww로 윈도우를 지정하면 디코딩 배열 메모리 캐시에서 LUT만 다시 적용
 @app.route('/api/files/<int:file_id>/image', methods=['GET'])
 def get_image(file_id):
     file = File.query.get_or_404(file_id)
+    window, error = get_window_options()
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+
     try:
+        # ETag는 원본 stat + 렌더링 파라미터로 계산하므로 클라이언트 캐시가 최신이면 렌더링 없이 304
+        # 버전(v)은 파일 목록과 같도록 등록된 파일 기준
+        version = http_cache.file_version(file.file_path)
+        if window is not None and file.filename.lower().endswith(('.dcm', '.png', '.jpg', '.jpeg')):
+            # PNG로 변환되어 등록된 DICOM은 원본 DICOM의 저장값에 윈도우 적용
+            # (HU 기준 윈도우를 8비트 영상에 적용하면 빈/포화 영상이 되므로 원본 DICOM이 없으면 400)
+            source_path = file.file_path
+            if not file.filename.lower().endswith('.dcm'):
+                source_path = ingest.dicom_source_path(file.id)
+                if source_path is None:
+                    return jsonify({'success': False, 'error': '윈도우 조절은 원본 DICOM이 있는 파일에만 사용할 수 있습니다.'}), 400
+            etag, _, last_modified = http_cache.validators(source_path, image_cache.window_params(window))
+            cached = http_cache.not_modified(etag, version, last_modified)
+            if cached:
+                return cached
+            return send_rendered_file(lambda: image_cache.get_or_render_window(source_path, window),
+                                      (etag, version, last_modified), 'image/png')
+
         # DICOM 파일인지 확인
         if file.filename.lower().endswith('.dcm'):
-            # 실시간 DICOM → PNG 변환
-            import pydicom
-            from PIL import Image
-            import numpy as np
-            import io
-            
-            # DICOM 파일 읽기
-            ds = pydicom.dcmread(file.file_path)
-            arr = ds.pixel_array
-            
-            # 정규화 (0-255 범위로)
-            arr = arr.astype(float)
-            arr = (arr - arr.min()) / (arr.max() - arr.min()) * 255.0
-            arr = arr.astype(np.uint8)
-            
-            # 2D 배열로 변환 (3D인 경우 첫 번째 슬라이스 사용)
-            if arr.ndim == 2:
-                img = Image.fromarray(arr)
-            else:
-                img = Image.fromarray(arr[0])
-            
-            # 메모리에서 PNG로 변환
-            img_io = io.BytesIO()
-            img.save(img_io, 'PNG')
-            img_io.seek(0)
-            
-            # PNG 데이터를 브라우저로 전송 (파일 저장 안함)
-            return send_file(img_io, mimetype='image/png')
+            etag, _, last_modified = http_cache.validators(file.file_path, image_cache.DEFAULT_RENDER_PARAMS)
+            cached = http_cache.not_modified(etag, version, last_modified)
+            if cached:
+                return cached
+            # 캐시에 있으면 pydicom/Pillow 없이 디스크에서 바로 전송, 없으면 변환 후 캐시에 저장
+            return send_rendered_file(lambda: image_cache.get_or_render_dicom(file.file_path),
+                                      (etag, version, last_modified), 'image/png')
             
         else:
             # 일반 이미지 파일 (PNG, JPG 등)
@@ -352,12 +501,61 @@ def get_image(file_id):
             else:
                 mimetype = 'image/jpeg'  # 기본값
             
-            return send_file(file.file_path, mimetype=mimetype)
+            return http_cache.send_cached_file(file.file_path, http_cache.validators(file.file_path), mimetype=mimetype)
             
     except Exception as e:
         print(f"❌ 이미지 처리 오류: {e}")
         return jsonify({'success': False, 'error': '이미지를 불러올 수 없습니다.'}), 500
 
+# 다음 파일 미리 렌더링 API 엔드포인트 (현재 탭 목록 기준 다음 count개)
+@app.route('/api/files/<int:file_id>/prefetch', methods=['POST'])
+def prefetch_files(file_id):
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': '로그인이 필요합니다.'}), 401
+    
+    File.query.get_or_404(file_id)
+    files = prefetch_next_files(
+        session['user_id'],
+        request.args.get('tab', 'all'),
+        file_id,
+        request.args.get('count', type=int)
+    )
+    return jsonify({'success': True, 'prefetch': files}), 200
+
+# 썸네일 API 엔드포인트 (목록 화면용, 크기별 버킷으로 미리 생성/캐시)
+@app.route('/api/files/<int:file_id>/thumbnail', methods=['GET'])
+def get_thumbnail(file_id):
+    file = File.query.get_or_404(file_id)
+    if not file.filename.lower().endswith(('.jpg', '.jpeg', '.png', '.dcm')):
+        return jsonify({'success': False, 'error': '이미지 파일이 아닙니다.'}), 400
+    
+    size = image_cache.thumbnail_bucket(request.args.get('size', 256, type=int))
+    
+    # 형식: format 파라미터 우선, 없으면 브라우저가 WebP를 지원할 때 WebP 사용
+    formats = image_cache.supported_thumbnail_formats()
+    fmt = request.args.get('format', '').lower()
+    if fmt not in formats:
+        fmt = 'webp' if 'webp' in formats and 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
+    
+    try:
+        validators = http_cache.validators(file.file_path, image_cache.thumbnail_params(size, fmt))
+        response = http_cache.not_modified(*validators)
+        if response is None:
+            response = send_rendered_file(lambda: image_cache.get_or_render_thumbnail(file.file_path, size, fmt),
+                                          validators, image_cache.THUMBNAIL_MIMETYPES[fmt])
+        response.vary.add('Accept')
+        return response
+    except Exception as e:
+        print(f"❌ 썸네일 생성 오류: {e}")
+        return jsonify({'success': False, 'error': '썸네일을 불러올 수 없습니다.'}), 500
+
+# 렌더링 캐시 통계 API 엔드포인트
+@app.route('/api/cache/stats', methods=['GET'])
+def get_render_cache_stats():
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': '로그인이 필요합니다.'}), 401
+    return jsonify({'success': True, 'stats': image_cache.get_stats()}), 200
+
 # 라벨링 API 엔드포인트
 @app.route('/api/label', methods=['POST'])
 def add_label():
@@ -379,12 +577,7 @@ def add_label():
         description = data['description']
         
         # 질환 유효성 검사 (리스트 형태로 처리)
-        valid_diseases = [
-            '정상', 'Respiratory Distress Syndrome', 'Bronchopulmonary Dysplasia', 
-            'Pneumothorax', 'Pulmonary Interstitial Emphysema', 
-            'Pneumomediastinum', 'Subcutaneous Emphysema', 
-            'Pneumopericardium', 'Necrotizing Enterocolitis', '직접입력(추가)'
-        ]
+        valid_diseases = DISEASE_CATALOG
         
         # disease가 리스트가 아니라면 리스트로 변환
         if not isinstance(diseases, list):
@@ -400,41 +593,72 @@ def add_label():
         if view_type not in valid_view_types:
             return jsonify({'success': False, 'error': '올바르지 않은 사진 종류입니다.'}), 400
         
-        # 기존 라벨 확인 (업데이트식 구조 유지)
-        existing_label = Label.query.filter_by(
+        # 없는 파일이면 외래 키 오류(500) 대신 404
+        if db.session.get(File, file_id) is None:
+            return jsonify({'success': False, 'error': '파일을 찾을 수 없습니다.'}), 404
+        
+        # 통계 갱신 순서를 보장하기 위해 통계 잠금을 트랜잭션의 첫 문장으로 잡음
+        label_stats.lock_label_stats()
+        
+        # 통계 변경분 계산을 위한 이전 라벨 (없으면 새 라벨)
+        previous = db.session.query(Label.disease_mask, Label.view_type).filter_by(
             user_id=session['user_id'], 
             file_id=file_id
         ).first()
         
-        if existing_label:
-            # 기존 라벨이 있으면 업데이트 (덮어쓰기)
-            existing_label.set_diseases(diseases)  # 새로운 메서드 사용
-            existing_label.view_type = view_type
-            existing_label.code = code
-            existing_label.description = description
-            existing_label.created_at = get_kst_now()  # KST 기준으로 업데이트
-            disease_str = ', '.join(diseases)
+        # 라벨 저장 (업데이트식 구조 유지): (user_id, file_id) 유니크 제약 기준 단일 upsert
+        # 동시에 두 번 저장해도 중복 라벨이 생기지 않음
+        disease_mask = Label.disease_mask_for(diseases)
+        label_values = {
+            'disease': Label.serialize_diseases(diseases),
+            'disease_mask': disease_mask,
+            'view_type': view_type,
+            'code': code,
+            'description': description,
+            'created_at': get_kst_now()  # KST 기준으로 생성/업데이트
+        }
+        stmt = db_config.dialect_insert(Label).values(
+            user_id=session['user_id'],
+            file_id=file_id,
+            **label_values
+        ).on_conflict_do_update(
+            index_elements=['user_id', 'file_id'],
+            set_=label_values
+        )
+        db.session.execute(stmt)
+        
+        # 변경 이력은 덮어쓰지 않고 한 행씩 추가 (라벨 저장과 같은 트랜잭션)
+        db.session.execute(db.insert(LabelRevision).values(
+            user_id=session['user_id'],
+            file_id=file_id,
+            **label_values
+        ))
+        
+        # 통계 요약 테이블에 변경분만 반영 (라벨 저장과 같은 트랜잭션)
+        label_stats.apply_label_change(
+            session['user_id'],
+            tuple(previous) if previous else None,
+            (disease_mask, view_type)
+        )
+        db.session.commit()
+        
+        # 다음 파일 렌더링은 응답을 기다리게 하지 않도록 백그라운드에서 처리
+        try:
+            prefetch = prefetch_next_files(session['user_id'], data.get('tab', 'all'), file_id)
+        except Exception as e:
+            print(f"⚠️ 다음 파일 미리 렌더링 요청 실패: {e}")
+            prefetch = []
+        
+        disease_str = ', '.join(diseases)
+        if previous:
             message = f"라벨이 업데이트되었습니다: {disease_str} - {code}"
         else:
-            # 새 라벨 생성
-            new_label = Label(
-                user_id=session['user_id'],
-                file_id=file_id,
-                view_type=view_type,
-                code=code,
-                description=description,
-                created_at=get_kst_now()  # KST 기준으로 생성
-            )
-            new_label.set_diseases(diseases)  # 새로운 메서드 사용
-            db.session.add(new_label)
-            disease_str = ', '.join(diseases)
             message = f"라벨이 추가되었습니다: {disease_str} - {code}"
         
-        db.session.commit()
-        
         return jsonify({
             'success': True,
-            'message': message
+            'message': message,
+            'prefetch': prefetch
         }), 200
         
     except Exception as e:
@@ -477,51 +701,112 @@ def get_user_label_history(file_id):
     except Exception as e:
         return jsonify({'success': False, 'error': '서버 오류가 발생했습니다.'}), 500
 
-# 라벨링 통계 API 엔드포인트
+def get_revision_user():
+    """라벨 이력을 조회할 사용자 ID (다른 사용자의 이력은 내보내기 권한이 있는 사용자만 조회 가능)
+
+    Returns:
+        (user_id, None) 또는 (None, 오류 응답)
+    """
+    user_id = request.args.get('user_id', type=int)
+    if user_id is None or user_id == session['user_id']:
+        return session['user_id'], None
+    current_user = db.session.get(User, session['user_id'])
+    if not current_user or current_user.username not in EXPORT_ALLOWED_USERS:
+        return None, (jsonify({'success': False, 'error': '다른 사용자의 라벨 이력을 조회할 권한이 없습니다.'}), 403)
+    return user_id, None
+
+def parse_as_of(value):
+    """기준 시각 파라미터를 저장 형식(시간대 없는 KST)으로 변환 (시간대가 없으면 KST로 간주)"""
+    as_of = datetime.fromisoformat(value)
+    if as_of.tzinfo is not None:
+        as_of = as_of.astimezone(timezone(timedelta(hours=9))).replace(tzinfo=None)
+    if as_of.microsecond == 0:
+        # 초 단위로 입력하면 그 초에 저장된 라벨까지 포함 (저장 시각은 마이크로초까지 기록됨)
+        as_of = as_of.replace(microsecond=999999)
+    return as_of
+
+# 라벨 변경 이력 조회 API (최근 순)
+@app.route('/api/label/revisions/<int:file_id>', methods=['GET'])
+def get_label_revisions(file_id):
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': '로그인이 필요합니다.'}), 401
+    
+    user_id, error = get_revision_user()
+    if error:
+        return error
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    
+    # (file_id, user_id, created_at) 인덱스 범위만 역순으로 읽음
+    revisions = LabelRevision.query.filter_by(
+        file_id=file_id,
+        user_id=user_id
+    ).order_by(LabelRevision.created_at.desc(), LabelRevision.id.desc()).limit(limit).all()
+    
+    return jsonify({
+        'success': True,
+        'revisions': [revision.to_dict() for revision in revisions]
+    }), 200
+
+# 특정 시각 기준 라벨 조회 API (?at=2025-07-01T09:00:00)
+@app.route('/api/label/as-of/<int:file_id>', methods=['GET'])
+def get_label_as_of(file_id):
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'error': '로그인이 필요합니다.'}), 401
+    
+    user_id, error = get_revision_user()
+    if error:
+        return error
+    try:
+        as_of = parse_as_of(request.args['at'])
+    except (KeyError, ValueError):
+        return jsonify({'success': False, 'error': 'at 파라미터에 ISO 형식 시각을 입력해주세요.'}), 400
+    
+    # 인덱스에서 기준 시각 이전의 마지막 이력 한 행만 찾음 (이력 전체를 읽지 않음)
+    revision = LabelRevision.query.filter(
+        LabelRevision.file_id == file_id,
+        LabelRevision.user_id == user_id,
+        LabelRevision.created_at <= as_of
+    ).order_by(LabelRevision.created_at.desc(), LabelRevision.id.desc()).first()
+    
+    if revision:
+        return jsonify({
+            'success': True,
+            'has_label': True,
+            'as_of': as_of.strftime('%Y-%m-%d %H:%M:%S'),
+            'label': revision.to_dict()
+        }), 200
+    return jsonify({
+        'success': True,
+        'has_label': False,
+        'as_of': as_of.strftime('%Y-%m-%d %H:%M:%S'),
+        'message': '해당 시각에는 이 파일에 대한 라벨이 없었습니다.'
+    }), 200
+
+# 통계 대상 질환 (카탈로그에서 정상/직접입력 제외) / 사진 종류
+STATS_DISEASES = [disease for disease in DISEASE_CATALOG if disease not in ('정상', '직접입력(추가)')]
+STATS_VIEW_TYPES = ['AP', 'LATDEQ', 'LAT', 'PA']
+
+def format_label_stats(counts):
+    """label_stats 항목({metric: count})을 API 응답 형태로 변환"""
+    disease_stats = {disease: counts.get(f'disease:{disease}', 0) for disease in STATS_DISEASES}
+    view_stats = {view_type: counts.get(f'view:{view_type}', 0) for view_type in STATS_VIEW_TYPES}
+    return counts.get(label_stats.TOTAL_METRIC, 0), disease_stats, view_stats
+
+# 라벨링 통계 API 엔드포인트 (label_stats 요약 테이블에서 바로 조회)
 @app.route('/api/label/stats', methods=['GET'])
 def get_label_stats():
     try:
-        # 전체 통계
-        total_labels = Label.query.count()
-        
-        # 질환별 통계
-        disease_stats = {}
-        diseases = [
-            'Respiratory Distress Syndrome', 'Bronchopulmonary Dysplasia', 
-            'Pneumothorax', 'Pulmonary Interstitial Emphysema', 
-            'Pneumomediastinum', 'Subcutaneous Emphysema', 
-            'Pneumopericardium', 'Necrotizing Enterocolitis'
-        ]
-        
-        for disease in diseases:
-            # JSON 형태로 저장된 질환들을 검색하기 위해 LIKE 연산자 사용
-            count = Label.query.filter(Label.disease.like(f'%"{disease}"%')).count()
-            disease_stats[disease] = count
+        global_counts, user_counts = label_stats.read_label_stats(session.get('user_id'))
         
-        # 사진 종류별 통계
-        view_stats = {}
-        view_types = ['AP', 'LATDEQ', 'LAT', 'PA']
-        for view_type in view_types:
-            count = Label.query.filter_by(view_type=view_type).count()
-            view_stats[view_type] = count
+        # 전체 통계 (질환별 / 사진 종류별 포함)
+        total_labels, disease_stats, view_stats = format_label_stats(global_counts)
         
         # 사용자별 통계
         user_stats = {}
         if 'user_id' in session:
-            user_labels = Label.query.filter_by(user_id=session['user_id']).all()
-            user_disease_stats = {}
-            user_view_stats = {}
-            
-            for disease in diseases:
-                count = sum(1 for label in user_labels if label.has_disease(disease))
-                user_disease_stats[disease] = count
-            
-            for view_type in view_types:
-                count = sum(1 for label in user_labels if label.view_type == view_type)
-                user_view_stats[view_type] = count
-            
+            user_total, user_disease_stats, user_view_stats = format_label_stats(user_counts)
             user_stats = {
-                'total': len(user_labels),
+                'total': user_total,
                 'diseases': user_disease_stats,
                 'view_types': user_view_stats
             }
@@ -539,104 +824,53 @@ def get_label_stats():
     except Exception as e:
         return jsonify({'success': False, 'error': '서버 오류가 발생했습니다.'}), 500
 
+# 내보내기 권한이 있는 사용자 (하드코딩)
+EXPORT_ALLOWED_USERS = ['김현호', 'testuser1']
+
+def get_export_user():
+    """현재 로그인한 사용자의 내보내기 권한 확인
+    
+    Returns:
+        (사용자, None) 또는 권한이 없으면 (None, 오류 응답)
+    """
+    # 현재 로그인된 사용자 확인
+    user_id = session.get('user_id')
+    if not user_id:
+        return None, (jsonify({'success': False, 'error': '로그인이 필요합니다.'}), 401)
+    
+    current_user = User.query.get(user_id)
+    if not current_user:
+        return None, (jsonify({'success': False, 'error': '사용자 정보를 찾을 수 없습니다.'}), 401)
+    
+    # 허용된 사용자인지 확인
+    if current_user.username not in EXPORT_ALLOWED_USERS:
+        return None, (jsonify({'success': False, 'error': '엑셀 다운로드 권한이 없습니다. 관리자에게 문의하세요.'}), 403)
+    
+    return current_user, None
+
 # 데이터베이스 Excel 내보내기 API 엔드포인트 (권한 제한 없음)
 @app.route('/api/export/excel', methods=['GET'])
 def export_database_excel():
     """데이터베이스를 Excel 파일로 내보내기 (특정 사용자만 가능)"""
     try:
-        # 사용자 권한 확인 (하드코딩)
-        allowed_users = ['김현호', 'testuser1']
-        
-        # 현재 로그인된 사용자 확인
-        user_id = session.get('user_id')
-        if not user_id:
-            return jsonify({'success': False, 'error': '로그인이 필요합니다.'}), 401
-        
-        current_user = User.query.get(user_id)
-        if not current_user:
-            return jsonify({'success': False, 'error': '사용자 정보를 찾을 수 없습니다.'}), 401
+        # 사용자 권한 확인
+        current_user, error_response = get_export_user()
+        if error_response:
+            return error_response
         
-        # 허용된 사용자인지 확인
-        if current_user.username not in allowed_users:
-            return jsonify({'success': False, 'error': '엑셀 다운로드 권한이 없습니다. 관리자에게 문의하세요.'}), 403
-        
-        import pandas as pd
-        from io import BytesIO
+        import tempfile
         from datetime import datetime
         
         print(f"📊 데이터베이스를 Excel로 내보내는 중...")
         
-        # 1. 사용자 데이터 내보내기
-        users_data = []
-        users = User.query.all()
-        for user in users:
-            users_data.append({
-                'ID': user.id,
-                '사용자명': user.username,
-                '이메일': user.email,
-                '가입일': user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else ''
-            })
-        
-        # 2. 파일 데이터 내보내기
-        files_data = []
-        files = File.query.all()
-        for file in files:
-            size_kb = file.file_size / 1024 if file.file_size else 0
-            files_data.append({
-                'ID': file.id,
-                '파일명': file.filename,
-                '파일경로': file.file_path,
-                '크기(KB)': round(size_kb, 1),
-                '업로드일': file.upload_date.strftime('%Y-%m-%d %H:%M:%S') if file.upload_date else '',
-                '업로더ID': file.uploaded_by
-            })
-        
-        # 3. 라벨 데이터 내보내기
-        labels_data = []
-        labels = Label.query.all()
-        for label in labels:
-            labels_data.append({
-                'ID': label.id,
-                '사용자ID': label.user_id,
-                '파일ID': label.file_id,
-                '질환': label.disease,
-                '사진종류': label.view_type,
-                '코드': label.code,
-                '설명': label.description,
-                '생성일': label.created_at.strftime('%Y-%m-%d %H:%M:%S') if label.created_at else ''
-            })
-        
-        # Excel 파일 생성
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # 사용자 시트
-            if users_data:
-                df_users = pd.DataFrame(users_data)
-                df_users.to_excel(writer, sheet_name='사용자', index=False)
-            
-            # 파일 시트
-            if files_data:
-                df_files = pd.DataFrame(files_data)
-                df_files.to_excel(writer, sheet_name='파일', index=False)
-            
-            # 라벨 시트
-            if labels_data:
-                df_labels = pd.DataFrame(labels_data)
-                df_labels.to_excel(writer, sheet_name='라벨', index=False)
-            
-            # 요약 시트
-            summary_data = {
-                '항목': ['사용자', '파일', '라벨', '총 크기(KB)'],
-                '개수': [
-                    len(users_data),
-                    len(files_data),
-                    len(labels_data),
-                    round(sum(f['크기(KB)'] for f in files_data), 1)
-                ]
-            }
-            df_summary = pd.DataFrame(summary_data)
-            df_summary.to_excel(writer, sheet_name='요약', index=False)
-        
+        # DB에서 조금씩 읽어 임시 파일에 바로 기록 (메모리에 전체 데이터를 올리지 않음)
+        # 임시 파일은 응답 전송이 끝나고 닫힐 때 자동으로 삭제됨
+        output = tempfile.TemporaryFile(suffix='.xlsx')
+        try:
+            counts = data_export.write_excel_export(output)
+        except Exception:
+            output.close()
+            raise
         output.seek(0)
         
         # 파일명에 현재 시간 추가
@@ -645,24 +879,145 @@ def export_database_excel():
         
         print(f"✅ Excel 파일이 생성되었습니다: {filename}")
         print(f"📊 내보낸 데이터:")
-        print(f"  - 사용자: {len(users_data)}명")
-        print(f"  - 파일: {len(files_data)}개")
-        print(f"  - 라벨: {len(labels_data)}개")
-        print(f"  - 총 크기: {round(sum(f['크기(KB)'] for f in files_data), 1)}KB")
+        print(f"  - 사용자: {counts['users']}명")
+        print(f"  - 파일: {counts['files']}개")
+        print(f"  - 라벨: {counts['labels']}개")
+        print(f"  - 총 크기: {counts['total_size_kb']}KB")
         
+        # 임시 파일을 청크 단위로 전송
         return send_file(
             output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            mimetype=data_export.EXCEL_MIMETYPE,
             as_attachment=True,
             download_name=filename
         )
         
     except ImportError:
-        return jsonify({'success': False, 'error': 'Excel export를 위해 필요한 패키지가 설치되지 않았습니다. pandas와 openpyxl을 설치해주세요.'}), 500
+        return jsonify({'success': False, 'error': 'Excel export를 위해 필요한 패키지가 설치되지 않았습니다. openpyxl을 설치해주세요.'}), 500
     except Exception as e:
         print(f"❌ Excel 내보내기 오류: {e}")
         return jsonify({'success': False, 'error': 'Excel 파일 생성 중 오류가 발생했습니다.'}), 500
 
+def get_export_options(default_type=None):
+    """요청의 format / type 파라미터 확인
+    
+    Returns:
+        (형식, 데이터 종류, None) 또는 잘못된 값이면 (None, None, 오류 응답)
+    """
+    fmt = (request.args.get('format') or 'xlsx').lower()
+    data_type = request.args.get('type', default_type)
+    if fmt not in data_export.EXPORT_FORMATS:
+        return None, None, (jsonify({'success': False, 'error': f'지원하지 않는 형식입니다. ({", ".join(data_export.EXPORT_FORMATS)})'}), 400)
+    if data_type is not None and data_type not in data_export.EXPORT_RECORDS:
+        return None, None, (jsonify({'success': False, 'error': f'지원하지 않는 데이터 종류입니다. ({", ".join(data_export.EXPORT_RECORDS)})'}), 400)
+    if data_type is None and fmt != 'xlsx':
+        # xlsx 외 형식은 파일 하나에 한 종류만 담을 수 있으므로 라벨을 기본값으로 사용
+        data_type = 'labels'
+    return fmt, data_type, None
+
+# 형식 지정 내보내기 API 엔드포인트 (GET /api/export?format=csv|jsonl|parquet|xlsx&type=labels|files|users)
+@app.route('/api/export', methods=['GET'])
+def export_database():
+    """머신러닝 파이프라인용 형식으로 내보내기 (특정 사용자만 가능)"""
+    current_user, error_response = get_export_user()
+    if error_response:
+        return error_response
+    
+    fmt, data_type, error_response = get_export_options(default_type='labels')
+    if error_response:
+        return error_response
+    
+    mimetype, ext = data_export.EXPORT_FORMATS[fmt]
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f'{data_type}_export_{timestamp}.{ext}'
+    
+    if fmt in data_export.TEXT_EXPORT_FORMATS:
+        # CSV/JSONL은 DB에서 읽는 대로 응답으로 바로 흘려보냄 (임시 파일 없음)
+        print(f"📊 {data_type} 데이터를 {fmt}로 스트리밍 내보내기 ({current_user.username})")
+        return Response(
+            stream_with_context(data_export.iter_text_export(fmt, data_type)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    
+    try:
+        import tempfile
+        
+        # xlsx/parquet는 파일 끝에 메타데이터를 쓰므로 임시 파일에 기록 후 전송
+        output = tempfile.TemporaryFile(suffix=f'.{ext}')
+        try:
+            rows = data_export.write_export(output, fmt, data_type)
+        except Exception:
+            output.close()
+            raise
+        output.seek(0)
+        print(f"✅ {data_type} 데이터를 {fmt}로 내보냈습니다: {filename} ({rows}행)")
+        
+        return send_file(output, mimetype=mimetype, as_attachment=True, download_name=filename)
+        
+    except ImportError:
+        package = 'pyarrow' if fmt == 'parquet' else 'openpyxl'
+        return jsonify({'success': False, 'error': f'{fmt} 내보내기를 위해 필요한 패키지가 설치되지 않았습니다. {package}을 설치해주세요.'}), 500
+    except Exception as e:
+        print(f"❌ {fmt} 내보내기 오류: {e}")
+        return jsonify({'success': False, 'error': '내보내기 파일 생성 중 오류가 발생했습니다.'}), 500
+
+# 백그라운드 내보내기 작업 생성 API 엔드포인트 (작업 ID를 바로 반환)
+# ?format=xlsx|csv|jsonl|parquet&type=users|files|labels (기본: 전체 데이터 xlsx)
+@app.route('/api/export/jobs', methods=['POST'])
+def create_export_job():
+    current_user, error_response = get_export_user()
+    if error_response:
+        return error_response
+    
+    fmt, data_type, error_response = get_export_options()
+    if error_response:
+        return error_response
+    
+    try:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        ext = data_export.EXPORT_FORMATS[fmt][1]
+        prefix = data_type or 'database'
+        job = export_jobs.submit_export_job(app, current_user.id, f'{prefix}_export_{timestamp}.{ext}',
+                                            fmt=fmt, data_type=data_type)
+        print(f"📊 내보내기 작업 등록: {job['id']} ({current_user.username})")
+        return jsonify({'success': True, 'job': export_jobs.job_to_dict(job)}), 202
+    except Exception as e:
+        print(f"❌ 내보내기 작업 등록 오류: {e}")
+        return jsonify({'success': False, 'error': '내보내기 작업을 시작할 수 없습니다.'}), 500
+
+# 내보내기 작업 진행 상태 조회 API 엔드포인트
+@app.route('/api/export/jobs/<job_id>', methods=['GET'])
+def get_export_job(job_id):
+    current_user, error_response = get_export_user()
+    if error_response:
+        return error_response
+    
+    job = export_jobs.get_job(job_id)
+    if not job or job['user_id'] != current_user.id:
+        return jsonify({'success': False, 'error': '내보내기 작업을 찾을 수 없습니다.'}), 404
+    return jsonify({'success': True, 'job': export_jobs.job_to_dict(job)}), 200
+
+# 완료된 내보내기 파일 다운로드 API 엔드포인트 (만료 전까지 다시 다운로드 가능)
+@app.route('/api/export/jobs/<job_id>/download', methods=['GET'])
+def download_export_job(job_id):
+    current_user, error_response = get_export_user()
+    if error_response:
+        return error_response
+    
+    job = export_jobs.get_job(job_id)
+    if not job or job['user_id'] != current_user.id:
+        return jsonify({'success': False, 'error': '내보내기 작업을 찾을 수 없습니다.'}), 404
+    if job['status'] != 'done' or not os.path.exists(job['path']):
+        return jsonify({'success': False, 'error': '아직 내보내기 파일이 준비되지 않았습니다.'}), 409
+    
+    return send_file(
+        job['path'],
+        mimetype=job['mimetype'],
+        as_attachment=True,
+        download_name=job['download_name']
+    )
+
 # 라벨링 방법 도움말 API 엔드포인트
 @app.route('/api/help', methods=['GET'])
 def get_help():
@@ -788,1809 +1143,24 @@ def dashboard():
         session.pop('user_id', None)
         return redirect('/')
     
-    # 간단한 대시보드 HTML 반환
-    return f'''
-    <!DOCTYPE html>
-    <html lang="ko">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>대시보드</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                margin: 0;
-                padding: 20px;
-                background-color: #f5f5f5;
-            }}
-            .container {{
-                max-width: 1200px;
-                margin: 0 auto;
-                background: white;
-                padding: 30px;
-                border-radius: 10px;
-                box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            }}
-            .header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 30px;
-                padding-bottom: 20px;
-                border-bottom: 1px solid #eee;
-            }}
-            
-            .header-buttons {{
-                display: flex;
-                gap: 10px;
-                align-items: center;
-            }}
-            
-            .export-btn {{
-                padding: 10px 20px;
-                background-color: #28a745;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                cursor: pointer;
-                margin-right: 10px;
-            }}
-            
-            .export-btn:hover {{
-                background-color: #218838;
-            }}
-            
-            .help-btn {{
-                padding: 10px 20px;
-                background-color: #17a2b8;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                cursor: pointer;
-            }}
-            
-            .help-btn:hover {{
-                background-color: #138496;
-            }}
-            
-            .logout-btn {{
-                padding: 10px 20px;
-                background-color: #dc3545;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                cursor: pointer;
-            }}
-            .logout-btn:hover {{
-                background-color: #c82333;
-            }}
-
-            .file-list {{
-                margin-top: 30px;
-            }}
-            .file-item {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                padding: 15px;
-                border: 1px solid #eee;
-                border-radius: 5px;
-                margin-bottom: 10px;
-            }}
-            .file-info {{
-                flex: 1;
-            }}
-            .file-actions {{
-                display: flex;
-                gap: 10px;
-                align-items: center;
-            }}
-            .btn {{
-                padding: 5px 10px;
-                border: none;
-                border-radius: 3px;
-                cursor: pointer;
-                text-decoration: none;
-                color: white;
-                font-size: 12px;
-            }}
-            .btn-primary {{
-                background-color: #007bff;
-            }}
-            .btn-success {{
-                background-color: #28a745;
-            }}
-            .btn-danger {{
-                background-color: #dc3545;
-            }}
-            .btn-warning {{
-                background-color: #ffc107;
-                color: #212529;
-            }}
-            .label-buttons {{
-                display: flex;
-                gap: 5px;
-            }}
-            .label-btn {{
-                padding: 3px 8px;
-                border: none;
-                border-radius: 3px;
-                cursor: pointer;
-                font-size: 11px;
-            }}
-            .like-btn {{
-                background-color: #28a745;
-                color: white;
-            }}
-            .history-btn {{
-                background-color: #17a2b8;
-                color: white;
-            }}
-            .like-btn:hover {{
-                background-color: #218838;
-            }}
-            .history-btn:hover {{
-                background-color: #138496;
-            }}
-            .stats {{
-                display: flex;
-                gap: 20px;
-                margin-bottom: 20px;
-                padding: 15px;
-                background-color: #f8f9fa;
-                border-radius: 5px;
-            }}
-            .stat-item {{
-                text-align: center;
-            }}
-            .stat-number {{
-                font-size: 24px;
-                font-weight: bold;
-                color: #007bff;
-            }}
-            .stat-label {{
-                font-size: 12px;
-                color: #666;
-            }}
-            
-
-            
-            .message {{
-                margin: 10px 0;
-                padding: 10px;
-                border-radius: 5px;
-                text-align: center;
-            }}
-            .success {{
-                background-color: #d4edda;
-                color: #155724;
-            }}
-            .error {{
-                background-color: #f8d7da;
-                color: #721c24;
-            }}
-            
-            /* 모달 스타일 */
-            .modal {{
-                display: none;
-                position: fixed;
-                z-index: 1000;
-                left: 0;
-                top: 0;
-                width: 100%;
-                height: 100%;
-                background-color: rgba(0,0,0,0.5);
-            }}
-            
-            .modal-content {{
-                background-color: white;
-                margin: 5% auto;
-                padding: 0;
-                border-radius: 10px;
-                width: 95%;
-                max-width: 700px;
-                max-height: 80vh;
-                overflow-y: auto;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.3);
-            }}
-            
-            .modal-header {{
-                padding: 20px;
-                border-bottom: 1px solid #eee;
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-            }}
-            
-            .modal-header h2 {{
-                margin: 0;
-                color: #333;
-            }}
-            
-            .close {{
-                color: #aaa;
-                font-size: 28px;
-                font-weight: bold;
-                cursor: pointer;
-            }}
-            
-            .close:hover {{
-                color: #000;
-            }}
-            
-            .modal-body {{
-                padding: 20px;
-                max-width: 100%;
-                overflow-x: hidden;
-            }}
-            
-            .form-group {{
-                margin-bottom: 20px;
-            }}
-            
-            .form-group label {{
-                display: block;
-                margin-bottom: 5px;
-                font-weight: bold;
-                color: #333;
-            }}
-            
-            /* 흉부 X선 소견 제목 스타일 */
-            .symptom-title {{
-                font-size: 16px;
-                font-weight: bold;
-                margin-bottom: 8px;
-                margin-top: 10px;
-                color: #222;
-            }}
-            
-            .symptom-title .subtitle {{
-                font-size: 12px;
-                font-weight: normal;
-                color: #666;
-            }}
-            
-            .symptoms-table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin-top: 10px;
-            }}
-
-            .symptom-row {{
-                border-bottom: 1px solid #f0f0f0;
-            }}
-
-            .symptom-row:hover {{
-                background-color: #f8f9fa;
-            }}
-
-            .symptom-label {{
-                padding: 8px 12px;
-                text-align: left;
-                vertical-align: middle;
-                width: 85%;
-            }}
-
-            .symptom-label label {{
-                font-size: 13px;
-                color: #333;
-                line-height: 1.4;
-                font-weight: normal;
-                cursor: pointer;
-                display: block;
-            }}
-
-            .symptom-disease {{
-                padding: 8px 12px;
-                text-align: center;
-                vertical-align: middle;
-                width: 15%;
-                font-weight: bold;
-                color: #007bff;
-                background-color: #f8f9fa;
-            }}
-            
-            .symptom-checkbox {{
-                padding: 8px 12px;
-                text-align: center;
-                vertical-align: middle;
-                width: 15%;
-            }}
-
-            .symptom-checkbox input {{
-                width: 16px;
-                height: 16px;
-                margin: 0;
-                cursor: pointer;
-            }}
-            
-            .required {{
-                color: #dc3545;
-                font-weight: bold;
-            }}
-            
-            .form-group select,
-            .form-group input,
-            .form-group textarea {{
-                width: 100%;
-                padding: 10px;
-                border: 1px solid #ddd;
-                border-radius: 5px;
-                font-size: 14px;
-                box-sizing: border-box;
-            }}
-            
-            .form-group textarea {{
-                height: 80px;
-                resize: vertical;
-            }}
-            
-            .modal-footer {{
-                padding: 20px 24px 24px 24px;
-                border-top: 1px solid #eee;
-                text-align: right;
-                display: flex;
-                justify-content: flex-end;
-                gap: 12px;
-            }}
-            
-            .modal-footer button {{
-                margin-left: 0;
-            }}
-            
-            .btn-secondary {{
-                background-color: #6c757d;
-                color: white;
-            }}
-            
-            /* 탭 스타일 */
-            .tab-container {{
-                margin-top: 20px;
-            }}
-            
-            .tab-buttons {{
-                display: flex;
-                border-bottom: 2px solid #dee2e6;
-                margin-bottom: 20px;
-            }}
-            
-            .tab-btn {{
-                padding: 12px 24px;
-                background-color: #f8f9fa;
-                border: none;
-                border-bottom: 3px solid transparent;
-                cursor: pointer;
-                font-size: 14px;
-                font-weight: 500;
-                color: #6c757d;
-                transition: all 0.3s ease;
-            }}
-            
-            .tab-btn:hover {{
-                background-color: #e9ecef;
-                color: #495057;
-            }}
-            
-            .tab-btn.active {{
-                background-color: #007bff;
-                color: white;
-                border-bottom-color: #007bff;
-            }}
-            
-            .tab-content {{
-                min-height: 200px;
-            }}
-            
-            /* 페이지네이션 스타일 */
-            .pagination {{
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                gap: 10px;
-                margin-top: 20px;
-                padding: 15px;
-            }}
-            
-            .pagination button {{
-                padding: 8px 16px;
-                border: 1px solid #ddd;
-                background-color: white;
-                color: #333;
-                cursor: pointer;
-                border-radius: 4px;
-                transition: all 0.3s ease;
-            }}
-            
-            .pagination button:hover {{
-                background-color: #f8f9fa;
-                border-color: #007bff;
-            }}
-            
-            .pagination button:disabled {{
-                background-color: #f8f9fa;
-                color: #6c757d;
-                cursor: not-allowed;
-                border-color: #ddd;
-            }}
-            
-            .pagination span {{
-                font-weight: bold;
-                color: #333;
-            }}
-            
-            /* 지연 로딩 이미지 스타일 */
-            .lazy {{
-                opacity: 0;
-                transition: opacity 0.3s ease;
-            }}
-            
-            .lazy.loaded {{
-                opacity: 1;
-            }}
-            
-            /* 로딩 스피너 */
-            .loading {{
-                text-align: center;
-                padding: 20px;
-                color: #666;
-            }}
-            
-            .loading::after {{
-                content: '';
-                display: inline-block;
-                width: 20px;
-                height: 20px;
-                border: 3px solid #f3f3f3;
-                border-top: 3px solid #007bff;
-                border-radius: 50%;
-                animation: spin 1s linear infinite;
-                margin-left: 10px;
-            }}
-            
-            @keyframes spin {{
-                0% {{ transform: rotate(0deg); }}
-                100% {{ transform: rotate(360deg); }}
-            }}
-            
-
-            
-            /* 도움말 스타일 */
-            .help-section {{
-                margin-bottom: 30px;
-                padding: 20px;
-                background-color: #f8f9fa;
-                border-radius: 8px;
-                border-left: 4px solid #17a2b8;
-            }}
-            
-            .help-section h3 {{
-                color: #2c3e50;
-                margin-bottom: 15px;
-                font-size: 20px;
-            }}
-            
-            .help-steps {{
-                margin-top: 20px;
-            }}
-            
-            .help-step {{
-                background-color: white;
-                border-radius: 8px;
-                padding: 15px;
-                margin-bottom: 15px;
-                box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-                border-left: 4px solid #28a745;
-            }}
-            
-            .help-step h4 {{
-                color: #2c3e50;
-                margin-bottom: 10px;
-                font-size: 16px;
-            }}
-            
-            .help-step .step-number {{
-                background-color: #28a745;
-                color: white;
-                border-radius: 50%;
-                width: 25px;
-                height: 25px;
-                display: inline-flex;
-                align-items: center;
-                justify-content: center;
-                font-weight: bold;
-                margin-right: 10px;
-            }}
-            
-            .help-sub-steps {{
-                margin-top: 15px;
-                padding-left: 20px;
-            }}
-            
-            .help-sub-step {{
-                background-color: #f8f9fa;
-                border-radius: 5px;
-                padding: 10px;
-                margin-bottom: 10px;
-                border-left: 3px solid #17a2b8;
-            }}
-            
-            .help-sub-step h5 {{
-                color: #495057;
-                margin-bottom: 5px;
-                font-size: 14px;
-                font-weight: 600;
-            }}
-            
-            .help-options {{
-                display: flex;
-                flex-wrap: wrap;
-                gap: 5px;
-                margin-top: 5px;
-            }}
-            
-            .help-option {{
-                background-color: #007bff;
-                color: white;
-                padding: 3px 8px;
-                border-radius: 12px;
-                font-size: 12px;
-                font-weight: 500;
-            }}
-            
-            /* 도움말 액션 버튼 스타일 */
-            .help-action-btn {{
-                border: none;
-                border-radius: 4px;
-                padding: 6px 12px;
-                font-size: 12px;
-                font-weight: 500;
-                color: white;
-                cursor: default;
-                margin-left: 10px;
-                display: inline-flex;
-                align-items: center;
-                gap: 4px;
-            }}
-            
-            .help-btn-blue {{
-                background-color: #007bff;
-            }}
-            
-            .help-btn-green {{
-                background-color: #28a745;
-            }}
-            
-            .help-btn-teal {{
-                background-color: #17a2b8;
-            }}
-            
-            .help-btn-default {{
-                background-color: #6c757d;
-            }}
-            
-            /* 질환 체크박스 스타일 */
-            .disease-checkboxes {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-                gap: 10px;
-                margin-top: 10px;
-            }}
-            
-            .disease-option {{
-                display: flex;
-                align-items: center;
-                padding: 8px 12px;
-                border: 1px solid #ddd;
-                border-radius: 5px;
-                background-color: #f8f9fa;
-                transition: all 0.2s ease;
-            }}
-            
-            .disease-option:hover {{
-                background-color: #e9ecef;
-                border-color: #007bff;
-            }}
-            
-            .disease-option input[type="checkbox"] {{
-                margin-right: 8px;
-                width: 16px;
-                height: 16px;
-                cursor: pointer;
-            }}
-            
-            .disease-option label {{
-                cursor: pointer;
-                font-size: 14px;
-                color: #333;
-                margin: 0;
-                flex: 1;
-            }}
-            
-            .disease-option input[type="checkbox"]:checked + label {{
-                font-weight: bold;
-                color: #007bff;
-            }}
-            
-            /* 도움말 탭 스타일 */
-            .help-tab-buttons {{
-                display: flex;
-                border-bottom: 2px solid #dee2e6;
-                margin-bottom: 20px;
-            }}
-            
-            .help-tab-btn {{
-                padding: 12px 24px;
-                background-color: #f8f9fa;
-                border: none;
-                border-bottom: 3px solid transparent;
-                cursor: pointer;
-                font-size: 14px;
-                font-weight: 500;
-                color: #6c757d;
-                transition: all 0.3s ease;
-                flex: 1;
-            }}
-            
-            .help-tab-btn:hover {{
-                background-color: #e9ecef;
-                color: #495057;
-            }}
-            
-            .help-tab-btn.active {{
-                background-color: #17a2b8;
-                color: white;
-                border-bottom-color: #17a2b8;
-            }}
-            
-            .help-tab-content {{
-                min-height: 400px;
-            }}
-            
-            .help-tab {{
-                display: none;
-            }}
-            
-            .help-tab.active {{
-                display: block;
-            }}
-            
-            .label-btn.image-btn {{
-                background-color: #007bff;
-                color: #fff;
-                border: none;
-                border-radius: 3px;
-                padding: 3px 12px;
-                font-size: 11px;
-                margin-left: 2px;
-                display: inline-flex;
-                align-items: center;
-                gap: 4px;
-                cursor: pointer;
-                transition: background 0.2s;
-            }}
-            .label-btn.image-btn:hover {{
-                background-color: #0056b3;
-            }}
-
-            /* 도움말 개선 스타일 */
-            .help-section {{
-                margin-bottom: 30px;
-                padding: 25px;
-                background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-                border-radius: 12px;
-                border-left: 5px solid #17a2b8;
-                box-shadow: 0 4px 15px rgba(0,0,0,0.08);
-            }}
-
-            .help-section h3 {{ 
-                color: #2c3e50;
-                margin-bottom: 20px;
-                font-size: 24px;
-                font-weight: 700;
-                text-align: center;
-                padding-bottom: 15px;
-                border-bottom: 2px solid #17a2b8;
-            }}
-
-            .help-content {{ 
-                background: white;
-                padding: 20px;
-                border-radius: 8px;
-                line-height: 1.8;
-                font-size: 15px;
-                color: #444;
-                box-shadow: inset 0 2px 8px rgba(0,0,0,0.05);
-            }}
-
-            .disease-list {{
-                background: #f8f9fa;
-                padding: 15px;
-                border-radius: 8px;
-                margin: 15px 0;
-                border-left: 4px solid #28a745;
-            }}
-
-            .disease-item {{
-                margin: 10px 0;
-                padding: 8px 0;
-                border-bottom: 1px solid #dee2e6;
-            }}
-
-            .disease-item:last-child {{
-                border-bottom: none;
-            }}
-
-            .disease-title {{
-                font-weight: 600;
-                color: #2c3e50;
-                margin-bottom: 5px;
-            }}
-
-            .disease-codes {{
-                font-size: 14px;
-                color: #6c757d;
-                margin-left: 15px;
-            }}
-
-
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🏷️ 라벨링 시스템 - 환영합니다, {user.username}님!</h1>
-                <div class="header-buttons">
-                    <button class="export-btn" onclick="exportDatabase()" style="display: {'inline-block' if user.username in ['김현호', 'testuser1'] else 'none'}">📊 Excel 내보내기</button>
-                    <button class="help-btn" onclick="showHelp()">❓ 도움말</button>
-                    <button class="logout-btn" onclick="logout()">로그아웃</button>
-                </div>
-            </div>
-            
-            <p>이메일: {user.email}</p>
-            <p>가입일: {user.created_at.strftime('%Y년 %m월 %d일')}</p>
-            
-            <!-- 라벨링 대시보드 -->
-            <div id="labelingDashboard">
-                <div class="stats">
-                    <div class="stat-item">
-                        <div class="stat-number" id="totalFiles">0</div>
-                        <div class="stat-label">총 파일</div>
-                    </div>
-                    <div class="stat-item">
-                        <div class="stat-number" id="userLabels">0</div>
-                        <div class="stat-label">내 라벨링</div>
-                    </div>
-                    <div class="stat-item">
-                        <div class="stat-number" id="totalLabels">0</div>
-                        <div class="stat-label">전체 라벨링</div>
-                    </div>
-                </div>
-                
-
-                
-                <div id="message"></div>
-                
-                <div class="file-list">
-                    <h3>📋 라벨링할 파일 목록</h3>
-                    <div class="tab-container">
-                        <div class="tab-buttons">
-                            <button class="tab-btn active" onclick="switchTab('all')">전체</button>
-                            <button class="tab-btn" onclick="switchTab('completed')">완료</button>
-                            <button class="tab-btn" onclick="switchTab('incomplete')">미완료</button>
-                        </div>
-                        <div class="tab-content">
-                            <div id="fileList">로딩 중...</div>
-                            <div id="pagination" class="pagination"></div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- 라벨링 모달 -->
-        <div id="labelingModal" class="modal" style="display: none;">
-            <div class="modal-content">
-                <div class="modal-header">
-                    <h2>🏷️ 라벨링</h2>
-                    <span class="close" onclick="closeLabelingModal()">&times;</span>
-                </div>
-                <div class="modal-body">
-                    <div id="labelingModalMessage" class="message" style="display:none;"></div>
-                    <div class="form-group">
-                        <label>질환 선택 <span class="subtitle">(복수 선택 가능)</span>: <span class="required">*</span></label>
-                        <div id="diseaseContainer" class="disease-checkboxes">
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_normal" value="정상" onchange="updateSymptoms()">
-                                <label for="disease_normal">정상</label>
-                            </div>
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_rds" value="Respiratory Distress Syndrome" onchange="updateSymptoms()">
-                                <label for="disease_rds">Respiratory Distress Syndrome</label>
-                            </div>
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_bpd" value="Bronchopulmonary Dysplasia" onchange="updateSymptoms()">
-                                <label for="disease_bpd">Bronchopulmonary Dysplasia</label>
-                            </div>
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_pneumothorax" value="Pneumothorax" onchange="updateSymptoms()">
-                                <label for="disease_pneumothorax">Pneumothorax</label>
-                            </div>
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_pie" value="Pulmonary Interstitial Emphysema" onchange="updateSymptoms()">
-                                <label for="disease_pie">Pulmonary Interstitial Emphysema</label>
-                            </div>
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_pneumomediastinum" value="Pneumomediastinum" onchange="updateSymptoms()">
-                                <label for="disease_pneumomediastinum">Pneumomediastinum</label>
-                            </div>
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_subcutaneous" value="Subcutaneous Emphysema" onchange="updateSymptoms()">
-                                <label for="disease_subcutaneous">Subcutaneous Emphysema</label>
-                            </div>
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_pneumopericardium" value="Pneumopericardium" onchange="updateSymptoms()">
-                                <label for="disease_pneumopericardium">Pneumopericardium</label>
-                            </div>
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_nec" value="Necrotizing Enterocolitis" onchange="updateSymptoms()">
-                                <label for="disease_nec">Necrotizing Enterocolitis</label>
-                            </div>
-                            <div class="disease-option">
-                                <input type="checkbox" id="disease_custom" value="직접입력(추가)" onchange="updateSymptoms()">
-                                <label for="disease_custom">직접입력(추가)</label>
-                            </div>
-                        </div>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label for="viewTypeSelect">사진 종류: <span class="required">*</span></label>
-                        <select id="viewTypeSelect">
-                            <option value="">사진 종류를 선택하세요</option>
-                            <option value="AP">AP</option>
-                            <option value="LATDEQ">LATDEQ</option>
-                            <option value="LAT">LAT</option>
-                            <option value="PA">PA</option>
-                        </select>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label class="symptom-title">흉부 X선 소견 <span class="subtitle">(복수 선택 가능)</span>:</label>
-                        <div id="symptomsContainer">
-                            <p>질환을 먼저 선택해주세요.</p>
-                        </div>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label for="codeInput">번호:</label>
-                        <input type="text" id="codeInput" placeholder="예: RDS_1, RDS_2" readonly>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label for="descriptionInput">최종 소견:</label>
-                        <textarea id="descriptionInput" placeholder="선택된 소견들이 자동으로 입력됩니다." readonly></textarea>
-                    </div>
-                    
-                    <div class="form-group" id="customInputGroup" style="display: none;">
-                        <label for="customInput">직접 입력:</label>
-                        <textarea id="customInput" placeholder="추가로 입력할 내용을 작성해주세요." rows="3" oninput="debouncedUpdateCodeAndDescription()"></textarea>
-                    </div>
-                </div>
-                <div class="modal-footer">
-                    <button onclick="submitLabeling()" class="btn btn-primary">라벨링 저장</button>
-                    <button onclick="closeLabelingModal()" class="btn btn-secondary">취소</button>
-                </div>
-            </div>
-        </div>
-        
-        <!-- 라벨링 기록 모달 -->
-        <div id="historyModal" class="modal" style="display: none;">
-            <div class="modal-content">
-                <div class="modal-header">
-                    <h2>📋 라벨링 기록</h2>
-                    <span class="close" onclick="closeHistoryModal()">&times;</span>
-                </div>
-                <div class="modal-body" id="historyContent">
-                    <!-- 기록 내용이 여기에 표시됩니다 -->
-                </div>
-                <div class="modal-footer">
-                    <button onclick="closeHistoryModal()" class="btn btn-secondary">닫기</button>
-                </div>
-            </div>
-        </div>
-        
-        <!-- 도움말 모달 -->
-        <div id="helpModal" class="modal" style="display: none;">
-            <div class="modal-content" style="max-width: 900px; max-height: 80vh; overflow-y: auto;">
-                <div class="modal-header">
-                    <h2>❓ 라벨링 시스템 도움말</h2>
-                    <span class="close" onclick="closeHelpModal()">&times;</span>
-                </div>
-                <div class="modal-body">
-                    <!-- 도움말 탭 버튼 -->
-                    <div class="help-tab-buttons">
-                        <button class="help-tab-btn active" onclick="switchHelpTab('system')">📋 시스템 설명</button>
-                        <button class="help-tab-btn" onclick="switchHelpTab('guide')">📖 라벨링 방법</button>
-                    </div>
-                    
-                    <!-- 도움말 탭 내용 -->
-                    <div class="help-tab-content">
-                        <div id="systemTab" class="help-tab active">
-                            <!-- 시스템 설명 내용 -->
-                        </div>
-                        <div id="guideTab" class="help-tab">
-                            <!-- 라벨링 방법 내용 -->
-                        </div>
-                    </div>
-                </div>
-                <div class="modal-footer">
-                    <button onclick="closeHelpModal()" class="btn btn-secondary">닫기</button>
-                </div>
-            </div>
-        </div>
-        
-        <script>
-            // 전역 변수
-            let currentFileId = null;
-            let allFiles = [];
-            let currentTab = 'all';
-            let currentPage = 1;
-            let currentPagination = null;
-            
-            // 파일 목록 로드 (페이지네이션 적용)
-            function loadFiles(page = 1) {{
-                currentPage = page;
-                const perPage = 20;
-                const tab = currentTab;
-                
-                // 로딩 표시
-                document.getElementById('fileList').innerHTML = '<div class="loading">파일 목록을 불러오는 중...</div>';
-                
-                fetch(`/api/files?page=${{page}}&per_page=${{perPage}}&tab=${{tab}}`)
-                .then(response => response.json())
-                .then(data => {{
-                    if (data.success) {{
-                        allFiles = data.files;
-                        currentPagination = data.pagination;
-                        
-                        displayFiles(allFiles);
-                        updateStats(data.pagination);
-                        updatePagination(data.pagination);
-                        
-                        // 이미지 지연 로딩 적용
-                        lazyLoadImages();
-                    }}
-                }})
-                .catch(error => {{
-                    console.error('파일 목록 로드 실패:', error);
-                    document.getElementById('fileList').innerHTML = '<p>파일 목록을 불러오는데 실패했습니다.</p>';
-                }});
-            }}
-            
-            // 탭 전환
-            function switchTab(tabName) {{
-                currentTab = tabName;
-                currentPage = 1; // 탭 변경 시 첫 페이지로
-                
-                // 탭 버튼 활성화 상태 변경
-                document.querySelectorAll('.tab-btn').forEach(btn => {{
-                    btn.classList.remove('active');
-                }});
-                event.target.classList.add('active');
-                
-                // 파일 목록 새로 로드
-                loadFiles(1);
-            }}
-            
-            // 통계 업데이트
-            function updateStats(pagination) {{
-                document.getElementById('totalFiles').textContent = pagination.total;
-                // 사용자 라벨링 수는 별도 계산 필요
-                const userLabels = allFiles.filter(file => file.user_label).length;
-                document.getElementById('userLabels').textContent = userLabels;
-            }}
-            
-
-            
-            // 페이지네이션 업데이트
-            function updatePagination(pagination) {{
-                const paginationDiv = document.getElementById('pagination');
-                if (!paginationDiv) return;
-                
-                let html = '';
-                
-                if (pagination.has_prev) {{
-                    html += `<button onclick="loadFiles(${{pagination.page - 1}})" class="btn btn-secondary">이전</button>`;
-                }} else {{
-                    html += `<button disabled class="btn btn-secondary">이전</button>`;
-                }}
-                
-                html += `<span>${{pagination.page}} / ${{pagination.pages}}</span>`;
-                
-                if (pagination.has_next) {{
-                    html += `<button onclick="loadFiles(${{pagination.page + 1}})" class="btn btn-secondary">다음</button>`;
-                }} else {{
-                    html += `<button disabled class="btn btn-secondary">다음</button>`;
-                }}
-                
-                paginationDiv.innerHTML = html;
-            }}
-            
-            // 이미지 지연 로딩
-            function lazyLoadImages() {{
-                const imageObserver = new IntersectionObserver((entries, observer) => {{
-                    entries.forEach(entry => {{
-                        if (entry.isIntersecting) {{
-                            const img = entry.target;
-                            img.src = img.dataset.src;
-                            img.classList.add('loaded');
-                            observer.unobserve(img);
-                        }}
-                    }});
-                }}, {{
-                    rootMargin: '50px 0px', // 50px 전에 미리 로드
-                    threshold: 0.1
-                }});
-                
-                document.querySelectorAll('img[data-src]').forEach(img => {{
-                    imageObserver.observe(img);
-                }});
-            }}
-            
-            // 파일 목록 표시 (지연 로딩 적용)
-            function displayFiles(files) {{
-                const fileList = document.getElementById('fileList');
-                if (files.length === 0) {{
-                    fileList.innerHTML = '<p>업로드된 파일이 없습니다.</p>';
-                    return;
-                }}
-                
-                fileList.innerHTML = files.map(file => {{
-                    const isImage = file.filename.toLowerCase().endsWith('.jpg') || 
-                                   file.filename.toLowerCase().endsWith('.jpeg') || 
-                                   file.filename.toLowerCase().endsWith('.png') ||
-                                   file.filename.toLowerCase().endsWith('.dcm');
-                    
-                    return `
-                        <div class="file-item">
-                            <div class="file-info">
-                                <strong>${{file.filename}}</strong><br>
-                                <small>업로드: ${{file.uploaded_by}} | 크기: ${{(file.file_size / 1024).toFixed(1)}}KB</small><br>
-                                <small>라벨링 기록: ${{file.user_label ? '✅' : '✖️'}}</small>
-                                ${{isImage ? `<br><img class="lazy" data-src="/api/files/${{file.id}}/image" style="max-width: 200px; max-height: 150px; margin-top: 10px; border-radius: 5px;" alt="썸네일">` : ''}}
-                            </div>
-                            <div class="file-actions">
-                                <div class="label-buttons">
-                                    <button class="label-btn like-btn" onclick="openLabelingModal(${{file.id}})">🏷️ 라벨링</button>
-                                    <button class="label-btn history-btn" onclick="viewLabelHistory(${{file.id}})">📋 기록보기</button>
-                                    ${{isImage ? '<button class=\\"label-btn image-btn\\" onclick=\\"viewContent(' + file.id + ')\\">🩻 이미지보기</button>' : '<button class=\\"btn btn-primary\\" onclick=\\"viewContent(' + file.id + ')\\">📄 내용보기</button>'}}
-                                </div>
-                            </div>
-                        </div>
-                    `;
-                }}).join('');
-            }}
-            
-            // 라벨링 모달 열기
-            function openLabelingModal(fileId) {{
-                currentFileId = fileId;
-                document.getElementById('labelingModal').style.display = 'block';
-                resetModal();
-            }}
-            
-            // 모달 닫기
-            function closeLabelingModal() {{
-                document.getElementById('labelingModal').style.display = 'none';
-                currentFileId = null;
-            }}
-            
-            // 모달 초기화
-            function resetModal() {{
-                // 질환 체크박스 초기화
-                document.querySelectorAll('#diseaseContainer input[type="checkbox"]').forEach(cb => {{
-                    cb.checked = false;
-                }});
-                document.getElementById('viewTypeSelect').value = '';
-                document.getElementById('codeInput').value = '';
-                document.getElementById('descriptionInput').value = '';
-                document.getElementById('symptomsContainer').innerHTML = '<p>질환을 먼저 선택해주세요.</p>';
-                
-                // 직접 입력 필드 초기화
-                const customInputGroup = document.getElementById('customInputGroup');
-                const customInput = document.getElementById('customInput');
-                if (customInputGroup) customInputGroup.style.display = 'none';
-                if (customInput) customInput.value = '';
-                
-                // 기존 라벨링 기록이 있는지 확인
-                if (currentFileId) {{
-                    loadExistingLabel();
-                }}
-            }}
-            
-            // 기존 라벨링 기록 불러오기
-            function loadExistingLabel() {{
-                fetch(`/api/label/history/${{currentFileId}}`)
-                .then(response => response.json())
-                .then(data => {{
-                    if (data.success && data.has_history) {{
-                        populateModalWithHistory(data.label);
-                    }}
-                }})
-                .catch(error => {{
-                    console.error('기존 라벨링 기록 불러오기 실패:', error);
-                }});
-            }}
-            
-            // 기존 기록으로 모달 채우기
-            function populateModalWithHistory(label) {{
-                // 질환 체크박스 설정
-                const diseases = Array.isArray(label.disease) ? label.disease : [label.disease];
-                diseases.forEach(disease => {{
-                    const checkbox = document.querySelector(`#diseaseContainer input[value="${{disease}}"]`);
-                    if (checkbox) {{
-                        checkbox.checked = true;
-                    }}
-                }});
-                
-                // 사진 종류 설정
-                document.getElementById('viewTypeSelect').value = label.view_type;
-                
-                // 소견 업데이트
-                updateSymptoms();
-                
-                // 코드와 설명 설정 (소견 업데이트 후에 실행)
-                document.getElementById('codeInput').value = label.code;
-                document.getElementById('descriptionInput').value = label.description;
-                
-                // 직접입력(추가)가 포함된 경우 직접 입력 필드에 내용 설정
-                if (diseases.includes('직접입력(추가)')) {{
-                    const customInput = document.getElementById('customInput');
-                    if (customInput) {{
-                        // 코드에서 CUSTOM 부분을 찾아서 직접 입력 내용 추출
-                        const codes = label.code.split(', ').map(code => code.trim());
-                        const descriptions = label.description.split('\\n');
-                        
-                        // CUSTOM 코드가 있으면 해당하는 설명을 직접 입력 필드에 설정
-                        const customIndex = codes.indexOf('CUSTOM');
-                        if (customIndex !== -1 && descriptions[customIndex]) {{
-                            customInput.value = descriptions[customIndex];
-                        }}
-                    }}
-                }}
-                
-                // 선택된 소견 체크박스 설정 (CUSTOM 제외)
-                const codes = label.code.split(', ').map(code => code.trim());
-                codes.forEach(code => {{
-                    if (code !== 'CUSTOM') {{
-                        const checkbox = document.getElementById(code);
-                        if (checkbox) {{
-                            checkbox.checked = true;
-                        }}
-                    }}
-                }});
-            }}
-            
-            // 질환 선택에 따른 소견 업데이트
-            function updateSymptoms() {{
-                const selectedDiseases = getSelectedDiseases();
-                const container = document.getElementById('symptomsContainer');
-                const codeInput = document.getElementById('codeInput');
-                const descriptionInput = document.getElementById('descriptionInput');
-                
-                if (selectedDiseases.length === 0) {{
-                    container.innerHTML = '<p>질환을 먼저 선택해주세요.</p>';
-                    codeInput.readOnly = true;
-                    descriptionInput.readOnly = true;
-                    return;
-                }}
-                
-                // 정상만 선택된 경우
-                if (selectedDiseases.length === 1 && selectedDiseases[0] === '정상') {{
-                    container.innerHTML = '<p>정상 소견입니다.</p>';
-                    codeInput.readOnly = true;
-                    codeInput.value = 'NORMAL';
-                    descriptionInput.readOnly = true;
-                    descriptionInput.value = '정상';
-                    return;
-                }}
-                
-                // 정상이 다른 질환과 함께 선택된 경우, 정상 제거
-                if (selectedDiseases.includes('정상')) {{
-                    selectedDiseases.splice(selectedDiseases.indexOf('정상'), 1);
-                }}
-                
-                // 직접입력(추가) 선택 여부 확인
-                const hasCustomInput = selectedDiseases.includes('직접입력(추가)');
-                if (hasCustomInput) {{
-                    // 직접입력(추가) 제거하고 다른 질환만 처리
-                    selectedDiseases.splice(selectedDiseases.indexOf('직접입력(추가)'), 1);
-                }}
-                
-                // 모든 선택된 질환의 소견들을 합쳐서 표시
-                let allSymptoms = [];
-                selectedDiseases.forEach(disease => {{
-                    const symptoms = getSymptomsByDisease(disease);
-                    if (symptoms) {{
-                        allSymptoms = allSymptoms.concat(symptoms);
-                    }}
-                }});
-                
-                // 직접입력(추가)만 선택된 경우 표를 보이지 않게 함
-                if (hasCustomInput && allSymptoms.length === 0) {{
-                    container.innerHTML = '<p>직접 입력 내용을 작성해주세요.</p>';
-                    codeInput.readOnly = true;
-                    descriptionInput.readOnly = true;
-                    // 직접입력(추가)만 선택된 경우 코드와 설명 초기화
-                    updateCodeAndDescription();
-                    // 직접입력 필드 표시
-                    const customInputGroup = document.getElementById('customInputGroup');
-                    if (customInputGroup) customInputGroup.style.display = 'block';
-                    return;
-                }}
-                
-                // 직접입력(추가)만 선택된 경우 (다른 질환 없음)
-                if (selectedDiseases.length === 1 && selectedDiseases[0] === '직접입력(추가)') {{
-                    container.innerHTML = '<p>직접 입력 내용을 작성해주세요.</p>';
-                    codeInput.readOnly = true;
-                    descriptionInput.readOnly = true;
-                    // 직접입력(추가)만 선택된 경우 코드와 설명 초기화
-                    updateCodeAndDescription();
-                    // 직접입력 필드 표시
-                    const customInputGroup = document.getElementById('customInputGroup');
-                    if (customInputGroup) customInputGroup.style.display = 'block';
-                    return;
-                }}
-                
-                if (allSymptoms.length === 0 && !hasCustomInput) {{
-                    container.innerHTML = '<p>선택된 질환에 대한 소견이 없습니다.</p>';
-                    codeInput.readOnly = true;
-                    descriptionInput.readOnly = true;
-                    return;
-                }}
-                
-                let html = '<table class="symptoms-table">';
-                html += '<tr><th>질환</th><th>소견</th><th>선택</th></tr>';
-
-                allSymptoms.forEach(symptom => {{
-                    html += '<tr class="symptom-row">';
-                    html += '<td class="symptom-disease">' + getDiseaseByCode(symptom.code) + '</td>';
-                    html += '<td class="symptom-label">';
-                    html += '<label for="' + symptom.code + '">' + symptom.description + '</label>';
-                    html += '</td>';
-                    html += '<td class="symptom-checkbox">';
-                    html += '<input type="checkbox" id="' + symptom.code + '" value="' + symptom.code + '" onchange="updateCodeAndDescription()">';
-                    html += '</td>';
-                    html += '</tr>';
-                }});
-
-                container.innerHTML = html;
-                codeInput.readOnly = true;
-                descriptionInput.readOnly = true;
-                
-                // 직접입력(추가) 선택 시 입력 필드 표시
-                const customInputGroup = document.getElementById('customInputGroup');
-                if (hasCustomInput) {{
-                    customInputGroup.style.display = 'block';
-                }} else {{
-                    customInputGroup.style.display = 'none';
-                    // 직접입력(추가) 해제 시 입력 내용 삭제
-                    const customInput = document.getElementById('customInput');
-                    if (customInput) customInput.value = '';
-                }}
-                
-                // 직접입력(추가)만 선택된 경우에도 입력 필드 표시
-                if (selectedDiseases.length === 1 && selectedDiseases[0] === '직접입력(추가)') {{
-                    if (customInputGroup) customInputGroup.style.display = 'block';
-                }}
-            }}
-            
-            // 선택된 질환들 가져오기
-            function getSelectedDiseases() {{
-                const checkboxes = document.querySelectorAll('#diseaseContainer input[type="checkbox"]:checked');
-                return Array.from(checkboxes).map(cb => cb.value);
-            }}
-            
-            // 코드로 질환 찾기
-            function getDiseaseByCode(code) {{
-                const diseaseMap = {{
-                    'RDS_1': 'RDS', 'RDS_2': 'RDS', 'RDS_3': 'RDS', 'RDS_4': 'RDS',
-                    'BPD_1': 'BPD', 'BPD_2': 'BPD', 'BPD_3': 'BPD', 'BPD_4': 'BPD',
-                    'PTX_1': 'PTX', 'PTX_2': 'PTX', 'PTX_3': 'PTX', 'PTX_4': 'PTX', 'PTX_5': 'PTX',
-                    'PIE_1': 'PIE',
-                    'PMS_1': 'PMS', 'PMS_2': 'PMS', 'PMS_3': 'PMS',
-                    'SEM_1': 'SEM',
-                    'PPC_1': 'PPC',
-                    'NEC_1': 'NEC', 'NEC_2': 'NEC', 'NEC_3': 'NEC', 'NEC_4': 'NEC', 'NEC_5': 'NEC'
-                }};
-                return diseaseMap[code] || '';
-            }}
-            
-            // 질환별 소견 데이터
-            function getSymptomsByDisease(disease) {{
-                const symptoms = {{
-                    'Respiratory Distress Syndrome': [
-                        {{code: 'RDS_1', description: '폐용적의 감소(Hypoventilation)'}},
-                        {{code: 'RDS_2', description: '폐포 허탈로 인한 과립성 음영 (Ground Glass Appearance)'}},
-                        {{code: 'RDS_3', description: '기관지 내 음영 (Air-bronchogram)'}},
-                        {{code: 'RDS_4', description: '폐 전체 white-out 양상, 심장 경계 불분명'}}
-                    ],
-                    'Bronchopulmonary Dysplasia': [
-                        {{code: 'BPD_1', description: '미만성 음영 증가'}},
-                        {{code: 'BPD_2', description: '폐용적 정상 또는 감소'}},
-                        {{code: 'BPD_3', description: '전반적 과팽창'}},
-                        {{code: 'BPD_4', description: '무기폐와 과투과성 부위 혼재'}}
-                    ],
-                    'Pneumothorax': [
-                        {{code: 'PTX_1', description: '종격동의 반대쪽 이동(Chest AP)'}},
-                        {{code: 'PTX_2', description: '편평해진 횡격막(기흉쪽)'}},
-                        {{code: 'PTX_3', description: '기흉 쪽 폐의 허탈'}},
-                        {{code: 'PTX_4', description: 'Lateral decubitus에서 소기흉 확인 가능'}},
-                        {{code: 'PTX_5', description: 'Cross-table lateral: 팬케이크 모양의 공기'}}
-                    ],
-                    'Pulmonary Interstitial Emphysema': [
-                        {{code: 'PIE_1', description: '낭성 또는 선상의 공기 음영 (국소/양폐)'}}
-                    ],
-                    'Pneumomediastinum': [
-                        {{code: 'PMS_1', description: '흉부 중앙의 공기 음영'}},
-                        {{code: 'PMS_2', description: '흉선 주위의 공기, "요트의 돛" (sail sign)'}},
-                        {{code: 'PMS_3', description: 'Lateral view에서 명확히 관찰됨'}}
-                    ],
-                    'Subcutaneous Emphysema': [
-                        {{code: 'SEM_1', description: '-'}}
-                    ],
-                    'Pneumopericardium': [
-                        {{code: 'PPC_1', description: '심장하부의 공기 음영'}}
-                    ],
-                    'Necrotizing Enterocolitis': [
-                        {{code: 'NEC_1', description: '장 마비 (Ileus)'}},
-                        {{code: 'NEC_2', description: '장벽 내 공기 (Pneumatosis Intestinalis)'}},
-                        {{code: 'NEC_3', description: 'Portal 또는 Hepatic vein gas'}},
-                        {{code: 'NEC_4', description: '복수 (Ascites)'}},
-                        {{code: 'NEC_5', description: '복강 내 공기 (Pneumoperitoneum)'}}
-                    ],
-                    '직접 입력': []
-                }};
-                
-                return symptoms[disease] || [];
-            }}
-            
-            // 디바운스된 코드와 설명 업데이트 (중복 호출 방지)
-            let updateTimeout = null;
-            function debouncedUpdateCodeAndDescription() {{
-                if (updateTimeout) {{
-                    clearTimeout(updateTimeout);
-                }}
-                updateTimeout = setTimeout(() => {{
-                    updateCodeAndDescription();
-                }}, 300); // 300ms 지연
-            }}
-            
-            // 선택된 소견에 따라 코드와 설명 업데이트
-            function updateCodeAndDescription() {{
-                const selectedDiseases = getSelectedDiseases();
-                
-                // 정상만 선택된 경우에도 처리
-                if (selectedDiseases.length === 1 && selectedDiseases[0] === '정상') {{
-                    document.getElementById('codeInput').value = 'NORMAL';
-                    document.getElementById('descriptionInput').value = '정상';
-                    return;
-                }}
-                
-                const checkboxes = document.querySelectorAll('#symptomsContainer input[type="checkbox"]:checked');
-                const codes = [];
-                const descriptions = [];
-                
-                checkboxes.forEach(checkbox => {{
-                    codes.push(checkbox.value);
-                    const label = document.querySelector(`label[for="${{checkbox.value}}"]`);
-                    if (label && label.textContent) {{
-                        descriptions.push(label.textContent);
-                    }}
-                }});
-                
-                // 직접 입력 내용 추가 (중복 방지)
-                const customInput = document.getElementById('customInput');
-                let customText = '';
-                if (customInput && customInput.value.trim()) {{
-                    // 이미 CUSTOM이 codes에 있는지 확인
-                    if (!codes.includes('CUSTOM')) {{
-                        codes.push('CUSTOM');
-                    }}
-                    customText = customInput.value.trim();
-                    // 이미 customText가 descriptions에 있는지 확인
-                    if (!descriptions.includes(customText)) {{
-                        descriptions.push(customText);
-                    }}
-                }}
-                
-                // 직접입력(추가)만 선택된 경우
-                if (selectedDiseases.includes('직접입력(추가)') && codes.length === 0) {{
-                    if (customText) {{
-                        // 직접 입력 내용이 있는 경우
-                        document.getElementById('codeInput').value = 'CUSTOM';
-                        document.getElementById('descriptionInput').value = customText;
-                    }} else {{
-                        // 직접 입력 내용이 없는 경우
-                        document.getElementById('codeInput').value = 'CUSTOM';
-                        document.getElementById('descriptionInput').value = '직접 입력 내용을 작성해주세요.';
-                    }}
-                    // 직접입력 필드 표시
-                    const customInputGroup = document.getElementById('customInputGroup');
-                    if (customInputGroup) customInputGroup.style.display = 'block';
-                    return;
-                }}
-                
-                // 직접입력(추가)만 선택된 경우 (다른 질환 없음)
-                if (selectedDiseases.length === 1 && selectedDiseases[0] === '직접입력(추가)') {{
-                    if (customText) {{
-                        // 직접 입력 내용이 있는 경우
-                        document.getElementById('codeInput').value = 'CUSTOM';
-                        document.getElementById('descriptionInput').value = customText;
-                    }} else {{
-                        // 직접 입력 내용이 없는 경우
-                        document.getElementById('codeInput').value = 'CUSTOM';
-                        document.getElementById('descriptionInput').value = '직접 입력 내용을 작성해주세요.';
-                    }}
-                    // 직접입력 필드 표시
-                    const customInputGroup = document.getElementById('customInputGroup');
-                    if (customInputGroup) customInputGroup.style.display = 'block';
-                    return;
-                }}
-                
-                // 직접입력(추가)와 다른 질환이 함께 선택된 경우
-                if (selectedDiseases.includes('직접입력(추가)') && codes.length > 0) {{
-                    // 기존 소견 + 직접 입력 내용 (중복 방지)
-                    let finalDescriptions = [...descriptions];
-                    if (customText && !finalDescriptions.includes(customText)) {{
-                        finalDescriptions.push(customText);
-                    }}
-                    document.getElementById('codeInput').value = codes.join(', ');
-                    document.getElementById('descriptionInput').value = finalDescriptions.join('\\n');
-                    return;
-                }}
-                
-                // 일반적인 경우 (직접입력(추가) 없음)
-                document.getElementById('codeInput').value = codes.join(', ');
-                document.getElementById('descriptionInput').value = descriptions.join('\\n');
-            }}
-            
-            // 라벨링 제출
-            function submitLabeling() {{
-                const selectedDiseases = getSelectedDiseases();
-                const viewType = document.getElementById('viewTypeSelect').value;
-                const code = document.getElementById('codeInput').value;
-                const description = document.getElementById('descriptionInput').value;
-                
-                // 필수 필드 검증
-                if (selectedDiseases.length === 0) {{
-                    showMessage('질환을 선택해주세요.', 'error');
-                    return;
-                }}
-                
-                if (!viewType) {{
-                    showMessage('사진 종류를 선택해주세요.', 'error');
-                    document.getElementById('viewTypeSelect').focus();
-                    return;
-                }}
-                
-                if (!description) {{
-                    showMessage('최종 소견을 입력해주세요.', 'error');
-                    document.getElementById('descriptionInput').focus();
-                    return;
-                }}
-                
-                // 정상이 아닌 경우에만 코드 검증 (직접입력만 선택한 경우 제외)
-                if (!(selectedDiseases.length === 1 && selectedDiseases[0] === '정상') && 
-                    !(selectedDiseases.length === 1 && selectedDiseases[0] === '직접입력(추가)') && 
-                    !code) {{
-                    showMessage('소견을 선택해주세요.', 'error');
-                    return;
-                }}
-                
-                // 직접입력(추가) 선택 시 직접 입력 내용 검증
-                if (selectedDiseases.includes('직접입력(추가)')) {{
-                    const customInput = document.getElementById('customInput');
-                    if (!customInput || !customInput.value.trim()) {{
-                        showMessage('직접 입력 내용을 작성해주세요.', 'error');
-                        if (customInput) customInput.focus();
-                        return;
-                    }}
-                }}
-                
-                addLabel(currentFileId, selectedDiseases, viewType, code, description);
-                closeLabelingModal();
-            }}
-            
-            // 라벨링 추가
-            function addLabel(fileId, diseases, viewType, code, description) {{
-                fetch('/api/label', {{
-                    method: 'POST',
-                    headers: {{
-                        'Content-Type': 'application/json'
-                    }},
-                    body: JSON.stringify({{
-                        file_id: fileId,
-                        disease: diseases,  // 이제 리스트 형태로 전송
-                        view_type: viewType,
-                        code: code,
-                        description: description
-                    }})
-                }})
-                .then(response => response.json())
-                .then(data => {{
-                    if (data.success) {{
-                        showMessage(data.message, 'success');
-                        loadFiles(currentPage); // 현재 페이지 새로고침
-                    }} else {{
-                        showMessage(data.error || '라벨링 실패', 'error');
-                    }}
-                }})
-                .catch(error => {{
-                    showMessage('서버 오류가 발생했습니다.', 'error');
-                }});
-            }}
-            
-            // 라벨링 기록 조회
-            function viewLabelHistory(fileId) {{
-                fetch(`/api/label/history/${{fileId}}`)
-                .then(response => response.json())
-                .then(data => {{
-                    if (data.success) {{
-                        if (data.has_history) {{
-                            displayLabelHistory(data.label);
-                        }} else {{
-                            displayNoHistory(data.message);
-                        }}
-                        document.getElementById('historyModal').style.display = 'block';
-                    }} else {{
-                        showMessage(data.error || '기록 조회 실패', 'error');
-                    }}
-                }})
-                .catch(error => {{
-                    showMessage('서버 오류가 발생했습니다.', 'error');
-                }});
-            }}
-            
-            // 라벨링 기록 표시
-            function displayLabelHistory(label) {{
-                const content = document.getElementById('historyContent');
-                const diseases = Array.isArray(label.disease) ? label.disease.join(', ') : label.disease;
-                content.innerHTML = `
-                    <div class="history-item">
-                        <h3>✅ 라벨링 기록이 있습니다</h3>
-                        <div class="history-details">
-                            <p><strong>질환:</strong> ${{diseases}}</p>
-                            <p><strong>사진 종류:</strong> ${{label.view_type}}</p>
-                            <p><strong>번호:</strong> ${{label.code}}</p>
-                            <p><strong>최종 소견:</strong></p>
-                            <div class="description-box">
-                                ${{label.description.replace(/\\n/g, '<br>')}}
-                            </div>
-                            <p><strong>라벨링 시간:</strong> ${{label.created_at}}</p>
-                        </div>
-                    </div>
-                `;
-            }}
-            
-            // 기록 없음 표시
-            function displayNoHistory(message) {{
-                const content = document.getElementById('historyContent');
-                content.innerHTML = `
-                    <div class="history-item">
-                        <h3>❌ 라벨링 기록이 없습니다</h3>
-                        <p>${{message}}</p>
-                        <p>이 파일에 대해 아직 라벨링을 하지 않았습니다.</p>
-                    </div>
-                `;
-            }}
-            
-            // 기록 모달 닫기
-            function closeHistoryModal() {{
-                document.getElementById('historyModal').style.display = 'none';
-            }}
-            
-            // 도움말 표시
-            function showHelp() {{
-                fetch('/api/help')
-                .then(response => response.json())
-                .then(data => {{
-                    if (data.success) {{
-                        displayHelp(data.help);
-                        document.getElementById('helpModal').style.display = 'block';
-                    }} else {{
-                        showMessage(data.error || '도움말을 불러올 수 없습니다.', 'error');
-                    }}
-                }})
-                .catch(error => {{
-                    showMessage('서버 오류가 발생했습니다.', 'error');
-                }});
-            }}
-            
-            // 도움말 내용 표시
-            function displayHelp(help) {{
-                // 시스템 설명 탭 내용
-                const systemTab = document.getElementById('systemTab');
-                systemTab.innerHTML = `
-                    <div class="help-section">
-                        <h3>${{help.system_intro.title}}</h3>
-                        <div style="white-space: pre-line; line-height: 1.6; color: #495057;">
-                            ${{help.system_intro.content.replace(/(\d+\.\s+[^\\n]+)/g, '<strong style="color: #2c3e50; font-size: 15px;">$1</strong>')}}
-                        </div>
-                    </div>
-                `;
-                
-                // 라벨링 방법 탭 내용
-                const guideTab = document.getElementById('guideTab');
-                let guideHtml = `
-                    <div class="help-section">
-                        <h3>${{help.labeling_guide.title}}</h3>
-                        <div class="help-steps">
-                `;
-                
-                help.labeling_guide.steps.forEach(step => {{
-                    const buttonClass = step.button_style === 'blue' ? 'help-btn-blue' : 
-                                       step.button_style === 'green' ? 'help-btn-green' : 
-                                       step.button_style === 'teal' ? 'help-btn-teal' : 'help-btn-default';
-                    
-                    guideHtml += `
-                        <div class="help-step">
-                            <h4>
-                                <span class="step-number">${{step.step}}</span>
-                                <button class="help-action-btn ${{buttonClass}}">${{step.emoji}} ${{step.action}}</button>
-                            </h4>
-                            <p>${{step.description}}</p>
-                    `;
-                    
-                    if (step.sub_steps) {{
-                        guideHtml += '<div class="help-sub-steps">';
-                        step.sub_steps.forEach(subStep => {{
-                            guideHtml += `
-                                <div class="help-sub-step">
-                                    <h5>${{subStep.title}}</h5>
-                                    <p>${{subStep.description}}</p>
-                            `;
-                            
-                            if (subStep.options) {{
-                                guideHtml += '<div class="help-options">';
-                                subStep.options.forEach(option => {{
-                                    guideHtml += `<span class="help-option">${{option}}</span>`;
-                                }});
-                                guideHtml += '</div>';
-                            }}
-                            
-                            guideHtml += '</div>';
-                        }});
-                        guideHtml += '</div>';
-                    }}
-                    
-                    guideHtml += '</div>';
-                }});
-                
-                guideHtml += `
-                        </div>
-                    </div>
-                `;
-                
-                guideTab.innerHTML = guideHtml;
-            }}
-            
-            // 도움말 탭 전환
-            function switchHelpTab(tabName) {{
-                // 모든 탭 버튼 비활성화
-                document.querySelectorAll('.help-tab-btn').forEach(btn => {{
-                    btn.classList.remove('active');
-                }});
-                
-                // 모든 탭 내용 숨기기
-                document.querySelectorAll('.help-tab').forEach(tab => {{
-                    tab.classList.remove('active');
-                }});
-                
-                // 선택된 탭 활성화
-                if (tabName === 'system') {{
-                    document.querySelector('.help-tab-btn:first-child').classList.add('active');
-                    document.getElementById('systemTab').classList.add('active');
-                }} else if (tabName === 'guide') {{
-                    document.querySelector('.help-tab-btn:last-child').classList.add('active');
-                    document.getElementById('guideTab').classList.add('active');
-                }}
-            }}
-            
-            // 도움말 모달 닫기
-            function closeHelpModal() {{
-                document.getElementById('helpModal').style.display = 'none';
-            }}
-            
-            // 데이터베이스 Excel 내보내기
-            function exportDatabase() {{
-                const currentUsername = '{user.username}';
-                if (!['김현호', 'testuser1'].includes(currentUsername)) {{
-                    showMessage('권한이 없습니다.', 'error');
-                    return;
-                }}
-                
-                const exportBtn = event.target;
-                exportBtn.textContent = '📊 내보내는 중...';
-                exportBtn.disabled = true;
-                
-                window.open('/api/export/excel', '_blank');
-                
-                setTimeout(() => {{
-                    exportBtn.textContent = '📊 Excel 내보내기';
-                    exportBtn.disabled = false;
-                }}, 2000);
-                
-                showMessage('Excel 다운로드 시작', 'success');
-            }}
-            
+    # HTML은 사용자별 값만 담은 작은 템플릿, JS/CSS는 해시 포함 URL(/assets/...)로 장기 캐시
+    response = make_response(render_template(
+        'dashboard.html',
+        user=user,
+        can_export=user.username in EXPORT_ALLOWED_USERS,
+        dashboard_config={
+            'username': user.username,
+            'canExport': user.username in EXPORT_ALLOWED_USERS
+        }
+    ))
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
-            
-            // 파일 내용 보기
-            function viewContent(fileId) {{
-                fetch(`/api/files/${{fileId}}/content`)
-                .then(response => response.json())
-                .then(data => {{
-                    if (data.success) {{
-                        if (data.is_image) {{
-                            // 이미지 파일인 경우 새 창에서 열기
-                            window.open(`/api/files/${{fileId}}/image`, '_blank');
-                        }} else {{
-                            // 텍스트 파일인 경우 알림으로 표시
-                            alert(`파일명: ${{data.filename}}\\n\\n내용:\\n${{data.content}}`);
-                        }}
-                    }} else {{
-                        showMessage(data.error || '파일을 읽을 수 없습니다.', 'error');
-                    }}
-                }})
-                .catch(error => {{
-                    showMessage('서버 오류가 발생했습니다.', 'error');
-                }});
-            }}
-            
-            function showMessage(message, type) {{
-                // 라벨링 모달이 열려있으면 모달 내부에 메시지 표시
-                const labelingModal = document.getElementById('labelingModal');
-                const modalMessageDiv = document.getElementById('labelingModalMessage');
-                if (labelingModal && labelingModal.style.display === 'block' && modalMessageDiv) {{
-                    modalMessageDiv.textContent = message;
-                    modalMessageDiv.className = `message ${{type}}`;
-                    modalMessageDiv.style.display = 'block';
-                    setTimeout(() => {{
-                        modalMessageDiv.textContent = '';
-                        modalMessageDiv.className = 'message';
-                        modalMessageDiv.style.display = 'none';
-                    }}, 3000);
-                }} else {{
-                    const messageDiv = document.getElementById('message');
-                    messageDiv.textContent = message;
-                    messageDiv.className = `message ${{type}}`;
-                    setTimeout(() => {{
-                        messageDiv.textContent = '';
-                        messageDiv.className = '';
-                    }}, 3000);
-                }}
-            }}
-            
-            function logout() {{
-                fetch('/api/logout', {{
-                    method: 'POST',
-                    headers: {{
-                        'Content-Type': 'application/json'
-                    }}
-                }})
-                .then(response => response.json())
-                .then(data => {{
-                    if (data.success) {{
-                        window.location.href = '/';
-                    }}
-                }});
-            }}
-            
-            // 페이지 로드 시 파일 목록 로드
-            loadFiles(1);
-        </script>
-    </body>
-    </html>
-    '''
+# 대시보드 정적 자산 (해시 포함 파일명, gzip/brotli 압축본, 1년 immutable 캐시)
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    return static_assets.send_asset(filename)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+질환 비트마스크 마이그레이션 스크립트
+label 테이블에 disease_mask 컬럼을 추가하고 기존 JSON 질환 데이터로 채움
+(질환/사진 종류 통계를 인덱스 GROUP BY 한 번으로 계산하기 위함)
+"""
+
+import json
+import os
+
+from sqlalchemy import text
+
+from db_config import migration_uri, sqlite_path, backup_for_migration, migration_engine, column_names
+
+from user import Label, DISEASE_CATALOG
+
+# user.py의 Label 모델과 이름을 맞춤
+MASK_INDEXES = [
+    ('ix_label_mask_view', "CREATE INDEX IF NOT EXISTS ix_label_mask_view ON label (disease_mask, view_type)"),
+    ('ix_label_user_mask_view', "CREATE INDEX IF NOT EXISTS ix_label_user_mask_view ON label (user_id, disease_mask, view_type)"),
+]
+
+def parse_diseases(raw_disease):
+    """저장된 질환 값을 리스트로 변환 (Label.parse_diseases와 동일한 규칙)"""
+    try:
+        diseases = json.loads(raw_disease) if raw_disease else []
+    except (json.JSONDecodeError, TypeError):
+        # 기존 단일 질환 데이터와의 호환성을 위해
+        return [raw_disease] if raw_disease else []
+    return diseases if isinstance(diseases, list) else [diseases]
+
+def migrate_disease_bitmask():
+    """disease_mask 컬럼 추가 및 기존 라벨 데이터 채우기"""
+
+    # 데이터베이스 (DATABASE_URL, 없으면 database/app.db)
+    uri = migration_uri()
+    db_path = sqlite_path(uri)
+
+    if db_path and not os.path.exists(db_path):
+        print(f"❌ 데이터베이스 파일을 찾을 수 없습니다: {db_path}")
+        return False
+
+    # 백업 생성
+    if not backup_for_migration(uri):
+        return False
+
+    try:
+        # 데이터베이스 연결
+        engine = migration_engine(uri)
+        conn = engine.connect()
+
+        # 컬럼이 없을 때만 추가
+        if 'disease_mask' not in column_names(conn, 'label'):
+            conn.execute(text("ALTER TABLE label ADD COLUMN disease_mask INTEGER NOT NULL DEFAULT 0"))
+            print("✅ disease_mask 컬럼 추가")
+        else:
+            print("⏭️ disease_mask 컬럼이 이미 존재합니다 (값만 다시 계산합니다)")
+
+        # 기존 라벨 데이터 조회
+        labels = conn.execute(text("SELECT id, disease FROM label")).all()
+
+        print(f"📊 총 {len(labels)}개의 라벨 데이터를 마이그레이션합니다...")
+
+        updates = []
+        unknown = {}
+        for label_id, raw_disease in labels:
+            diseases = parse_diseases(raw_disease)
+            for disease in diseases:
+                if disease not in DISEASE_CATALOG:
+                    unknown[disease] = unknown.get(disease, 0) + 1
+            updates.append({'mask': Label.disease_mask_for(diseases), 'id': label_id})
+
+        if updates:
+            conn.execute(text("UPDATE label SET disease_mask = :mask WHERE id = :id"), updates)
+        print(f"✅ {len(updates)}개 라벨의 비트마스크를 계산했습니다.")
+
+        if unknown:
+            print("⚠️ 카탈로그에 없는 질환 (비트마스크에서 제외됨):")
+            for disease, count in unknown.items():
+                print(f"   - {disease}: {count}개")
+
+        # 인덱스 생성
+        for index_name, create_sql in MASK_INDEXES:
+            conn.execute(text(create_sql))
+            print(f"✅ 인덱스 확인/생성: {index_name}")
+
+        # 변경사항 저장
+        conn.commit()
+
+        # 마이그레이션 결과 확인 (기존 LIKE 검색 결과와 비트마스크 결과 비교)
+        print(f"📈 마이그레이션 결과:")
+        mismatches = 0
+        for disease in DISEASE_CATALOG:
+            bit = Label.disease_mask_for([disease])
+            like_count = conn.execute(text("SELECT COUNT(*) FROM label WHERE disease LIKE :pattern"),
+                                      {'pattern': f'%{json.dumps(disease, ensure_ascii=False)}%'}).scalar()
+            mask_count = conn.execute(text("SELECT COUNT(*) FROM label WHERE (disease_mask & :bit) != 0"),
+                                      {'bit': bit}).scalar()
+            status = "✅" if like_count == mask_count else "⚠️"
+            if like_count != mask_count:
+                mismatches += 1
+            print(f"   {status} {disease}: LIKE {like_count}개 / 비트마스크 {mask_count}개")
+
+        if mismatches:
+            print(f"⚠️ {mismatches}개 질환의 개수가 다릅니다. 단일 질환(비 JSON) 데이터가 있다면 "
+                  f"migrate_disease_to_json.py를 먼저 실행하세요.")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    finally:
+        if 'conn' in locals():
+            conn.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    print("🔄 질환 비트마스크 마이그레이션을 시작합니다...")
+    print("=" * 50)
+
+    success = migrate_disease_bitmask()
+
+    print("=" * 50)
+    if success:
+        print("✅ 마이그레이션이 성공적으로 완료되었습니다!")
+        print("💡 이제 질환별 통계가 인덱스 GROUP BY 한 번으로 계산됩니다.")
+    else:
+        print("❌ 마이그레이션이 실패했습니다.")
+        print("💡 백업 파일을 확인하고 수동으로 복구하세요.")
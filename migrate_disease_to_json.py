@@ -4,39 +4,35 @@
 기존 단일 질환 데이터를 JSON 배열 형태로 변환
 """
 
-import sqlite3
 import json
 import os
-from datetime import datetime
+
+from sqlalchemy import text
+
+from db_config import migration_uri, sqlite_path, backup_for_migration, migration_engine
 
 def migrate_disease_to_json():
     """기존 단일 질환 데이터를 JSON 배열 형태로 마이그레이션"""
     
-    # 데이터베이스 경로
-    db_path = os.path.join('database', 'app.db')
+    # 데이터베이스 (DATABASE_URL, 없으면 database/app.db)
+    uri = migration_uri()
+    db_path = sqlite_path(uri)
     
-    if not os.path.exists(db_path):
+    if db_path and not os.path.exists(db_path):
         print(f"❌ 데이터베이스 파일을 찾을 수 없습니다: {db_path}")
         return False
     
     # 백업 생성
-    backup_path = os.path.join('database', f'app_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.db')
-    try:
-        import shutil
-        shutil.copy2(db_path, backup_path)
-        print(f"✅ 데이터베이스 백업 생성: {backup_path}")
-    except Exception as e:
-        print(f"⚠️ 백업 생성 실패: {e}")
+    if not backup_for_migration(uri):
         return False
     
     try:
         # 데이터베이스 연결
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        engine = migration_engine(uri)
+        conn = engine.connect()
         
         # 기존 라벨 데이터 조회
-        cursor.execute("SELECT id, disease FROM label")
-        labels = cursor.fetchall()
+        labels = conn.execute(text("SELECT id, disease FROM label")).all()
         
         print(f"📊 총 {len(labels)}개의 라벨 데이터를 마이그레이션합니다...")
         
@@ -56,9 +52,9 @@ def migrate_disease_to_json():
                         new_disease_json = json.dumps([old_disease], ensure_ascii=False)
                         
                         # 데이터베이스 업데이트
-                        cursor.execute(
-                            "UPDATE label SET disease = ? WHERE id = ?",
-                            (new_disease_json, label_id)
+                        conn.execute(
+                            text("UPDATE label SET disease = :disease WHERE id = :id"),
+                            {'disease': new_disease_json, 'id': label_id}
                         )
                         
                         migrated_count += 1
@@ -75,11 +71,9 @@ def migrate_disease_to_json():
         print(f"🎉 마이그레이션 완료! {migrated_count}개 라벨이 업데이트되었습니다.")
         
         # 마이그레이션 결과 확인
-        cursor.execute("SELECT COUNT(*) FROM label")
-        total_labels = cursor.fetchone()[0]
+        total_labels = conn.execute(text("SELECT COUNT(*) FROM label")).scalar()
         
-        cursor.execute("SELECT COUNT(*) FROM label WHERE disease LIKE '[%'")
-        json_labels = cursor.fetchone()[0]
+        json_labels = conn.execute(text("SELECT COUNT(*) FROM label WHERE disease LIKE '[%'")).scalar()
         
         print(f"📈 마이그레이션 결과:")
         print(f"   - 총 라벨 수: {total_labels}")
@@ -95,6 +89,7 @@ def migrate_disease_to_json():
     finally:
         if 'conn' in locals():
             conn.close()
+            engine.dispose()
 
 if __name__ == "__main__":
     print("🔄 질환 데이터 마이그레이션을 시작합니다...")
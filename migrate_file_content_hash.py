@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+파일 내용 해시 마이그레이션 스크립트
+file 테이블에 content_hash 컬럼(SHA-256)과 인덱스를 추가하고 기존 파일의 해시를 채움
+(같은 내용의 파일이 다른 폴더에서 다시 업로드될 때 중복 등록을 막기 위함)
+"""
+
+import os
+
+from sqlalchemy import text, inspect
+
+from db_config import migration_uri, sqlite_path, backup_for_migration, migration_engine, column_names
+from ingest import file_sha256
+
+# user.py의 File 모델과 이름을 맞춤
+CONTENT_HASH_INDEX = ('ix_file_content_hash', "CREATE INDEX IF NOT EXISTS ix_file_content_hash ON file (content_hash)")
+
+def migrate_file_content_hash():
+    """content_hash 컬럼 추가 및 기존 파일 해시 계산"""
+
+    # 데이터베이스 (DATABASE_URL, 없으면 database/app.db)
+    uri = migration_uri()
+    db_path = sqlite_path(uri)
+
+    if db_path and not os.path.exists(db_path):
+        print(f"❌ 데이터베이스 파일을 찾을 수 없습니다: {db_path}")
+        return False
+
+    # 백업 생성
+    if not backup_for_migration(uri):
+        return False
+
+    try:
+        # 데이터베이스 연결
+        engine = migration_engine(uri)
+        conn = engine.connect()
+
+        # 컬럼이 없을 때만 추가
+        if 'content_hash' not in column_names(conn, 'file'):
+            conn.execute(text("ALTER TABLE file ADD COLUMN content_hash VARCHAR(64)"))
+            print("✅ content_hash 컬럼 추가")
+        else:
+            print("⏭️ content_hash 컬럼이 이미 존재합니다 (비어 있는 값만 채웁니다)")
+
+        index_name, create_sql = CONTENT_HASH_INDEX
+        conn.execute(text(create_sql))
+        print(f"✅ 인덱스 확인/생성: {index_name}")
+
+        # 업로드 매니페스트에 원본(DICOM 등) 해시가 있으면 그 값을 사용
+        manifest_hashes = {}
+        if inspect(conn).has_table('ingest_manifest'):
+            rows = conn.execute(text("SELECT file_id, content_hash FROM ingest_manifest "
+                                     "WHERE file_id IS NOT NULL AND content_hash IS NOT NULL ORDER BY id"))
+            for file_id, content_hash in rows:
+                manifest_hashes.setdefault(file_id, content_hash)
+
+        files = conn.execute(text("SELECT id, filename, file_path FROM file WHERE content_hash IS NULL")).all()
+
+        print(f"📊 해시가 없는 파일 {len(files)}개를 처리합니다...")
+
+        update_sql = text("UPDATE file SET content_hash = :hash WHERE id = :id")
+        updates = []
+        missing = []
+        for i, (file_id, filename, file_path) in enumerate(files, 1):
+            if file_id in manifest_hashes:
+                updates.append({'hash': manifest_hashes[file_id], 'id': file_id})
+            elif file_path and os.path.exists(file_path):
+                # 매니페스트 없이 등록된 DICOM은 원본 대신 변환된 PNG의 해시가 기록됨
+                updates.append({'hash': file_sha256(file_path), 'id': file_id})
+            else:
+                missing.append(filename)
+            if i % 1000 == 0:
+                if updates:
+                    conn.execute(update_sql, updates)
+                conn.commit()
+                updates = []
+                print(f"  ... {i}/{len(files)}")
+
+        if updates:
+            conn.execute(update_sql, updates)
+
+        # 변경사항 저장
+        conn.commit()
+
+        if missing:
+            print(f"⚠️ 파일을 찾을 수 없어 해시를 계산하지 못했습니다: {len(missing)}개")
+            for filename in missing[:10]:
+                print(f"   - {filename}")
+
+        # 마이그레이션 결과 확인
+        groups, extra = conn.execute(text("""
+            SELECT COUNT(*), COALESCE(SUM(cnt - 1), 0) FROM (
+                SELECT COUNT(*) AS cnt FROM file
+                WHERE content_hash IS NOT NULL
+                GROUP BY content_hash HAVING COUNT(*) > 1
+            ) AS duplicate_groups
+        """)).one()
+        print(f"📈 마이그레이션 결과:")
+        print(f"   - 내용이 같은 파일 묶음: {groups}개 (중복 파일 {extra}개)")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    finally:
+        if 'conn' in locals():
+            conn.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    print("🔄 파일 내용 해시 마이그레이션을 시작합니다...")
+    print("=" * 50)
+
+    success = migrate_file_content_hash()
+
+    print("=" * 50)
+    if success:
+        print("✅ 마이그레이션이 성공적으로 완료되었습니다!")
+        print("💡 중복 파일 목록은 'python database_manager.py duplicates'로 확인할 수 있습니다.")
+    else:
+        print("❌ 마이그레이션이 실패했습니다.")
+        print("💡 백업 파일을 확인하고 수동으로 복구하세요.")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+라벨 인덱스 마이그레이션 스크립트
+label 테이블에 user_id / file_id 인덱스와 (user_id, file_id) 유니크 인덱스 추가
+(라벨 저장 upsert가 이 유니크 인덱스를 충돌 기준으로 사용)
+"""
+
+import os
+
+from sqlalchemy import text
+
+from db_config import migration_uri, sqlite_path, backup_for_migration, migration_engine, index_names
+
+# (인덱스 이름, 생성 SQL) - user.py의 Label 모델과 이름을 맞춤
+LABEL_INDEXES = [
+    ('ix_label_user_id', "CREATE INDEX IF NOT EXISTS ix_label_user_id ON label (user_id)"),
+    ('ix_label_file_id', "CREATE INDEX IF NOT EXISTS ix_label_file_id ON label (file_id)"),
+    ('uq_label_user_file', "CREATE UNIQUE INDEX IF NOT EXISTS uq_label_user_file ON label (user_id, file_id)"),
+]
+
+def migrate_label_indexes():
+    """중복 라벨 정리 후 label 테이블 인덱스 및 유니크 제약 추가"""
+
+    # 데이터베이스 (DATABASE_URL, 없으면 database/app.db)
+    uri = migration_uri()
+    db_path = sqlite_path(uri)
+
+    if db_path and not os.path.exists(db_path):
+        print(f"❌ 데이터베이스 파일을 찾을 수 없습니다: {db_path}")
+        return False
+
+    # 백업 생성
+    if not backup_for_migration(uri):
+        return False
+
+    try:
+        # 데이터베이스 연결
+        engine = migration_engine(uri)
+        conn = engine.connect()
+
+        # 같은 사용자/파일에 대한 중복 라벨 확인 (유니크 인덱스 생성 전에 정리 필요)
+        duplicates = conn.execute(text("""
+            SELECT user_id, file_id, COUNT(*)
+            FROM label
+            GROUP BY user_id, file_id
+            HAVING COUNT(*) > 1
+        """)).all()
+
+        if duplicates:
+            print(f"⚠️ 중복 라벨 {len(duplicates)}건을 정리합니다 (가장 최근 라벨만 유지)...")
+            for user_id, file_id, count in duplicates:
+                print(f"   - 사용자 {user_id} / 파일 {file_id}: {count}개")
+
+            # 사용자/파일별로 가장 최근(created_at, id 순) 라벨 하나만 남김
+            result = conn.execute(text("""
+                DELETE FROM label
+                WHERE id NOT IN (
+                    SELECT (
+                        SELECT l2.id FROM label l2
+                        WHERE l2.user_id = l.user_id AND l2.file_id = l.file_id
+                        ORDER BY l2.created_at DESC, l2.id DESC
+                        LIMIT 1
+                    )
+                    FROM label l
+                    GROUP BY l.user_id, l.file_id
+                )
+            """))
+            print(f"✅ 중복 라벨 {result.rowcount}개 삭제")
+        else:
+            print("✅ 중복 라벨이 없습니다.")
+
+        # 인덱스 생성
+        for index_name, create_sql in LABEL_INDEXES:
+            conn.execute(text(create_sql))
+            print(f"✅ 인덱스 확인/생성: {index_name}")
+
+        # 변경사항 저장
+        conn.commit()
+
+        # 마이그레이션 결과 확인
+        indexes = sorted(index_names(conn, 'label'))
+
+        print(f"📈 마이그레이션 결과:")
+        print(f"   - label 테이블 인덱스: {', '.join(indexes)}")
+
+        missing = [name for name, _ in LABEL_INDEXES if name not in indexes]
+        if missing:
+            print(f"❌ 누락된 인덱스: {missing}")
+            return False
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    finally:
+        if 'conn' in locals():
+            conn.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    print("🔄 라벨 인덱스 마이그레이션을 시작합니다...")
+    print("=" * 50)
+
+    success = migrate_label_indexes()
+
+    print("=" * 50)
+    if success:
+        print("✅ 마이그레이션이 성공적으로 완료되었습니다!")
+        print("💡 이제 라벨 저장이 단일 upsert로 처리되며 중복 라벨이 생기지 않습니다.")
+    else:
+        print("❌ 마이그레이션이 실패했습니다.")
+        print("💡 백업 파일을 확인하고 수동으로 복구하세요.")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+라벨 변경 이력 마이그레이션 스크립트
+label_revision 테이블과 (file_id, user_id, created_at) 인덱스를 만들고
+현재 라벨을 각 사용자/파일의 첫 이력으로 기록
+(이전 의견은 덮어써져 남아 있지 않으므로 현재 라벨부터 이력이 쌓임)
+"""
+
+import os
+
+from sqlalchemy import text, inspect
+
+from db_config import migration_uri, sqlite_path, backup_for_migration, migration_engine, index_names
+
+from user import LabelRevision
+
+REVISION_INDEX = 'ix_label_revision_file_user_created'
+
+def migrate_label_revision():
+    """label_revision 테이블 생성 및 현재 라벨로 초기 이력 기록"""
+
+    # 데이터베이스 (DATABASE_URL, 없으면 database/app.db)
+    uri = migration_uri()
+    db_path = sqlite_path(uri)
+
+    if db_path and not os.path.exists(db_path):
+        print(f"❌ 데이터베이스 파일을 찾을 수 없습니다: {db_path}")
+        return False
+
+    # 백업 생성
+    if not backup_for_migration(uri):
+        return False
+
+    try:
+        # 데이터베이스 연결
+        engine = migration_engine(uri)
+        conn = engine.connect()
+
+        # 테이블/인덱스가 없을 때만 생성 (user.py의 LabelRevision 모델 기준)
+        if not inspect(conn).has_table('label_revision'):
+            LabelRevision.__table__.create(conn)
+            print("✅ label_revision 테이블 생성")
+        else:
+            print("⏭️ label_revision 테이블이 이미 존재합니다 (이력이 없는 라벨만 기록합니다)")
+            for index in LabelRevision.__table__.indexes:
+                index.create(conn, checkfirst=True)
+        print(f"✅ 인덱스 확인/생성: {REVISION_INDEX}")
+
+        # 이력이 하나도 없는 라벨만 현재 상태를 첫 이력으로 기록 (여러 번 실행해도 중복되지 않음)
+        result = conn.execute(text("""
+            INSERT INTO label_revision (user_id, file_id, disease, disease_mask, view_type, code, description, created_at)
+            SELECT l.user_id, l.file_id, l.disease, l.disease_mask, l.view_type, l.code, l.description, l.created_at
+            FROM label l
+            WHERE l.created_at IS NOT NULL
+              AND NOT EXISTS (
+                SELECT 1 FROM label_revision r
+                WHERE r.file_id = l.file_id AND r.user_id = l.user_id
+            )
+        """))
+        print(f"✅ 현재 라벨 {result.rowcount}개를 첫 이력으로 기록")
+
+        # 변경사항 저장
+        conn.commit()
+
+        # 마이그레이션 결과 확인
+        revisions = conn.execute(text("SELECT COUNT(*) FROM label_revision")).scalar()
+        missing = conn.execute(text("""
+            SELECT COUNT(*) FROM label l
+            WHERE NOT EXISTS (
+                SELECT 1 FROM label_revision r
+                WHERE r.file_id = l.file_id AND r.user_id = l.user_id
+            )
+        """)).scalar()
+        indexes = index_names(conn, 'label_revision')
+
+        print(f"📈 마이그레이션 결과:")
+        print(f"   - 라벨 이력 수: {revisions}")
+        print(f"   - label_revision 인덱스: {', '.join(sorted(indexes))}")
+        if missing:
+            print(f"⚠️ 생성 시각이 없어 이력을 기록하지 못한 라벨: {missing}개")
+
+        if REVISION_INDEX not in indexes:
+            print(f"❌ 누락된 인덱스: {REVISION_INDEX}")
+            return False
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    finally:
+        if 'conn' in locals():
+            conn.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    print("🔄 라벨 변경 이력 마이그레이션을 시작합니다...")
+    print("=" * 50)
+
+    success = migrate_label_revision()
+
+    print("=" * 50)
+    if success:
+        print("✅ 마이그레이션이 성공적으로 완료되었습니다!")
+        print("💡 이제 라벨을 저장할 때마다 이전 의견이 label_revision에 남습니다.")
+    else:
+        print("❌ 마이그레이션이 실패했습니다.")
+        print("💡 백업 파일을 확인하고 수동으로 복구하세요.")
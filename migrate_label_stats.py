@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+라벨 통계 요약 테이블 마이그레이션 스크립트
+label_stats 테이블을 만들고 현재 라벨 데이터로 전체/사용자별 통계를 채움
+(add_label은 이 테이블에 변경분만 반영하므로 테이블이 없으면 라벨 저장과 통계 조회가 실패함)
+"""
+
+import os
+
+from flask import Flask
+from sqlalchemy import text, inspect
+
+from db_config import migration_uri, sqlite_path, backup_for_migration, migration_engine, engine_options
+
+from user import db, LabelStat
+import label_stats
+
+def migrate_label_stats():
+    """label_stats 테이블 생성 및 현재 라벨로 통계 계산"""
+
+    # 데이터베이스 (DATABASE_URL, 없으면 database/app.db)
+    uri = migration_uri()
+    db_path = sqlite_path(uri)
+
+    if db_path and not os.path.exists(db_path):
+        print(f"❌ 데이터베이스 파일을 찾을 수 없습니다: {db_path}")
+        return False
+
+    # 백업 생성
+    if not backup_for_migration(uri):
+        return False
+
+    try:
+        # 데이터베이스 연결
+        engine = migration_engine(uri)
+        conn = engine.connect()
+
+        # 테이블이 없을 때만 생성 (user.py의 LabelStat 모델 기준)
+        if not inspect(conn).has_table('label_stats'):
+            LabelStat.__table__.create(conn)
+            conn.commit()
+            print("✅ label_stats 테이블 생성")
+        else:
+            print("⏭️ label_stats 테이블이 이미 존재합니다 (통계를 다시 계산합니다)")
+        conn.close()
+
+        # 통계 계산은 앱과 같은 코드(label_stats.rebuild_label_stats)를 사용하도록 앱 컨텍스트에서 실행
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = uri
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(uri)
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(app)
+
+        with app.app_context():
+            row_count = label_stats.rebuild_label_stats()
+            print(f"✅ 통계 항목 {row_count}개 계산")
+
+            # 마이그레이션 결과 확인
+            total = db.session.execute(text(
+                "SELECT count FROM label_stats WHERE user_id = :scope AND metric = :metric"
+            ), {'scope': label_stats.GLOBAL_SCOPE, 'metric': label_stats.TOTAL_METRIC}).scalar() or 0
+            labels = db.session.execute(text("SELECT COUNT(*) FROM label")).scalar()
+            mismatches = label_stats.verify_label_stats()
+
+            print(f"📈 마이그레이션 결과:")
+            print(f"   - 라벨 수: {labels}")
+            print(f"   - 통계 전체 라벨 수: {total}")
+
+            if mismatches:
+                print(f"❌ 실제 라벨 데이터와 다른 통계 항목: {len(mismatches)}개")
+                return False
+
+            return True
+
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    finally:
+        if 'engine' in locals():
+            engine.dispose()
+
+if __name__ == "__main__":
+    print("🔄 라벨 통계 요약 테이블 마이그레이션을 시작합니다...")
+    print("=" * 50)
+
+    success = migrate_label_stats()
+
+    print("=" * 50)
+    if success:
+        print("✅ 마이그레이션이 성공적으로 완료되었습니다!")
+        print("💡 이제 라벨을 저장할 때마다 label_stats에 변경분이 반영됩니다.")
+    else:
+        print("❌ 마이그레이션이 실패했습니다.")
+        print("💡 백업 파일을 확인하고 수동으로 복구하세요.")
@@ -0,0 +1,920 @@
+// 전역 변수
+let currentFileId = null;
+let allFiles = [];
+let currentTab = 'all';
+let currentPage = 1;
+let currentPagination = null;
+
+// 파일 목록 로드 (페이지네이션 적용)
+function loadFiles(page = 1) {
+    currentPage = page;
+    const perPage = 20;
+    const tab = currentTab;
+
+    // 로딩 표시
+    document.getElementById('fileList').innerHTML = '<div class="loading">파일 목록을 불러오는 중...</div>';
+
+    fetch(`/api/files?page=${page}&per_page=${perPage}&tab=${tab}`)
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            allFiles = data.files;
+            currentPagination = data.pagination;
+
+            displayFiles(allFiles);
+            updateStats(data.pagination);
+            updatePagination(data.pagination);
+
+            // 이미지 지연 로딩 적용
+            lazyLoadImages();
+        }
+    })
+    .catch(error => {
+        console.error('파일 목록 로드 실패:', error);
+        document.getElementById('fileList').innerHTML = '<p>파일 목록을 불러오는데 실패했습니다.</p>';
+    });
+}
+
+// 탭 전환
+function switchTab(tabName) {
+    currentTab = tabName;
+    currentPage = 1; // 탭 변경 시 첫 페이지로
+
+    // 탭 버튼 활성화 상태 변경
+    document.querySelectorAll('.tab-btn').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    event.target.classList.add('active');
+
+    // 파일 목록 새로 로드
+    loadFiles(1);
+}
+
+// 통계 업데이트
+function updateStats(pagination) {
+    document.getElementById('totalFiles').textContent = pagination.total;
+    // 사용자 라벨링 수는 별도 계산 필요
+    const userLabels = allFiles.filter(file => file.user_label).length;
+    document.getElementById('userLabels').textContent = userLabels;
+}
+
+
+
+// 페이지네이션 업데이트
+function updatePagination(pagination) {
+    const paginationDiv = document.getElementById('pagination');
+    if (!paginationDiv) return;
+
+    let html = '';
+
+    if (pagination.has_prev) {
+        html += `<button onclick="loadFiles(${pagination.page - 1})" class="btn btn-secondary">이전</button>`;
+    } else {
+        html += `<button disabled class="btn btn-secondary">이전</button>`;
+    }
+
+    html += `<span>${pagination.page} / ${pagination.pages}</span>`;
+
+    if (pagination.has_next) {
+        html += `<button onclick="loadFiles(${pagination.page + 1})" class="btn btn-secondary">다음</button>`;
+    } else {
+        html += `<button disabled class="btn btn-secondary">다음</button>`;
+    }
+
+    paginationDiv.innerHTML = html;
+}
+
+// 이미지 지연 로딩
+function lazyLoadImages() {
+    const imageObserver = new IntersectionObserver((entries, observer) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                const img = entry.target;
+                img.src = img.dataset.src;
+                img.classList.add('loaded');
+                observer.unobserve(img);
+            }
+        });
+    }, {
+        rootMargin: '50px 0px', // 50px 전에 미리 로드
+        threshold: 0.1
+    });
+
+    document.querySelectorAll('img[data-src]').forEach(img => {
+        imageObserver.observe(img);
+    });
+}
+
+// 파일 목록 표시 (지연 로딩 적용)
+function displayFiles(files) {
+    const fileList = document.getElementById('fileList');
+    if (files.length === 0) {
+        fileList.innerHTML = '<p>업로드된 파일이 없습니다.</p>';
+        return;
+    }
+
+    fileList.innerHTML = files.map(file => {
+        const isImage = file.filename.toLowerCase().endsWith('.jpg') || 
+                       file.filename.toLowerCase().endsWith('.jpeg') || 
+                       file.filename.toLowerCase().endsWith('.png') ||
+                       file.filename.toLowerCase().endsWith('.dcm');
+
+        return `
+            <div class="file-item">
+                <div class="file-info">
+                    <strong>${file.filename}</strong><br>
+                    <small>업로드: ${file.uploaded_by} | 크기: ${(file.file_size / 1024).toFixed(1)}KB</small><br>
+                    <small>라벨링 기록: ${file.user_label ? '✅' : '✖️'}</small>
+                    ${isImage ? `<br><img class="lazy" data-src="/api/files/${file.id}/thumbnail?size=256&v=${file.version}" style="max-width: 200px; max-height: 150px; margin-top: 10px; border-radius: 5px;" alt="썸네일">` : ''}
+                </div>
+                <div class="file-actions">
+                    <div class="label-buttons">
+                        <button class="label-btn like-btn" onclick="openLabelingModal(${file.id})">🏷️ 라벨링</button>
+                        <button class="label-btn history-btn" onclick="viewLabelHistory(${file.id})">📋 기록보기</button>
+                        ${isImage ? '<button class=\"label-btn image-btn\" onclick=\"viewContent(' + file.id + ')\">🩻 이미지보기</button>' : '<button class=\"btn btn-primary\" onclick=\"viewContent(' + file.id + ')\">📄 내용보기</button>'}
+                    </div>
+                </div>
+            </div>
+        `;
+    }).join('');
+}
+
+// 라벨링 모달 열기
+function openLabelingModal(fileId) {
+    currentFileId = fileId;
+    document.getElementById('labelingModal').style.display = 'block';
+    resetModal();
+}
+
+// 모달 닫기
+function closeLabelingModal() {
+    document.getElementById('labelingModal').style.display = 'none';
+    currentFileId = null;
+}
+
+// 모달 초기화
+function resetModal() {
+    // 질환 체크박스 초기화
+    document.querySelectorAll('#diseaseContainer input[type="checkbox"]').forEach(cb => {
+        cb.checked = false;
+    });
+    document.getElementById('viewTypeSelect').value = '';
+    document.getElementById('codeInput').value = '';
+    document.getElementById('descriptionInput').value = '';
+    document.getElementById('symptomsContainer').innerHTML = '<p>질환을 먼저 선택해주세요.</p>';
+
+    // 직접 입력 필드 초기화
+    const customInputGroup = document.getElementById('customInputGroup');
+    const customInput = document.getElementById('customInput');
+    if (customInputGroup) customInputGroup.style.display = 'none';
+    if (customInput) customInput.value = '';
+
+    // 기존 라벨링 기록이 있는지 확인
+    if (currentFileId) {
+        loadExistingLabel();
+    }
+}
+
+// 기존 라벨링 기록 불러오기
+function loadExistingLabel() {
+    fetch(`/api/label/history/${currentFileId}`)
+    .then(response => response.json())
+    .then(data => {
+        if (data.success && data.has_history) {
+            populateModalWithHistory(data.label);
+        }
+    })
+    .catch(error => {
+        console.error('기존 라벨링 기록 불러오기 실패:', error);
+    });
+}
+
+// 기존 기록으로 모달 채우기
+function populateModalWithHistory(label) {
+    // 질환 체크박스 설정
+    const diseases = Array.isArray(label.disease) ? label.disease : [label.disease];
+    diseases.forEach(disease => {
+        const checkbox = document.querySelector(`#diseaseContainer input[value="${disease}"]`);
+        if (checkbox) {
+            checkbox.checked = true;
+        }
+    });
+
+    // 사진 종류 설정
+    document.getElementById('viewTypeSelect').value = label.view_type;
+
+    // 소견 업데이트
+    updateSymptoms();
+
+    // 코드와 설명 설정 (소견 업데이트 후에 실행)
+    document.getElementById('codeInput').value = label.code;
+    document.getElementById('descriptionInput').value = label.description;
+
+    // 직접입력(추가)가 포함된 경우 직접 입력 필드에 내용 설정
+    if (diseases.includes('직접입력(추가)')) {
+        const customInput = document.getElementById('customInput');
+        if (customInput) {
+            // 코드에서 CUSTOM 부분을 찾아서 직접 입력 내용 추출
+            const codes = label.code.split(', ').map(code => code.trim());
+            const descriptions = label.description.split('\n');
+
+            // CUSTOM 코드가 있으면 해당하는 설명을 직접 입력 필드에 설정
+            const customIndex = codes.indexOf('CUSTOM');
+            if (customIndex !== -1 && descriptions[customIndex]) {
+                customInput.value = descriptions[customIndex];
+            }
+        }
+    }
+
+    // 선택된 소견 체크박스 설정 (CUSTOM 제외)
+    const codes = label.code.split(', ').map(code => code.trim());
+    codes.forEach(code => {
+        if (code !== 'CUSTOM') {
+            const checkbox = document.getElementById(code);
+            if (checkbox) {
+                checkbox.checked = true;
+            }
+        }
+    });
+}
+
+// 질환 선택에 따른 소견 업데이트
+function updateSymptoms() {
+    const selectedDiseases = getSelectedDiseases();
+    const container = document.getElementById('symptomsContainer');
+    const codeInput = document.getElementById('codeInput');
+    const descriptionInput = document.getElementById('descriptionInput');
+
+    if (selectedDiseases.length === 0) {
+        container.innerHTML = '<p>질환을 먼저 선택해주세요.</p>';
+        codeInput.readOnly = true;
+        descriptionInput.readOnly = true;
+        return;
+    }
+
+    // 정상만 선택된 경우
+    if (selectedDiseases.length === 1 && selectedDiseases[0] === '정상') {
+        container.innerHTML = '<p>정상 소견입니다.</p>';
+        codeInput.readOnly = true;
+        codeInput.value = 'NORMAL';
+        descriptionInput.readOnly = true;
+        descriptionInput.value = '정상';
+        return;
+    }
+
+    // 정상이 다른 질환과 함께 선택된 경우, 정상 제거
+    if (selectedDiseases.includes('정상')) {
+        selectedDiseases.splice(selectedDiseases.indexOf('정상'), 1);
+    }
+
+    // 직접입력(추가) 선택 여부 확인
+    const hasCustomInput = selectedDiseases.includes('직접입력(추가)');
+    if (hasCustomInput) {
+        // 직접입력(추가) 제거하고 다른 질환만 처리
+        selectedDiseases.splice(selectedDiseases.indexOf('직접입력(추가)'), 1);
+    }
+
+    // 모든 선택된 질환의 소견들을 합쳐서 표시
+    let allSymptoms = [];
+    selectedDiseases.forEach(disease => {
+        const symptoms = getSymptomsByDisease(disease);
+        if (symptoms) {
+            allSymptoms = allSymptoms.concat(symptoms);
+        }
+    });
+
+    // 직접입력(추가)만 선택된 경우 표를 보이지 않게 함
+    if (hasCustomInput && allSymptoms.length === 0) {
+        container.innerHTML = '<p>직접 입력 내용을 작성해주세요.</p>';
+        codeInput.readOnly = true;
+        descriptionInput.readOnly = true;
+        // 직접입력(추가)만 선택된 경우 코드와 설명 초기화
+        updateCodeAndDescription();
+        // 직접입력 필드 표시
+        const customInputGroup = document.getElementById('customInputGroup');
+        if (customInputGroup) customInputGroup.style.display = 'block';
+        return;
+    }
+
+    // 직접입력(추가)만 선택된 경우 (다른 질환 없음)
+    if (selectedDiseases.length === 1 && selectedDiseases[0] === '직접입력(추가)') {
+        container.innerHTML = '<p>직접 입력 내용을 작성해주세요.</p>';
+        codeInput.readOnly = true;
+        descriptionInput.readOnly = true;
+        // 직접입력(추가)만 선택된 경우 코드와 설명 초기화
+        updateCodeAndDescription();
+        // 직접입력 필드 표시
+        const customInputGroup = document.getElementById('customInputGroup');
+        if (customInputGroup) customInputGroup.style.display = 'block';
+        return;
+    }
+
+    if (allSymptoms.length === 0 && !hasCustomInput) {
+        container.innerHTML = '<p>선택된 질환에 대한 소견이 없습니다.</p>';
+        codeInput.readOnly = true;
+        descriptionInput.readOnly = true;
+        return;
+    }
+
+    let html = '<table class="symptoms-table">';
+    html += '<tr><th>질환</th><th>소견</th><th>선택</th></tr>';
+
+    allSymptoms.forEach(symptom => {
+        html += '<tr class="symptom-row">';
+        html += '<td class="symptom-disease">' + getDiseaseByCode(symptom.code) + '</td>';
+        html += '<td class="symptom-label">';
+        html += '<label for="' + symptom.code + '">' + symptom.description + '</label>';
+        html += '</td>';
+        html += '<td class="symptom-checkbox">';
+        html += '<input type="checkbox" id="' + symptom.code + '" value="' + symptom.code + '" onchange="updateCodeAndDescription()">';
+        html += '</td>';
+        html += '</tr>';
+    });
+
+    container.innerHTML = html;
+    codeInput.readOnly = true;
+    descriptionInput.readOnly = true;
+
+    // 직접입력(추가) 선택 시 입력 필드 표시
+    const customInputGroup = document.getElementById('customInputGroup');
+    if (hasCustomInput) {
+        customInputGroup.style.display = 'block';
+    } else {
+        customInputGroup.style.display = 'none';
+        // 직접입력(추가) 해제 시 입력 내용 삭제
+        const customInput = document.getElementById('customInput');
+        if (customInput) customInput.value = '';
+    }
+
+    // 직접입력(추가)만 선택된 경우에도 입력 필드 표시
+    if (selectedDiseases.length === 1 && selectedDiseases[0] === '직접입력(추가)') {
+        if (customInputGroup) customInputGroup.style.display = 'block';
+    }
+}
+
+// 선택된 질환들 가져오기
+function getSelectedDiseases() {
+    const checkboxes = document.querySelectorAll('#diseaseContainer input[type="checkbox"]:checked');
+    return Array.from(checkboxes).map(cb => cb.value);
+}
+
+// 코드로 질환 찾기
+function getDiseaseByCode(code) {
+    const diseaseMap = {
+        'RDS_1': 'RDS', 'RDS_2': 'RDS', 'RDS_3': 'RDS', 'RDS_4': 'RDS',
+        'BPD_1': 'BPD', 'BPD_2': 'BPD', 'BPD_3': 'BPD', 'BPD_4': 'BPD',
+        'PTX_1': 'PTX', 'PTX_2': 'PTX', 'PTX_3': 'PTX', 'PTX_4': 'PTX', 'PTX_5': 'PTX',
+        'PIE_1': 'PIE',
+        'PMS_1': 'PMS', 'PMS_2': 'PMS', 'PMS_3': 'PMS',
+        'SEM_1': 'SEM',
+        'PPC_1': 'PPC',
+        'NEC_1': 'NEC', 'NEC_2': 'NEC', 'NEC_3': 'NEC', 'NEC_4': 'NEC', 'NEC_5': 'NEC'
+    };
+    return diseaseMap[code] || '';
+}
+
+// 질환별 소견 데이터
+function getSymptomsByDisease(disease) {
+    const symptoms = {
+        'Respiratory Distress Syndrome': [
+            {code: 'RDS_1', description: '폐용적의 감소(Hypoventilation)'},
+            {code: 'RDS_2', description: '폐포 허탈로 인한 과립성 음영 (Ground Glass Appearance)'},
+            {code: 'RDS_3', description: '기관지 내 음영 (Air-bronchogram)'},
+            {code: 'RDS_4', description: '폐 전체 white-out 양상, 심장 경계 불분명'}
+        ],
+        'Bronchopulmonary Dysplasia': [
+            {code: 'BPD_1', description: '미만성 음영 증가'},
+            {code: 'BPD_2', description: '폐용적 정상 또는 감소'},
+            {code: 'BPD_3', description: '전반적 과팽창'},
+            {code: 'BPD_4', description: '무기폐와 과투과성 부위 혼재'}
+        ],
+        'Pneumothorax': [
+            {code: 'PTX_1', description: '종격동의 반대쪽 이동(Chest AP)'},
+            {code: 'PTX_2', description: '편평해진 횡격막(기흉쪽)'},
+            {code: 'PTX_3', description: '기흉 쪽 폐의 허탈'},
+            {code: 'PTX_4', description: 'Lateral decubitus에서 소기흉 확인 가능'},
+            {code: 'PTX_5', description: 'Cross-table lateral: 팬케이크 모양의 공기'}
+        ],
+        'Pulmonary Interstitial Emphysema': [
+            {code: 'PIE_1', description: '낭성 또는 선상의 공기 음영 (국소/양폐)'}
+        ],
+        'Pneumomediastinum': [
+            {code: 'PMS_1', description: '흉부 중앙의 공기 음영'},
+            {code: 'PMS_2', description: '흉선 주위의 공기, "요트의 돛" (sail sign)'},
+            {code: 'PMS_3', description: 'Lateral view에서 명확히 관찰됨'}
+        ],
+        'Subcutaneous Emphysema': [
+            {code: 'SEM_1', description: '-'}
+        ],
+        'Pneumopericardium': [
+            {code: 'PPC_1', description: '심장하부의 공기 음영'}
+        ],
+        'Necrotizing Enterocolitis': [
+            {code: 'NEC_1', description: '장 마비 (Ileus)'},
+            {code: 'NEC_2', description: '장벽 내 공기 (Pneumatosis Intestinalis)'},
+            {code: 'NEC_3', description: 'Portal 또는 Hepatic vein gas'},
+            {code: 'NEC_4', description: '복수 (Ascites)'},
+            {code: 'NEC_5', description: '복강 내 공기 (Pneumoperitoneum)'}
+        ],
+        '직접 입력': []
+    };
+
+    return symptoms[disease] || [];
+}
+
+// 디바운스된 코드와 설명 업데이트 (중복 호출 방지)
+let updateTimeout = null;
+function debouncedUpdateCodeAndDescription() {
+    if (updateTimeout) {
+        clearTimeout(updateTimeout);
+    }
+    updateTimeout = setTimeout(() => {
+        updateCodeAndDescription();
+    }, 300); // 300ms 지연
+}
+
+// 선택된 소견에 따라 코드와 설명 업데이트
+function updateCodeAndDescription() {
+    const selectedDiseases = getSelectedDiseases();
+
+    // 정상만 선택된 경우에도 처리
+    if (selectedDiseases.length === 1 && selectedDiseases[0] === '정상') {
+        document.getElementById('codeInput').value = 'NORMAL';
+        document.getElementById('descriptionInput').value = '정상';
+        return;
+    }
+
+    const checkboxes = document.querySelectorAll('#symptomsContainer input[type="checkbox"]:checked');
+    const codes = [];
+    const descriptions = [];
+
+    checkboxes.forEach(checkbox => {
+        codes.push(checkbox.value);
+        const label = document.querySelector(`label[for="${checkbox.value}"]`);
+        if (label && label.textContent) {
+            descriptions.push(label.textContent);
+        }
+    });
+
+    // 직접 입력 내용 추가 (중복 방지)
+    const customInput = document.getElementById('customInput');
+    let customText = '';
+    if (customInput && customInput.value.trim()) {
+        // 이미 CUSTOM이 codes에 있는지 확인
+        if (!codes.includes('CUSTOM')) {
+            codes.push('CUSTOM');
+        }
+        customText = customInput.value.trim();
+        // 이미 customText가 descriptions에 있는지 확인
+        if (!descriptions.includes(customText)) {
+            descriptions.push(customText);
+        }
+    }
+
+    // 직접입력(추가)만 선택된 경우
+    if (selectedDiseases.includes('직접입력(추가)') && codes.length === 0) {
+        if (customText) {
+            // 직접 입력 내용이 있는 경우
+            document.getElementById('codeInput').value = 'CUSTOM';
+            document.getElementById('descriptionInput').value = customText;
+        } else {
+            // 직접 입력 내용이 없는 경우
+            document.getElementById('codeInput').value = 'CUSTOM';
+            document.getElementById('descriptionInput').value = '직접 입력 내용을 작성해주세요.';
+        }
+        // 직접입력 필드 표시
+        const customInputGroup = document.getElementById('customInputGroup');
+        if (customInputGroup) customInputGroup.style.display = 'block';
+        return;
+    }
+
+    // 직접입력(추가)만 선택된 경우 (다른 질환 없음)
+    if (selectedDiseases.length === 1 && selectedDiseases[0] === '직접입력(추가)') {
+        if (customText) {
+            // 직접 입력 내용이 있는 경우
+            document.getElementById('codeInput').value = 'CUSTOM';
+            document.getElementById('descriptionInput').value = customText;
+        } else {
+            // 직접 입력 내용이 없는 경우
+            document.getElementById('codeInput').value = 'CUSTOM';
+            document.getElementById('descriptionInput').value = '직접 입력 내용을 작성해주세요.';
+        }
+        // 직접입력 필드 표시
+        const customInputGroup = document.getElementById('customInputGroup');
+        if (customInputGroup) customInputGroup.style.display = 'block';
+        return;
+    }
+
+    // 직접입력(추가)와 다른 질환이 함께 선택된 경우
+    if (selectedDiseases.includes('직접입력(추가)') && codes.length > 0) {
+        // 기존 소견 + 직접 입력 내용 (중복 방지)
+        let finalDescriptions = [...descriptions];
+        if (customText && !finalDescriptions.includes(customText)) {
+            finalDescriptions.push(customText);
+        }
+        document.getElementById('codeInput').value = codes.join(', ');
+        document.getElementById('descriptionInput').value = finalDescriptions.join('\n');
+        return;
+    }
+
+    // 일반적인 경우 (직접입력(추가) 없음)
+    document.getElementById('codeInput').value = codes.join(', ');
+    document.getElementById('descriptionInput').value = descriptions.join('\n');
+}
+
+// 라벨링 제출
+function submitLabeling() {
+    const selectedDiseases = getSelectedDiseases();
+    const viewType = document.getElementById('viewTypeSelect').value;
+    const code = document.getElementById('codeInput').value;
+    const description = document.getElementById('descriptionInput').value;
+
+    // 필수 필드 검증
+    if (selectedDiseases.length === 0) {
+        showMessage('질환을 선택해주세요.', 'error');
+        return;
+    }
+
+    if (!viewType) {
+        showMessage('사진 종류를 선택해주세요.', 'error');
+        document.getElementById('viewTypeSelect').focus();
+        return;
+    }
+
+    if (!description) {
+        showMessage('최종 소견을 입력해주세요.', 'error');
+        document.getElementById('descriptionInput').focus();
+        return;
+    }
+
+    // 정상이 아닌 경우에만 코드 검증 (직접입력만 선택한 경우 제외)
+    if (!(selectedDiseases.length === 1 && selectedDiseases[0] === '정상') && 
+        !(selectedDiseases.length === 1 && selectedDiseases[0] === '직접입력(추가)') && 
+        !code) {
+        showMessage('소견을 선택해주세요.', 'error');
+        return;
+    }
+
+    // 직접입력(추가) 선택 시 직접 입력 내용 검증
+    if (selectedDiseases.includes('직접입력(추가)')) {
+        const customInput = document.getElementById('customInput');
+        if (!customInput || !customInput.value.trim()) {
+            showMessage('직접 입력 내용을 작성해주세요.', 'error');
+            if (customInput) customInput.focus();
+            return;
+        }
+    }
+
+    addLabel(currentFileId, selectedDiseases, viewType, code, description);
+    closeLabelingModal();
+}
+
+// 라벨링 추가
+function addLabel(fileId, diseases, viewType, code, description) {
+    fetch('/api/label', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            file_id: fileId,
+            disease: diseases,  // 이제 리스트 형태로 전송
+            view_type: viewType,
+            code: code,
+            description: description,
+            tab: currentTab  // 다음 파일 미리 렌더링 기준 목록
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showMessage(data.message, 'success');
+            addPrefetchLinks(data.prefetch);
+            loadFiles(currentPage); // 현재 페이지 새로고침
+        } else {
+            showMessage(data.error || '라벨링 실패', 'error');
+        }
+    })
+    .catch(error => {
+        showMessage('서버 오류가 발생했습니다.', 'error');
+    });
+}
+
+// 다음 파일 이미지를 브라우저가 미리 받아두도록 <link rel="prefetch"> 추가
+function addPrefetchLinks(files) {
+    document.querySelectorAll('link[data-prefetch-image]').forEach(link => link.remove());
+    (files || []).forEach(file => {
+        const link = document.createElement('link');
+        link.rel = 'prefetch';
+        link.as = 'image';
+        link.href = file.image_url;
+        link.dataset.prefetchImage = file.id;
+        document.head.appendChild(link);
+    });
+}
+
+// 라벨링 기록 조회
+function viewLabelHistory(fileId) {
+    fetch(`/api/label/history/${fileId}`)
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            if (data.has_history) {
+                displayLabelHistory(data.label);
+            } else {
+                displayNoHistory(data.message);
+            }
+            document.getElementById('historyModal').style.display = 'block';
+        } else {
+            showMessage(data.error || '기록 조회 실패', 'error');
+        }
+    })
+    .catch(error => {
+        showMessage('서버 오류가 발생했습니다.', 'error');
+    });
+}
+
+// 라벨링 기록 표시
+function displayLabelHistory(label) {
+    const content = document.getElementById('historyContent');
+    const diseases = Array.isArray(label.disease) ? label.disease.join(', ') : label.disease;
+    content.innerHTML = `
+        <div class="history-item">
+            <h3>✅ 라벨링 기록이 있습니다</h3>
+            <div class="history-details">
+                <p><strong>질환:</strong> ${diseases}</p>
+                <p><strong>사진 종류:</strong> ${label.view_type}</p>
+                <p><strong>번호:</strong> ${label.code}</p>
+                <p><strong>최종 소견:</strong></p>
+                <div class="description-box">
+                    ${label.description.replace(/\n/g, '<br>')}
+                </div>
+                <p><strong>라벨링 시간:</strong> ${label.created_at}</p>
+            </div>
+        </div>
+    `;
+}
+
+// 기록 없음 표시
+function displayNoHistory(message) {
+    const content = document.getElementById('historyContent');
+    content.innerHTML = `
+        <div class="history-item">
+            <h3>❌ 라벨링 기록이 없습니다</h3>
+            <p>${message}</p>
+            <p>이 파일에 대해 아직 라벨링을 하지 않았습니다.</p>
+        </div>
+    `;
+}
+
+// 기록 모달 닫기
+function closeHistoryModal() {
+    document.getElementById('historyModal').style.display = 'none';
+}
+
+// 도움말 표시
+function showHelp() {
+    fetch('/api/help')
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            displayHelp(data.help);
+            document.getElementById('helpModal').style.display = 'block';
+        } else {
+            showMessage(data.error || '도움말을 불러올 수 없습니다.', 'error');
+        }
+    })
+    .catch(error => {
+        showMessage('서버 오류가 발생했습니다.', 'error');
+    });
+}
+
+// 도움말 내용 표시
+function displayHelp(help) {
+    // 시스템 설명 탭 내용
+    const systemTab = document.getElementById('systemTab');
+    systemTab.innerHTML = `
+        <div class="help-section">
+            <h3>${help.system_intro.title}</h3>
+            <div style="white-space: pre-line; line-height: 1.6; color: #495057;">
+                ${help.system_intro.content.replace(/(\d+\.\s+[^\n]+)/g, '<strong style="color: #2c3e50; font-size: 15px;">$1</strong>')}
+            </div>
+        </div>
+    `;
+
+    // 라벨링 방법 탭 내용
+    const guideTab = document.getElementById('guideTab');
+    let guideHtml = `
+        <div class="help-section">
+            <h3>${help.labeling_guide.title}</h3>
+            <div class="help-steps">
+    `;
+
+    help.labeling_guide.steps.forEach(step => {
+        const buttonClass = step.button_style === 'blue' ? 'help-btn-blue' : 
+                           step.button_style === 'green' ? 'help-btn-green' : 
+                           step.button_style === 'teal' ? 'help-btn-teal' : 'help-btn-default';
+
+        guideHtml += `
+            <div class="help-step">
+                <h4>
+                    <span class="step-number">${step.step}</span>
+                    <button class="help-action-btn ${buttonClass}">${step.emoji} ${step.action}</button>
+                </h4>
+                <p>${step.description}</p>
+        `;
+
+        if (step.sub_steps) {
+            guideHtml += '<div class="help-sub-steps">';
+            step.sub_steps.forEach(subStep => {
+                guideHtml += `
+                    <div class="help-sub-step">
+                        <h5>${subStep.title}</h5>
+                        <p>${subStep.description}</p>
+                `;
+
+                if (subStep.options) {
+                    guideHtml += '<div class="help-options">';
+                    subStep.options.forEach(option => {
+                        guideHtml += `<span class="help-option">${option}</span>`;
+                    });
+                    guideHtml += '</div>';
+                }
+
+                guideHtml += '</div>';
+            });
+            guideHtml += '</div>';
+        }
+
+        guideHtml += '</div>';
+    });
+
+    guideHtml += `
+            </div>
+        </div>
+    `;
+
+    guideTab.innerHTML = guideHtml;
+}
+
+// 도움말 탭 전환
+function switchHelpTab(tabName) {
+    // 모든 탭 버튼 비활성화
+    document.querySelectorAll('.help-tab-btn').forEach(btn => {
+        btn.classList.remove('active');
+    });
+
+    // 모든 탭 내용 숨기기
+    document.querySelectorAll('.help-tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // 선택된 탭 활성화
+    if (tabName === 'system') {
+        document.querySelector('.help-tab-btn:first-child').classList.add('active');
+        document.getElementById('systemTab').classList.add('active');
+    } else if (tabName === 'guide') {
+        document.querySelector('.help-tab-btn:last-child').classList.add('active');
+        document.getElementById('guideTab').classList.add('active');
+    }
+}
+
+// 도움말 모달 닫기
+function closeHelpModal() {
+    document.getElementById('helpModal').style.display = 'none';
+}
+
+// 데이터베이스 Excel 내보내기 (백그라운드 작업 등록 후 완료될 때까지 진행률 확인)
+function exportDatabase() {
+    if (!DASHBOARD_CONFIG.canExport) {
+        showMessage('권한이 없습니다.', 'error');
+        return;
+    }
+
+    const exportBtn = event.target;
+    exportBtn.textContent = '📊 내보내는 중...';
+    exportBtn.disabled = true;
+
+    fetch('/api/export/jobs', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showMessage('Excel 내보내기를 시작했습니다.', 'success');
+            pollExportJob(data.job.id, exportBtn);
+        } else {
+            showMessage(data.error || 'Excel 내보내기 실패', 'error');
+            resetExportButton(exportBtn);
+        }
+    })
+    .catch(error => {
+        showMessage('서버 오류가 발생했습니다.', 'error');
+        resetExportButton(exportBtn);
+    });
+}
+
+// 내보내기 작업 진행 상태 확인 (1초 간격)
+function pollExportJob(jobId, exportBtn) {
+    fetch(`/api/export/jobs/${jobId}`)
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            showMessage(data.error || 'Excel 내보내기 실패', 'error');
+            resetExportButton(exportBtn);
+            return;
+        }
+
+        const job = data.job;
+        if (job.status === 'done') {
+            window.location.href = job.download_url;
+            showMessage('Excel 다운로드 시작', 'success');
+            resetExportButton(exportBtn);
+        } else if (job.status === 'failed') {
+            showMessage('Excel 내보내기 실패: ' + (job.error || ''), 'error');
+            resetExportButton(exportBtn);
+        } else {
+            exportBtn.textContent = `📊 내보내는 중... ${job.progress}%`;
+            setTimeout(() => pollExportJob(jobId, exportBtn), 1000);
+        }
+    })
+    .catch(error => {
+        // 일시적인 네트워크 오류는 다시 시도
+        setTimeout(() => pollExportJob(jobId, exportBtn), 3000);
+    });
+}
+
+function resetExportButton(exportBtn) {
+    exportBtn.textContent = '📊 Excel 내보내기';
+    exportBtn.disabled = false;
+}
+
+
+
+// 파일 내용 보기
+function viewContent(fileId) {
+    fetch(`/api/files/${fileId}/content`)
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            if (data.is_image) {
+                // 이미지 파일인 경우 새 창에서 열기
+                window.open(data.image_url, '_blank');
+            } else {
+                // 텍스트 파일인 경우 알림으로 표시
+                alert(`파일명: ${data.filename}\n\n내용:\n${data.content}`);
+            }
+        } else {
+            showMessage(data.error || '파일을 읽을 수 없습니다.', 'error');
+        }
+    })
+    .catch(error => {
+        showMessage('서버 오류가 발생했습니다.', 'error');
+    });
+}
+
+function showMessage(message, type) {
+    // 라벨링 모달이 열려있으면 모달 내부에 메시지 표시
+    const labelingModal = document.getElementById('labelingModal');
+    const modalMessageDiv = document.getElementById('labelingModalMessage');
+    if (labelingModal && labelingModal.style.display === 'block' && modalMessageDiv) {
+        modalMessageDiv.textContent = message;
+        modalMessageDiv.className = `message ${type}`;
+        modalMessageDiv.style.display = 'block';
+        setTimeout(() => {
+            modalMessageDiv.textContent = '';
+            modalMessageDiv.className = 'message';
+            modalMessageDiv.style.display = 'none';
+        }, 3000);
+    } else {
+        const messageDiv = document.getElementById('message');
+        messageDiv.textContent = message;
+        messageDiv.className = `message ${type}`;
+        setTimeout(() => {
+            messageDiv.textContent = '';
+            messageDiv.className = '';
+        }, 3000);
+    }
+}
+
+function logout() {
+    fetch('/api/logout', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            window.location.href = '/';
+        }
+    });
+}
+
+// 페이지 로드 시 파일 목록 로드
+loadFiles(1);
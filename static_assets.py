@@ -0,0 +1,118 @@
+"""
+대시보드 정적 자산(JS/CSS) 제공
+- 내용 해시를 넣은 파일명 URL(/assets/dashboard.<해시>.js) → 내용이 바뀌면 URL도 바뀌므로 1년 immutable 캐시
+- gzip / brotli(brotli 패키지가 설치된 경우) 압축본을 미리 만들어 cache/assets에 저장하고 Accept-Encoding에 따라 전송
+- 원본 수정 시각이 바뀌면 다음 요청에서 해시와 압축본을 다시 만듦 (JS/CSS 수정이 서버 재시작 없이 반영)
+"""
+
+import os
+import gzip
+import hashlib
+import tempfile
+import threading
+
+from flask import request, send_file, abort
+
+# 자산 설정 (환경변수로 변경 가능)
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+ASSET_CACHE_DIR = os.environ.get(
+    'ASSET_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'assets')
+)
+ASSET_FILES = ('dashboard.css', 'dashboard.js')
+ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+ASSET_MIMETYPES = {'.css': 'text/css', '.js': 'text/javascript'}
+# 선호 순서 (brotli가 gzip보다 작음)
+ENCODING_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+_lock = threading.Lock()
+_manifest = {}  # 자산 이름 → {'mtime', 'hash', 'filename', 'variants': {인코딩: 압축본 경로}}
+
+
+def _compressors():
+    compressors = {'gzip': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+        compressors['br'] = lambda data: brotli.compress(data, quality=11)
+    except ImportError:
+        pass  # brotli 미설치: gzip만 사용
+    return compressors
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _build(name, mtime):
+    """자산 해시 계산 + 압축본 생성 (같은 해시의 압축본이 이미 있으면 재사용)"""
+    with open(os.path.join(ASSET_DIR, name), 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    stem, ext = os.path.splitext(name)
+    filename = f'{stem}.{digest}{ext}'
+
+    compressors = _compressors()
+    variants = {}
+    for encoding, suffix in ENCODING_SUFFIXES:
+        if encoding not in compressors:
+            continue
+        path = os.path.join(ASSET_CACHE_DIR, filename + suffix)
+        if not os.path.exists(path):
+            _write_atomic(path, compressors[encoding](data))
+        variants[encoding] = path
+    return {'mtime': mtime, 'hash': digest, 'filename': filename, 'variants': variants}
+
+
+def _entry(name):
+    mtime = os.stat(os.path.join(ASSET_DIR, name)).st_mtime_ns
+    with _lock:
+        entry = _manifest.get(name)
+        if entry is None or entry['mtime'] != mtime:
+            entry = _manifest[name] = _build(name, mtime)
+    return entry
+
+
+def asset_url(name):
+    """템플릿에서 사용할 해시 포함 URL"""
+    return f"/assets/{_entry(name)['filename']}"
+
+
+def send_asset(filename):
+    """해시 포함 파일명 요청에 압축본(또는 원본)을 1년 immutable 캐시로 응답"""
+    stem, ext = os.path.splitext(filename)
+    base, _, digest = stem.rpartition('.')
+    name = base + ext
+    if name not in ASSET_FILES:
+        abort(404)
+    entry = _entry(name)
+
+    path, encoding = os.path.join(ASSET_DIR, name), None
+    for candidate, _ in ENCODING_SUFFIXES:
+        if candidate in entry['variants'] and request.accept_encodings[candidate]:
+            path, encoding = entry['variants'][candidate], candidate
+            break
+
+    response = send_file(path, mimetype=ASSET_MIMETYPES[ext], conditional=True,
+                         etag=f"{entry['hash']}-{encoding or 'identity'}")
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    if digest == entry['hash']:
+        response.cache_control.max_age = ASSET_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        # 배포 직후 이전 HTML이 요청한 해시: 현재 내용을 보내되 캐시에 고정하지 않음
+        response.cache_control.no_cache = True
+    return response
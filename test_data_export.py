@@ -0,0 +1,108 @@
+"""
+머신러닝용 내보내기 형식 테스트 (SQLite / PostgreSQL)
+- 내보낸 CSV(질환 원-핫 컬럼) / JSONL(질환 리스트) / Parquet(list<string>, timestamp)을 다시 읽었을 때
+  DB의 라벨과 같은지 (Parquet은 pyarrow가 설치된 경우만)
+- EXPORT_CHUNK_SIZE보다 행이 많아 여러 조각으로 나누어 기록되는 경우 포함
+
+실행: python -m pytest -q test_data_export.py
+"""
+
+import csv
+import json
+from datetime import datetime
+
+import pytest
+
+from conftest import bind_database
+import data_export
+import main
+from user import db, User, File, Label, DISEASE_CATALOG
+
+# file_id 순서대로 저장할 질환 (원본 문자열)
+STORED_DISEASES = [
+    json.dumps(['Pneumothorax', 'Respiratory Distress Syndrome'], ensure_ascii=False),
+    json.dumps(['정상'], ensure_ascii=False),
+    'Pneumothorax',  # JSON 이전 단일 질환 데이터
+]
+CREATED_AT = datetime(2024, 5, 1, 9, 30, 15)
+
+
+@pytest.fixture(scope='module')
+def labels(database_url):
+    """라벨 3개를 저장하고 내보내기 결과와 비교할 기대값을 반환"""
+    bind_database(main.app, database_url)
+    with main.app.app_context():
+        user = User(username='exporter', email='exporter@example.com')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.flush()
+        expected = []
+        for i, raw in enumerate(STORED_DISEASES):
+            file = File(filename=f'{i:05d}.png', file_path=f'{i:05d}.png', file_size=1, uploaded_by=user.id)
+            db.session.add(file)
+            db.session.flush()
+            label = Label(user_id=user.id, file_id=file.id, disease=raw, view_type='AP',
+                          code=f'RDS_{i}', description='소견', created_at=CREATED_AT)
+            db.session.add(label)
+            db.session.flush()
+            expected.append({'id': label.id, 'user_id': user.id, 'username': user.username,
+                             'file_id': file.id, 'filename': file.filename,
+                             'diseases': Label.parse_diseases(raw), 'view_type': 'AP',
+                             'code': label.code, 'description': '소견'})
+        db.session.commit()
+    return expected
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(data_export, 'EXPORT_CHUNK_SIZE', 2)
+
+
+def export(tmp_path, fmt):
+    dest = str(tmp_path / f'labels.{fmt}')
+    with main.app.app_context():
+        rows = data_export.write_export(dest, fmt, 'labels')
+    return dest, rows
+
+
+def test_csv_round_trip_with_one_hot_diseases(labels, tmp_path):
+    dest, rows = export(tmp_path, 'csv')
+    assert rows == len(labels)
+    with open(dest, encoding='utf-8', newline='') as f:
+        records = list(csv.DictReader(f))
+
+    assert len(records) == len(labels)
+    for record, label in zip(records, labels):
+        diseases = [disease for disease in DISEASE_CATALOG if record.pop(f'disease_{disease}') == '1']
+        assert diseases == [disease for disease in DISEASE_CATALOG if disease in label['diseases']]
+        assert datetime.fromisoformat(record.pop('created_at')) == CREATED_AT
+        assert record == {key: str(value) for key, value in label.items() if key != 'diseases'}
+
+
+def test_jsonl_round_trip_with_disease_lists(labels, tmp_path):
+    dest, rows = export(tmp_path, 'jsonl')
+    assert rows == len(labels)
+    with open(dest, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+
+    assert len(records) == len(labels)
+    for record, label in zip(records, labels):
+        assert datetime.fromisoformat(record.pop('created_at')) == CREATED_AT
+        assert record == label
+
+
+def test_parquet_round_trip_with_typed_columns(labels, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+    dest, rows = export(tmp_path, 'parquet')
+    assert rows == len(labels)
+    table = pq.read_table(dest)
+
+    diseases_type = table.schema.field('diseases').type
+    assert pa.types.is_list(diseases_type) and pa.types.is_string(diseases_type.value_type)
+    assert pa.types.is_timestamp(table.schema.field('created_at').type)
+    records = table.to_pylist()
+    assert len(records) == len(labels)
+    for record, label in zip(records, labels):
+        assert record.pop('created_at') == CREATED_AT
+        assert record == label
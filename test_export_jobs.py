@@ -0,0 +1,82 @@
+"""
+백그라운드 내보내기 작업 테스트
+- 작업 상태가 EXPORT_JOB_DIR의 JSON 파일에 저장되어 다른 워커 프로세스에서도 조회되는지
+- 실행하던 프로세스가 종료된 작업은 실패로 표시되는지
+- 만료된 작업은 JSON과 결과 파일이 함께 삭제되는지
+
+실행: python -m pytest -q test_export_jobs.py
+"""
+
+import os
+import time
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import bind_database
+import export_jobs
+import main
+
+
+@pytest.fixture
+def app(database_url):
+    bind_database(main.app, database_url)
+    return main.app
+
+
+def wait_for_job(job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = export_jobs.get_job(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'작업이 끝나지 않음: {job_id}')
+
+
+def test_job_state_is_shared_through_job_file(app):
+    job = export_jobs.submit_export_job(app, 1, 'labels.csv', fmt='csv', data_type='labels')
+    done = wait_for_job(job['id'])
+    assert done['status'] == 'done', done['error']
+    assert os.path.exists(done['path'])
+
+    # 다른 워커 프로세스에서 같은 작업을 조회
+    script = (
+        'import sys, export_jobs; job = export_jobs.get_job(sys.argv[1]); '
+        'print(job["status"], job["user_id"], export_jobs.job_to_dict(job)["download_url"])'
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script, job['id']], check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(export_jobs.__file__)), env=os.environ.copy()
+    ).stdout.split()
+    assert output == ['done', '1', f"/api/export/jobs/{job['id']}/download"]
+
+
+def test_job_of_dead_process_is_reported_failed(app):
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    job = export_jobs.submit_export_job(app, 1, 'labels.csv', fmt='csv', data_type='labels')
+    wait_for_job(job['id'])
+    export_jobs._update_job(job['id'], status='running', pid=dead.pid, finished_at=None, expires_at=None)
+
+    job = export_jobs.get_job(job['id'])
+    assert job['status'] == 'failed'
+    assert job['expires_at'] is not None
+
+
+def test_expired_job_files_are_removed(app):
+    job = export_jobs.submit_export_job(app, 1, 'labels.csv', fmt='csv', data_type='labels')
+    wait_for_job(job['id'])
+    export_jobs._update_job(job['id'], expires_at=datetime.now() - timedelta(seconds=1))
+
+    assert export_jobs.get_job(job['id']) is None
+    export_jobs.cleanup_expired_jobs()
+    assert not os.path.exists(job['path'])
+    assert not os.path.exists(export_jobs._job_file(job['id']))
+
+
+def test_unknown_or_malformed_job_id(app):
+    assert export_jobs.get_job('0' * 32) is None
+    assert export_jobs.get_job('../app') is None
@@ -0,0 +1,103 @@
+"""
+/api/files 쿼리 수 회귀 테스트
+- 파일/라벨/업로더를 한 번의 쿼리로 조회하는지 확인 (파일 수에 비례하는 N+1 쿼리가 다시 생기지 않도록)
+- 테스트 DB(SQLite, TEST_DATABASE_URL이 있으면 PostgreSQL도)에 데이터를 넣고
+  before_cursor_execute 이벤트로 실행된 SQL 문 수를 셈
+
+실행: python -m pytest -q test_file_list_queries.py
+"""
+
+import os
+
+import pytest
+from sqlalchemy import event
+
+from conftest import TEST_DIR, bind_database
+import main
+from user import db, User, File, Label
+
+FILE_COUNT = 600
+
+
+@pytest.fixture(scope='module')
+def client(database_url):
+    bind_database(main.app, database_url)
+    with main.app.app_context():
+        users = [User(username=f'user{i}', email=f'user{i}@example.com') for i in range(3)]
+        for user in users:
+            user.set_password('password')
+        db.session.add_all(users)
+        db.session.flush()
+
+        files = [
+            File(filename=f'{i:05d}.png', file_path=os.path.join(TEST_DIR, f'{i:05d}.png'),
+                 file_size=i, uploaded_by=users[i % len(users)].id)
+            for i in range(FILE_COUNT)
+        ]
+        db.session.add_all(files)
+        db.session.flush()
+
+        # 사용자마다 서로 다른 1/3의 파일에 라벨을 남김 (다른 사용자의 라벨만 있는 파일 포함)
+        for i, file in enumerate(files):
+            for user in users:
+                if (i + user.id) % 3 == 0:
+                    label = Label(user_id=user.id, file_id=file.id, view_type='AP', code='RDS_1', description='')
+                    label.set_diseases(['Respiratory Distress Syndrome'])
+                    db.session.add(label)
+        db.session.commit()
+        user_id = users[0].id
+
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+    return client
+
+
+def count_queries(client, url):
+    """요청 하나가 실행한 SQL 문 수와 응답"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with main.app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, response.get_json()
+    return len(statements), response.get_json()
+
+
+@pytest.mark.parametrize('tab', ['all', 'completed', 'incomplete'])
+def test_page_mode_query_count_is_constant(client, tab):
+    # 페이지 조회 1번 + 전체 개수 1번
+    for per_page in (20, 100):
+        count, data = count_queries(client, f'/api/files?tab={tab}&page=2&per_page={per_page}')
+        assert data['files']
+        assert count == 2, f'per_page={per_page}: {count}개 쿼리'
+
+
+@pytest.mark.parametrize('tab', ['all', 'completed', 'incomplete'])
+def test_cursor_mode_query_count_is_constant(client, tab):
+    for per_page in (20, 100):
+        # 첫 페이지
+        count, data = count_queries(client, f'/api/files?tab={tab}&cursor=&per_page={per_page}')
+        assert data['files']
+        assert count == 1, f'per_page={per_page}: {count}개 쿼리'
+
+        # 다음 페이지 (커서 이후 위치)
+        next_cursor = data['pagination']['next_cursor']
+        assert next_cursor
+        count, data = count_queries(client, f'/api/files?tab={tab}&cursor={next_cursor}&per_page={per_page}')
+        assert data['files']
+        assert count == 1, f'per_page={per_page}: {count}개 쿼리'
+
+
+def test_cursor_mode_with_total_adds_one_query(client):
+    for per_page in (20, 100):
+        count, data = count_queries(client, f'/api/files?cursor=&per_page={per_page}&include_total=1')
+        assert data['pagination']['total'] == FILE_COUNT
+        assert count == 2, f'per_page={per_page}: {count}개 쿼리'
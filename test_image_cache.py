@@ -0,0 +1,99 @@
+"""
+렌더링 캐시 / 미리 렌더링 테스트
+- PNG로 변환되어 등록된 DICOM도 다음 파일 미리 준비(prefetch) 대상이 되는지 (매니페스트의 원본 DICOM 사용)
+- 원본 이미지를 연 파일 핸들이 바로 닫히는지
+
+실행: python -m pytest -q test_image_cache.py
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from conftest import bind_database
+import database_manager
+import image_cache
+import main
+from user import User, File
+
+
+def write_dicom(path, rows=32, columns=32):
+    """CT 형태(12비트 저장값, RescaleIntercept -1024)의 작은 DICOM 파일 생성"""
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+    meta = FileMetaDataset()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    meta.MediaStorageSOPClassUID = '1.2.840.10008.5.1.4.1.1.2'
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.Rows, ds.Columns = rows, columns
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = 'MONOCHROME2'
+    ds.BitsAllocated, ds.BitsStored, ds.HighBit, ds.PixelRepresentation = 16, 12, 11, 0
+    ds.RescaleSlope, ds.RescaleIntercept = 1, -1024
+    ds.PixelData = (np.arange(rows * columns, dtype=np.uint16) % 4096).tobytes()
+    ds.save_as(path, enforce_file_format=True)
+
+
+def wait_for_prefetch(timeout=10):
+    deadline = time.monotonic() + timeout
+    while image_cache._prefetch_pending and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not image_cache._prefetch_pending
+
+
+@pytest.fixture
+def ingested(database_url, tmp_path, monkeypatch):
+    """a/0.png(일반 이미지)와 a/1.dcm(PNG로 변환되어 a/1.png로 등록)을 폴더 업로드"""
+    pytest.importorskip('pydicom')
+    bind_database(main.app, database_url)
+    bind_database(database_manager.app, database_url)
+    monkeypatch.setattr(database_manager, 'UPLOAD_FOLDER_PATH', str(tmp_path / 'uploads'))
+    database_manager.add_sample_user()
+
+    source = tmp_path / 'source' / 'a'
+    source.mkdir(parents=True)
+    Image.fromarray(np.zeros((16, 16), dtype=np.uint8)).save(source / '0.png')
+    write_dicom(source / '1.dcm')
+    database_manager.upload_files_from_folder(str(tmp_path / 'source'), workers=1)
+    image_cache.clear_decoded()
+
+    with main.app.app_context():
+        user_id = User.query.filter_by(username='admin').one().id
+        files = {file.filename: file.id for file in File.query.all()}
+    return {'user_id': user_id, 'files': files, 'source': str(source / '1.dcm')}
+
+
+def test_prefetch_decodes_source_of_converted_dicom(ingested):
+    with main.app.test_request_context():
+        prefetch = main.prefetch_next_files(ingested['user_id'], 'all', ingested['files']['a/0.png'], count=1)
+    assert [item['filename'] for item in prefetch] == ['a/1.png']
+    wait_for_prefetch()
+
+    # 윈도우 조절 요청은 원본 DICOM을 다시 읽지 않고 메모리 캐시에서 처리
+    before = image_cache.get_stats()['decoded_hits']
+    image_cache.get_decoded(ingested['source'])
+    assert image_cache.get_stats()['decoded_hits'] == before + 1
+
+
+def open_file_count():
+    if not os.path.isdir('/proc/self/fd'):
+        pytest.skip('/proc/self/fd가 없는 환경')
+    return len(os.listdir('/proc/self/fd'))
+
+
+@pytest.mark.parametrize('mode', ['L', 'RGB', 'RGBA', 'I;16'])
+def test_open_source_image_closes_file(tmp_path, mode):
+    path = str(tmp_path / f'source_{mode.replace(";", "")}.png')
+    Image.new(mode, (64, 48)).save(path)
+
+    before = open_file_count()
+    img = image_cache._open_source_image(path, 32)
+    assert open_file_count() == before  # 반환된 이미지를 들고 있어도 원본 파일은 닫혀 있음
+    assert img.mode in ('L', 'RGB')
+    assert img.size == (64, 48)
@@ -0,0 +1,74 @@
+"""
+폴더 업로드 다시 스캔 테스트 (SQLite / PostgreSQL)
+- 내용이 같은 파일은 기존 File로 연결(link)되고, 연결된 원본이 바뀌면 새 File로 등록되는지
+  (연결된 원본 File 행의 경로/해시를 덮어쓰면 그 파일의 라벨이 다른 영상을 가리키게 됨)
+- 등록된 파일의 원본이 바뀌면 자기 File 행만 갱신되는지
+
+실행: python -m pytest -q test_ingest.py
+"""
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from conftest import bind_database
+import database_manager
+from user import File, IngestManifest
+
+
+@pytest.fixture
+def folder(database_url, tmp_path, monkeypatch):
+    bind_database(database_manager.app, database_url)
+    monkeypatch.setattr(database_manager, 'UPLOAD_FOLDER_PATH', str(tmp_path / 'uploads'))
+    database_manager.add_sample_user()  # 업로드 사용자(admin)
+    source = tmp_path / 'source'
+    pixels = (np.arange(32 * 32, dtype=np.uint32) % 256).astype(np.uint8).reshape(32, 32)
+    for name in ('A', 'B'):
+        (source / name).mkdir(parents=True)
+        Image.fromarray(pixels).save(source / name / 'x.png')
+    return source
+
+
+def upload(folder):
+    database_manager.upload_files_from_folder(str(folder), workers=1)
+    with database_manager.app.app_context():
+        files = {file.filename: (file.id, file.file_path, file.content_hash) for file in File.query.all()}
+        manifest = {row.path: row.file_id for row in IngestManifest.query.all()}
+    return files, manifest
+
+
+def test_changed_linked_duplicate_becomes_new_file(folder):
+    files, manifest = upload(folder)
+    assert len(files) == 1 and len(manifest) == 2
+    (owner_name, (owner_id, owner_path, owner_hash)), = files.items()
+    linked_path = next(path for path in manifest if path != owner_path)
+    assert manifest[linked_path] == owner_id
+
+    # 연결된 쪽 원본만 바뀜
+    with open(linked_path, 'ab') as f:
+        f.write(b'\0')
+    files, manifest = upload(folder)
+
+    assert files[owner_name] == (owner_id, owner_path, owner_hash)
+    assert len(files) == 2
+    new_name = next(name for name in files if name != owner_name)
+    new_id, new_path, new_hash = files[new_name]
+    assert new_path == linked_path
+    assert new_hash != owner_hash
+    assert manifest[linked_path] == new_id
+    assert manifest[owner_path] == owner_id
+
+
+def test_changed_owner_updates_its_own_row(folder):
+    files, manifest = upload(folder)
+    (owner_name, (owner_id, owner_path, owner_hash)), = files.items()
+
+    with open(owner_path, 'ab') as f:
+        f.write(b'\0')
+    files, manifest = upload(folder)
+
+    owner = files[owner_name]
+    assert owner[:2] == (owner_id, owner_path)
+    assert owner[2] != owner_hash
@@ -0,0 +1,114 @@
+"""
+라벨 저장 테스트 (SQLite / PostgreSQL)
+- add_label의 upsert(db_config.dialect_insert의 ON CONFLICT)로 라벨이 한 행만 유지되는지
+- label_stats 변경분 반영과 label_revision 이력 기록
+- DB 종류별 엔진 설정(PostgreSQL 연결 풀)
+- 마이그레이션 스크립트의 기본 DB 경로 (실행 위치와 무관)
+- 저장된 질환 값 해석 (Label.parse_diseases)
+
+실행: python -m pytest -q test_labels.py
+"""
+
+import os
+
+import pytest
+
+from conftest import bind_database
+import db_config
+import label_stats
+import main
+from user import db, User, File, Label, LabelRevision
+
+
+@pytest.fixture(scope='module')
+def seeded(database_url):
+    bind_database(main.app, database_url)
+    with main.app.app_context():
+        user = User(username='labeler', email='labeler@example.com')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.flush()
+        file = File(filename='00001.png', file_path='00001.png', file_size=1, uploaded_by=user.id)
+        db.session.add(file)
+        db.session.commit()
+        return {'user_id': user.id, 'file_id': file.id}
+
+
+@pytest.fixture
+def client(seeded):
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = seeded['user_id']
+    return client
+
+
+def post_label(client, file_id, diseases, view_type='AP'):
+    return client.post('/api/label', json={
+        'file_id': file_id, 'disease': diseases, 'view_type': view_type,
+        'code': 'RDS_1', 'description': '소견'
+    })
+
+
+def test_label_upsert_keeps_one_row_and_updates_stats(client, seeded):
+    response = post_label(client, seeded['file_id'], ['Respiratory Distress Syndrome'])
+    assert response.status_code == 200, response.get_json()
+    response = post_label(client, seeded['file_id'], ['Pneumothorax'], view_type='PA')
+    assert response.status_code == 200, response.get_json()
+
+    with main.app.app_context():
+        labels = Label.query.filter_by(user_id=seeded['user_id'], file_id=seeded['file_id']).all()
+        assert len(labels) == 1
+        assert labels[0].get_diseases() == ['Pneumothorax']
+        assert labels[0].view_type == 'PA'
+        assert LabelRevision.query.filter_by(file_id=seeded['file_id']).count() == 2
+
+        global_counts, user_counts = label_stats.read_label_stats(seeded['user_id'])
+        for counts in (global_counts, user_counts):
+            assert counts['total'] == 1
+            assert counts.get('disease:Pneumothorax') == 1
+            assert counts.get('disease:Respiratory Distress Syndrome', 0) == 0
+            assert counts.get('view:PA') == 1
+            assert counts.get('view:AP', 0) == 0
+        assert label_stats.verify_label_stats() == []
+
+    stats = client.get('/api/label/stats').get_json()
+    assert stats['total']['total_labels'] == 1
+    assert stats['user']['diseases']['Pneumothorax'] == 1
+
+
+def test_label_for_unknown_file_is_404(client):
+    response = post_label(client, 999999, ['정상'])
+    assert response.status_code == 404
+
+
+def test_engine_options_match_backend(seeded, database_url):
+    with main.app.app_context():
+        pool = db.engine.pool
+        if db_config.is_sqlite(database_url):
+            assert db_config.engine_options(database_url) == {}
+        else:
+            assert pool.size() == db_config.DB_POOL_SIZE
+            assert pool._max_overflow == db_config.DB_MAX_OVERFLOW
+            assert pool._recycle == db_config.DB_POOL_RECYCLE
+            assert pool._pre_ping
+
+
+def test_migration_uri_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    monkeypatch.delenv('DATABASE_URL')
+    expected = db_config.migration_uri()
+    monkeypatch.chdir(tmp_path)
+    assert db_config.migration_uri() == expected
+    assert db_config.sqlite_path(expected) == os.path.join(os.path.dirname(os.path.abspath(db_config.__file__)),
+                                                           'database', 'app.db')
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('["Pneumothorax", "정상"]', ['Pneumothorax', '정상']),
+    ('"Pneumothorax"', ['Pneumothorax']),       # JSON 문자열 하나
+    ('Pneumothorax', ['Pneumothorax']),         # JSON 이전 단일 질환 데이터
+    ('', []),
+    (None, []),
+])
+def test_parse_diseases_always_returns_list(raw, expected):
+    assert Label.parse_diseases(raw) == expected
+    assert LabelRevision(disease=raw).to_dict()['disease_string'] == ', '.join(expected)
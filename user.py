@@ -7,6 +7,15 @@ import json
 
 db = SQLAlchemy()
 
+# 질환 카탈로그 - 목록 순서가 Label.disease_mask의 비트 위치이므로 순서를 바꾸지 말고 새 질환은 끝에만 추가
+DISEASE_CATALOG = [
+    '정상', 'Respiratory Distress Syndrome', 'Bronchopulmonary Dysplasia',
+    'Pneumothorax', 'Pulmonary Interstitial Emphysema',
+    'Pneumomediastinum', 'Subcutaneous Emphysema',
+    'Pneumopericardium', 'Necrotizing Enterocolitis', '직접입력(추가)'
+]
+DISEASE_BITS = {disease: 1 << i for i, disease in enumerate(DISEASE_CATALOG)}
+
 def ensure_database_permissions():
     """SSH 환경에서 데이터베이스 권한 문제 해결"""
     try:
@@ -63,6 +72,7 @@ class File(db.Model):
     file_size = db.Column(db.Integer)  # 파일 크기 (바이트)
     upload_date = db.Column(db.DateTime, default=lambda: datetime.now(timezone(timedelta(hours=9))))
     uploaded_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    content_hash = db.Column(db.String(64), index=True)  # 원본 내용 SHA-256 (같은 내용의 중복 업로드 확인용)
     
     # 관계 설정 (관계는 데이터베이스에서 테이블 간의 연결을 의미합니다)
     user = db.relationship('User', backref=db.backref('files', lazy=True))
@@ -82,10 +92,19 @@ class File(db.Model):
         }
 
 class Label(db.Model):
+    # 사용자당 파일 하나에 라벨 하나만 허용 (upsert의 충돌 기준, (user_id, file_id) 조회 인덱스 역할도 함)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'file_id', name='uq_label_user_file'),
+        # 질환/사진 종류 통계를 인덱스만으로 GROUP BY 하기 위한 커버링 인덱스 (전체 / 사용자별)
+        db.Index('ix_label_mask_view', 'disease_mask', 'view_type'),
+        db.Index('ix_label_user_mask_view', 'user_id', 'disease_mask', 'view_type'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    file_id = db.Column(db.Integer, db.ForeignKey('file.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    file_id = db.Column(db.Integer, db.ForeignKey('file.id', ondelete='CASCADE'), nullable=False, index=True)
     disease = db.Column(db.Text, nullable=False)         # 질환 (JSON 배열 형태로 저장)
+    disease_mask = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # 질환 비트마스크 (DISEASE_CATALOG 기준, 통계용)
     view_type = db.Column(db.String(20), nullable=False)        # 사진 종류 (AP, LATDEQ, LAT, PA)
     code = db.Column(db.String(20), nullable=False)             # 번호 (예: RDS_1, BPD_1)
     description = db.Column(db.String(255), nullable=False)     # 흉부 X선 소견
@@ -94,20 +113,47 @@ class Label(db.Model):
     # 관계 설정
     user = db.relationship('User', backref=db.backref('labels', lazy=True))
 
-    def set_diseases(self, diseases):
-        """질환 리스트를 JSON으로 저장"""
-        if isinstance(diseases, list):
-            self.disease = json.dumps(diseases, ensure_ascii=False)
-        else:
-            self.disease = json.dumps([diseases], ensure_ascii=False)
+    @staticmethod
+    def serialize_diseases(diseases):
+        """질환 리스트를 저장용 JSON 문자열로 변환"""
+        if not isinstance(diseases, list):
+            diseases = [diseases]
+        return json.dumps(diseases, ensure_ascii=False)
 
-    def get_diseases(self):
-        """저장된 JSON을 질환 리스트로 반환"""
+    @staticmethod
+    def parse_diseases(raw_disease):
+        """저장된 JSON 문자열을 질환 리스트로 변환 (Label/LabelRevision/내보내기 공통)"""
         try:
-            return json.loads(self.disease) if self.disease else []
+            diseases = json.loads(raw_disease) if raw_disease else []
         except (json.JSONDecodeError, TypeError):
             # 기존 단일 질환 데이터와의 호환성을 위해
-            return [self.disease] if self.disease else []
+            return [raw_disease] if raw_disease else []
+        # JSON 문자열 하나("Pneumothorax")로 저장된 값도 리스트로
+        return diseases if isinstance(diseases, list) else [diseases]
+
+    @staticmethod
+    def disease_mask_for(diseases):
+        """질환 리스트를 비트마스크로 변환 (카탈로그에 없는 질환은 무시)"""
+        if not isinstance(diseases, list):
+            diseases = [diseases]
+        mask = 0
+        for disease in diseases:
+            mask |= DISEASE_BITS.get(disease, 0)
+        return mask
+
+    @staticmethod
+    def diseases_from_mask(mask):
+        """비트마스크를 질환 리스트로 변환"""
+        return [disease for disease, bit in DISEASE_BITS.items() if mask & bit]
+
+    def set_diseases(self, diseases):
+        """질환 리스트를 JSON으로 저장 (통계용 비트마스크도 함께 갱신)"""
+        self.disease = Label.serialize_diseases(diseases)
+        self.disease_mask = Label.disease_mask_for(diseases)
+
+    def get_diseases(self):
+        """저장된 JSON을 질환 리스트로 반환"""
+        return Label.parse_diseases(self.disease)
 
     def has_disease(self, disease_name):
         """특정 질환이 포함되어 있는지 확인"""
@@ -131,4 +177,74 @@ class Label(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'username': self.user.username if self.user else None,
             'filename': self.file.filename if self.file else None
-        } 
\ No newline at end of file
+        }
+
+
+class LabelStat(db.Model):
+    """라벨 통계 요약 테이블 (add_label에서 변경분만 반영하여 통계 조회를 O(1)로 유지)"""
+    __tablename__ = 'label_stats'
+
+    user_id = db.Column(db.Integer, primary_key=True)       # 0 = 전체 통계, 그 외 = 사용자별 통계
+    metric = db.Column(db.String(100), primary_key=True)    # 'total', 'disease:<질환>', 'view:<사진 종류>'
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<LabelStat {self.user_id} {self.metric}={self.count}>'
+
+
+class LabelRevision(db.Model):
+    """라벨 변경 이력 (추가만 하는 테이블, add_label의 upsert와 같은 트랜잭션에서 기록)
+
+    (file_id, user_id, created_at) 인덱스로 특정 시각 기준 라벨을 이력 전체를 읽지 않고 조회
+    """
+    __tablename__ = 'label_revision'
+    __table_args__ = (
+        db.Index('ix_label_revision_file_user_created', 'file_id', 'user_id', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    file_id = db.Column(db.Integer, db.ForeignKey('file.id', ondelete='CASCADE'), nullable=False)
+    disease = db.Column(db.Text, nullable=False)
+    disease_mask = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    view_type = db.Column(db.String(20), nullable=False)
+    code = db.Column(db.String(20), nullable=False)
+    description = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone(timedelta(hours=9))))
+
+    def get_diseases(self):
+        """저장된 JSON을 질환 리스트로 반환 (Label.get_diseases와 같은 규칙)"""
+        return Label.parse_diseases(self.disease)
+
+    def to_dict(self):
+        diseases = self.get_diseases()
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'file_id': self.file_id,
+            'disease': diseases,
+            'disease_string': ', '.join(diseases),
+            'view_type': self.view_type,
+            'code': self.code,
+            'description': self.description,
+            'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<LabelRevision {self.user_id} -> {self.file_id} @ {self.created_at}>'
+
+
+class IngestManifest(db.Model):
+    """폴더 업로드 매니페스트 (원본 파일별 크기/수정 시각을 기록하여 다시 업로드할 때 바뀐 파일만 처리)"""
+    __tablename__ = 'ingest_manifest'
+
+    id = db.Column(db.Integer, primary_key=True)
+    path = db.Column(db.String(1000), nullable=False, unique=True)  # 원본 파일 절대 경로
+    size = db.Column(db.Integer, nullable=False)
+    mtime = db.Column(db.Float, nullable=False)
+    content_hash = db.Column(db.String(64))                          # 원본 파일 SHA-256
+    file_id = db.Column(db.Integer, index=True)                      # 등록된 File.id
+    scanned_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone(timedelta(hours=9))))
+
+    def __repr__(self):
+        return f'<IngestManifest {self.path}>'